@@ -0,0 +1,44 @@
+"""Compares plain and memoized date parsing on a realistic grades payload"""
+
+from datetime import datetime
+
+from vulcan_scraper.model import GradesData
+from vulcan_scraper.utils import parse_date
+
+from common import grades_data, ops_per_sec, report
+
+
+def main():
+    data = grades_data(15, 20)
+    dates = [g["DataOceny"] for s in data["Oceny"] for g in s["OcenyCzastkowe"]]
+    print(f"{len(dates)} grades, {len(set(dates))} distinct dates")
+
+    def plain():
+        for d in dates:
+            datetime.strptime(d, "%d.%m.%Y")
+
+    def cold():
+        parse_date.cache_clear()
+        for d in dates:
+            parse_date(d)
+
+    def warm():
+        for d in dates:
+            parse_date(d)
+
+    base = ops_per_sec(plain)
+    report("  strptime", base)
+    report("  parse_date, empty cache", ops_per_sec(cold), base)
+    report("  parse_date, warm cache", ops_per_sec(warm), base)
+
+    def model_cold():
+        parse_date.cache_clear()
+        GradesData(**data)
+
+    base = ops_per_sec(model_cold)
+    report("  GradesData, empty cache", base)
+    report("  GradesData, warm cache", ops_per_sec(lambda: GradesData(**data)), base)
+
+
+if __name__ == "__main__":
+    main()
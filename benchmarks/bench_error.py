@@ -0,0 +1,27 @@
+"""Compares check_for_vulcan_error with and without the marker fast path"""
+
+from vulcan_scraper.utils import check_for_vulcan_error
+
+from common import read_resource, ops_per_sec, report
+
+PAGES = {
+    "login/cufs.html": 1,
+    "login/adfslight.html": 1,
+    "uonetplus/start.html": 1,
+    # a large page, similar to a start page with many tiles
+    "uonetplus/start.html x50": 50,
+}
+
+
+def main():
+    for name, scale in PAGES.items():
+        text = read_resource(name.split(" ")[0]) * scale
+        slow = ops_per_sec(lambda: check_for_vulcan_error(text, fast=False))
+        fast = ops_per_sec(lambda: check_for_vulcan_error(text, fast=True))
+        print(f"{name} ({len(text)} chars)")
+        report("  full parse", slow)
+        report("  fast path", fast, slow)
+
+
+if __name__ == "__main__":
+    main()
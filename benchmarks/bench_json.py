@@ -0,0 +1,90 @@
+"""Compares decoding API responses from text with the stdlib and from bytes with the json backend"""
+
+import json
+from dataclasses import dataclass, is_dataclass
+from typing import Any
+
+from vulcan_scraper.model import GradesData, TimetableResponse
+from vulcan_scraper.utils import json_loads, unwrap_api_response
+
+from common import grades_data, timetable_data, ops_per_sec, report
+
+
+# the response envelope the models used to be decoded through, kept as the "old" baseline
+def nested_dataclass(*args, **kwargs):
+    def wrapper(cls):
+        cls = dataclass(cls, **kwargs)
+        original_init = cls.__init__
+
+        def __init__(self, *args, **kwargs):
+            for name, value in kwargs.items():
+                field_type = cls.__annotations__.get(name, None)
+                if is_dataclass(field_type) and isinstance(value, dict):
+                    new_obj = field_type(**value)
+                    kwargs[name] = new_obj
+            original_init(self, *args, **kwargs)
+
+        cls.__init__ = __init__
+        return cls
+
+    return wrapper(args[0]) if args else wrapper
+
+
+@dataclass
+class Feedback:
+    Handled: bool = None
+    FType: str = None
+    Message: str = None
+    ExceptionType: Any = None
+    ExceptionMessage: str = None
+    InnerExceptionMessage: str = None
+    Action: Any = None
+    data: Any = None
+    success: bool = None
+    requestId: Any = None
+
+
+@nested_dataclass
+class ApiResponse:
+    success: bool
+    data: Any = None
+    feedback: Feedback = None
+    errorMessage: Any = None
+
+
+PAYLOADS = {
+    "grades 15x20": (grades_data(15, 20), GradesData),
+    "grades 30x60": (grades_data(30, 60), GradesData),
+    "timetable 14 rows": (timetable_data(14), TimetableResponse),
+    "timetable 40 rows": (timetable_data(40), TimetableResponse),
+}
+
+
+def old(body: bytes, model):
+    res = ApiResponse(**json.loads(body.decode("utf-8")))
+    return model(**res.data)
+
+
+def new(body: bytes, model):
+    return model(**unwrap_api_response(json_loads(body), "bench"))
+
+
+def main():
+    print(f"backend: {json_loads.__module__}")
+    for name, (data, model) in PAYLOADS.items():
+        body = json.dumps({"success": True, "data": data}).encode()
+        print(f"{name} ({len(body)} bytes)")
+
+        decode_old = ops_per_sec(lambda: ApiResponse(**json.loads(body.decode())))
+        decode_new = ops_per_sec(lambda: unwrap_api_response(json_loads(body), ""))
+        report("  decode: text + ApiResponse", decode_old)
+        report("  decode: bytes + unwrap", decode_new, decode_old)
+
+        full_old = ops_per_sec(lambda: old(body, model))
+        full_new = ops_per_sec(lambda: new(body, model))
+        report("  decode + model: old", full_old)
+        report("  decode + model: new", full_new, full_old)
+
+
+if __name__ == "__main__":
+    main()
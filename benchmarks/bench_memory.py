@@ -0,0 +1,91 @@
+"""Measures the memory used by model objects with and without __slots__"""
+
+import tracemalloc
+from dataclasses import dataclass, fields, is_dataclass, MISSING
+from datetime import datetime
+
+from vulcan_scraper.model import Grade, SubjectGrades, Note, Homework
+from vulcan_scraper.timetable import TimetableLesson
+
+from common import grade_data, grades_data
+
+N = 10000
+
+
+def unslotted(cls: type) -> type:
+    """An equivalent of `cls` that stores its attributes in a __dict__"""
+
+    slots = getattr(cls, "__slots__", ())
+    ns = {
+        k: v
+        for k, v in vars(cls).items()
+        if k not in slots and k not in ("__slots__", "__dict__", "__weakref__")
+    }
+    if is_dataclass(cls):
+        ns = {"__annotations__": dict(cls.__annotations__)}
+        for f in fields(cls):
+            if f.default is not MISSING:
+                ns[f.name] = f.default
+
+        return dataclass(type(cls.__name__, (), ns))
+
+    return type(cls.__name__, (), ns)
+
+
+def bytes_per_object(factory) -> float:
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    objects = [factory(i) for i in range(N)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    size = sum(s.size_diff for s in after.compare_to(before, "filename"))
+    del objects
+    return size / N
+
+
+NOTE = {
+    "DataWpisu": "2021-10-01T12:00:00",
+    "Nauczyciel": "Jan Kowalski",
+    "Kategoria": "Zachowanie",
+    "TrescUwagi": "Uwaga",
+    "KategoriaTyp": 1,
+    "Punkty": "",
+    "PokazPunkty": False,
+}
+HOMEWORK = {
+    "HomeworkId": 1,
+    "ModificationDate": "2021-10-01T12:00:00",
+    "Date": "2021-10-04T00:00:00",
+    "Subject": "Matematyka",
+    "Description": "Zadania 1-5",
+    "Teacher": "Jan Kowalski",
+    "Attachments": [],
+}
+SUBJECT = grades_data(1, 5)["Oceny"][0]
+DATE = datetime(2021, 10, 1, 8)
+
+CASES = {
+    Grade: lambda cls, i: cls(**grade_data(i)),
+    SubjectGrades: lambda cls, i: cls(**SUBJECT),
+    Note: lambda cls, i: cls(**NOTE),
+    Homework: lambda cls, i: cls(**HOMEWORK),
+    TimetableLesson: lambda cls, i: cls(
+        _html="", number=i, start=DATE, end=DATE, subject="Matematyka"
+    ),
+}
+
+
+def main():
+    print(f"{'':<20} {'__dict__':>10} {'__slots__':>10}  bytes/object")
+    for cls, factory in CASES.items():
+        plain_cls = unslotted(cls)
+        plain = bytes_per_object(lambda i: factory(plain_cls, i))
+        slotted = bytes_per_object(lambda i: factory(cls, i))
+        print(
+            f"{cls.__name__:<20} {plain:>10.0f} {slotted:>10.0f}  ({slotted / plain:.0%})"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,20 @@
+"""Compares the single-pass timetable parser with parsing every cell separately"""
+
+from vulcan_scraper.model import TimetableResponse
+from vulcan_scraper.timetable import Timetable
+
+from common import timetable_data, ops_per_sec, report
+
+
+def main():
+    for rows in (5, 14, 50):
+        data = TimetableResponse(**timetable_data(rows))
+        separate = ops_per_sec(lambda: Timetable(data, single_pass=False))
+        single = ops_per_sec(lambda: Timetable(data))
+        print(f"{rows} rows x {len(data.headers) - 1} days")
+        report("  per-cell BeautifulSoup", separate)
+        report("  single pass lxml", single, separate)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+from timeit import Timer
+
+RESOURCES = "resources"
+
+
+def read_resource(path: str) -> str:
+    with open(f"{RESOURCES}/{path}", encoding="utf-8") as f:
+        return f.read()
+
+
+def ops_per_sec(func, min_time: float = 0.5, repeat: int = 3) -> float:
+    """Runs `func` repeatedly for at least `min_time` seconds, best of `repeat`"""
+
+    timer = Timer(func)
+    number, _ = timer.autorange()
+    number = max(1, int(number * min_time / 0.2))
+    best = min(timer.repeat(repeat=repeat, number=number))
+    return number / best
+
+
+def report(name: str, ops: float, baseline: float = None):
+    line = f"{name:<40} {ops:>12.1f} ops/s"
+    if baseline:
+        line += f"  ({ops / baseline:.1f}x)"
+
+    print(line)
+
+
+def timetable_data(rows: int = 14) -> dict:
+    """The timetable fixture, with its rows repeated up to `rows` lessons a day"""
+
+    import json
+
+    data = json.loads(read_resource("uczen/timetable/1.json"))["data"]
+    original = data["Rows"]
+    data["Rows"] = []
+    for i in range(rows):
+        row = original[i % len(original)].copy()
+        _, start, end = row[0].split("<br />")
+        row[0] = f"{i}<br />{start}<br />{end}"
+        data["Rows"].append(row)
+
+    return data
+
+
+def grade_data(i: int) -> dict:
+    return {
+        "Wpis": str(1 + i % 6),
+        "KolorOceny": 0,
+        "KodKolumny": f"K{i}",
+        "NazwaKolumny": f"Kartkówka {i}",
+        "Waga": 1.0 + i % 3,
+        "DataOceny": f"{1 + i % 28:02}.{1 + i % 10:02}.2021",
+    }
+
+
+def grades_data(subjects: int = 15, grades: int = 20) -> dict:
+    """A synthetic Oceny.mvc/Get response with `subjects` x `grades` grades"""
+
+    return {
+        "IsSrednia": True,
+        "IsPunkty": False,
+        "TypOcen": 0,
+        "IsOstatniSemestr": False,
+        "IsDlaDoroslych": False,
+        "Oceny": [
+            {
+                "Przedmiot": f"Przedmiot {s}",
+                "WidocznyPrzedmiot": True,
+                "Pozycja": s,
+                "Srednia": 4.5,
+                "ProponowanaOcenaRoczna": "",
+                "OcenaRoczna": "",
+                "ProponowanaOcenaRocznaPunkty": None,
+                "OcenaRocznaPunkty": None,
+                "SumaPunktow": None,
+                "OcenyCzastkowe": [grade_data(s * grades + i) for i in range(grades)],
+            }
+            for s in range(subjects)
+        ],
+        "OcenyOpisowe": [],
+    }
@@ -0,0 +1,128 @@
+"""
+Drives concurrent VulcanWeb logins and student fetches against the stand-in server
+and reports the throughput and latency percentiles of each operation.
+
+    PYTHONPATH=src:src/tests python benchmarks/loadgen.py --clients 50 --concurrency 10
+"""
+
+import argparse
+import asyncio
+from collections import defaultdict
+from datetime import datetime
+from time import perf_counter
+
+from vulcan_scraper import VulcanWeb
+
+from standin import PASSWORD, StandIn, StandInConfig, account_email
+
+OPERATIONS = ("login", "get_students", "grades", "timetable", "logout")
+
+
+def percentile(values: list[float], p: float) -> float:
+    """Nearest-rank percentile of sorted `values`"""
+
+    if not values:
+        return 0.0
+
+    k = max(0, min(len(values) - 1, round(p / 100 * len(values) + 0.5) - 1))
+    return values[k]
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+
+    async def time(self, op: str, coro):
+        """Awaits `coro`, recording its latency if it succeeds"""
+
+        start = perf_counter()
+        try:
+            ret = await coro
+        except Exception:
+            self.errors[op] += 1
+            raise
+
+        self.latencies[op].append(perf_counter() - start)
+        return ret
+
+
+async def run_client(server: StandIn, i: int, rec: Recorder, students_per_client: int):
+    async with VulcanWeb(
+        host=server.host,
+        ssl=False,
+        connector=server.connector(),
+        email=account_email(i % server.config.accounts),
+        password=PASSWORD,
+    ) as v:
+        await rec.time("login", v.login())
+        students = await rec.time("get_students", v.get_students())
+        for student in students[:students_per_client]:
+            await rec.time("grades", student.get_grades())
+            await rec.time("timetable", student.get_timetable(datetime.now()))
+
+        await rec.time("logout", v.logout())
+
+
+async def run(args) -> tuple[Recorder, float, StandIn]:
+    config = StandInConfig(
+        accounts=args.accounts,
+        instances=args.instances,
+        students=args.students,
+        latency=args.latency,
+        jitter=args.jitter,
+        maintenance_rate=args.maintenance_rate,
+    )
+    rec = Recorder()
+    sem = asyncio.Semaphore(args.concurrency)
+
+    async def client(i: int):
+        async with sem:
+            try:
+                await run_client(server, i, rec, args.fetch)
+            except Exception:
+                pass  # counted by the recorder
+
+    async with StandIn(config) as server:
+        start = perf_counter()
+        await asyncio.gather(*[client(i) for i in range(args.clients)])
+        elapsed = perf_counter() - start
+
+    return rec, elapsed, server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n\n")[0])
+    parser.add_argument("--clients", type=int, default=20, help="logins to run")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--accounts", type=int, default=10)
+    parser.add_argument("--instances", type=int, default=3)
+    parser.add_argument("--students", type=int, default=8)
+    parser.add_argument(
+        "--fetch", type=int, default=2, help="students fetched per client"
+    )
+    parser.add_argument("--latency", type=float, default=0.005)
+    parser.add_argument("--jitter", type=float, default=0.005)
+    parser.add_argument("--maintenance-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    rec, elapsed, server = asyncio.run(run(args))
+
+    print(
+        f"{args.clients} clients, {args.concurrency} at a time: {elapsed:.2f} s, "
+        f"{server.stats.requests} requests ({server.stats.requests / elapsed:.1f} req/s)"
+    )
+    print(
+        f"{'operation':<14} {'count':>6} {'errors':>6} {'ops/s':>8} "
+        f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+    )
+    for op in OPERATIONS:
+        values = sorted(rec.latencies[op])
+        print(
+            f"{op:<14} {len(values):>6} {rec.errors[op]:>6} {len(values) / elapsed:>8.1f} "
+            + " ".join(f"{percentile(values, p) * 1000:>8.1f}" for p in (50, 95, 99))
+        )
+
+
+if __name__ == "__main__":
+    main()
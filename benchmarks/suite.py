@@ -0,0 +1,301 @@
+"""
+Measures the CPU cost and allocations of the parsers and models, on the `resources/` fixtures
+and on synthetically scaled payloads, and compares them with a stored baseline.
+
+    PYTHONPATH=src python benchmarks/suite.py           # compare with benchmarks/baseline.json
+    PYTHONPATH=src python benchmarks/suite.py --save    # record a new baseline
+    PYTHONPATH=src python benchmarks/suite.py -k grades --threshold 0.1
+
+Exits with status 1 when a case is slower, or allocates more at its peak, than the baseline
+by more than `--threshold` (a fraction). Baselines are machine specific, record one on the
+machine the suite runs on
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import tracemalloc
+from types import SimpleNamespace
+from typing import Any, Callable
+
+from vulcan_scraper.error import ScraperException
+from vulcan_scraper.model import (
+    CertificateResponse,
+    GradesData,
+    TimetableResponse,
+    UonetplusTileResponse,
+)
+from vulcan_scraper.timetable import Timetable
+from vulcan_scraper.uonetplus import Uonetplus
+from vulcan_scraper.utils import (
+    check_for_vulcan_error,
+    extract_instances,
+    extract_login_info,
+    extract_symbols,
+)
+
+from common import grades_data, ops_per_sec, read_resource, timetable_data
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+THRESHOLD = 0.25
+
+# name -> setup, which returns the function to measure
+CASES: dict[str, Callable[[], Callable[[], Any]]] = {}
+
+
+def case(name: str):
+    def decorator(setup: Callable[[], Callable[[], Any]]):
+        CASES[name] = setup
+        return setup
+
+    return decorator
+
+
+def run_sync(coro):
+    """Runs a coroutine that never suspends, without the cost of an event loop"""
+
+    try:
+        coro.send(None)
+    except StopIteration as e:
+        return e.value
+
+    raise RuntimeError("coroutine suspended")
+
+
+def start_page(schools: int) -> str:
+    """The uonetplus start page fixture with `schools` schools"""
+
+    page = read_resource("uonetplus/start.html")
+    page = re.sub(
+        r'<a href="http://uonetplus-uczen\.[^"]+/\d+/">.*?</a>(<br>)?', "", page
+    )
+    links = "".join(
+        f'<a href="http://uonetplus-uczen.fakelog.cf/powiatwulkanowy/{100000 + i}/">'
+        f'<span class="header directLink">SZK{i}</span></a><br>'
+        for i in range(schools)
+    )
+    marker = '<div id="idAppUczenExt"><div class="newAppLink">'
+    return page.replace(marker, marker + links)
+
+
+def announcements_data(n: int) -> list[dict]:
+    return [
+        {
+            "Nazwa": "Informacje dyrektora",
+            "Nieaktywny": False,
+            "Zawartosc": [
+                {
+                    "Nazwa": f"{1 + i % 28:02}.10.2021 Ogłoszenie {i}",
+                    "Dane": "Zapraszamy na apel<br />o godzinie <b>9:00</b>",
+                    "Nieaktywny": False,
+                    "Zawartosc": [],
+                }
+                for i in range(n)
+            ],
+        }
+    ]
+
+
+for name in ("cufs", "adfs", "adfscards", "adfslight"):
+
+    @case(f"extract_login_info[{name}]")
+    def _(name=name):
+        text = read_resource(f"login/{name}.html")
+        return lambda: extract_login_info(text)
+
+
+@case("CertificateResponse")
+def _():
+    text = read_resource("cufs/certresponse.html")
+    return lambda: CertificateResponse(text)
+
+
+@case("extract_symbols")
+def _():
+    wresult = CertificateResponse(read_resource("cufs/certresponse.html")).wresult
+    return lambda: extract_symbols(wresult)
+
+
+@case("extract_instances[fixture]")
+def _():
+    text = read_resource("uonetplus/start.html")
+    return lambda: extract_instances(text)
+
+
+@case("extract_instances[100 schools]")
+def _():
+    text = start_page(100)
+    return lambda: extract_instances(text)
+
+
+for name, path, scale in (
+    ("start page", "uonetplus/start.html", 1),
+    ("start page x50", "uonetplus/start.html", 50),
+    ("maintenance", "error/baza.html", 1),
+    ("credentials", "error/credentials.html", 1),
+):
+
+    @case(f"check_for_vulcan_error[{name}]")
+    def _(path=path, scale=scale):
+        text = read_resource(path) * scale
+
+        def check():
+            try:
+                check_for_vulcan_error(text)
+            except ScraperException:
+                pass
+
+        return check
+
+
+for rows in (5, 14, 50):
+
+    @case(f"Timetable[{rows} rows]")
+    def _(rows=rows):
+        data = TimetableResponse(**timetable_data(rows))
+        return lambda: Timetable(data)
+
+
+for subjects, grades in ((15, 20), (30, 60)):
+    for lazy in (False, True):
+
+        @case(f"GradesData[{subjects}x{grades}{', lazy' if lazy else ''}]")
+        def _(data=grades_data(subjects, grades), lazy=lazy):
+            return lambda: GradesData(lazy=lazy, **data)
+
+
+for n in (1, 100):
+
+    @case(f"get_school_announcements[{n}]")
+    def _(n=n):
+        tiles = [UonetplusTileResponse(**d) for d in announcements_data(n)]
+
+        async def get_school_announcements(symbol, permissions):
+            return tiles
+
+        http = SimpleNamespace(
+            uonetplus_get_school_announcements=get_school_announcements
+        )
+        u = Uonetplus(SimpleNamespace(http=http))
+        u.symbol = "powiatwulkanowy"
+        u.permissions = ""
+        # the tile cache is bypassed, to measure the parsing
+        return lambda: run_sync(u._fetch_school_announcements())
+
+
+def peak_bytes(func: Callable[[], Any]) -> int:
+    """The peak memory allocated during one call of `func`"""
+
+    func()  # warm up caches
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return peak - before
+
+
+def measure(
+    names: list[str], min_time: float, repeat: int
+) -> dict[str, dict[str, float]]:
+    results = {}
+    for name in names:
+        func = CASES[name]()
+        results[name] = {
+            "ops": round(ops_per_sec(func, min_time, repeat), 1),
+            "peak_bytes": peak_bytes(func),
+        }
+
+    return results
+
+
+def is_regression(
+    result: dict[str, float], base: dict[str, float], threshold: float
+) -> bool:
+    return result["ops"] < base["ops"] * (1 - threshold) or result["peak_bytes"] > base[
+        "peak_bytes"
+    ] * (1 + threshold)
+
+
+def print_results(
+    results: dict[str, dict[str, float]],
+    baseline: dict[str, dict[str, float]],
+    regressed: list[str],
+):
+    print(f"{'case':<44} {'ops/s':>10} {'vs base':>8} {'peak KiB':>9} {'vs base':>8}")
+    for name, r in results.items():
+        base = baseline.get(name)
+        line = f"{name:<44} {r['ops']:>10.1f} "
+        if base:
+            speed = r["ops"] / base["ops"]
+            memory = r["peak_bytes"] / max(1, base["peak_bytes"])
+            line += f"{speed:>7.2f}x {r['peak_bytes'] / 1024:>9.1f} {memory:>7.2f}x"
+        else:
+            line += f"{'-':>8} {r['peak_bytes'] / 1024:>9.1f} {'-':>8}"
+
+        if name in regressed:
+            line += "  REGRESSED"
+
+        print(line)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n\n")[0])
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--save", action="store_true", help="record a new baseline")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    parser.add_argument("--min-time", type=float, default=0.3)
+    parser.add_argument("--repeat", type=int, default=5, help="best of this many runs")
+    parser.add_argument("-k", default="", help="only run cases containing this")
+    args = parser.parse_args()
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    names = [name for name in CASES if args.k in name]
+    results = measure(names, args.min_time, args.repeat)
+
+    def regressions() -> list[str]:
+        return [
+            name
+            for name, r in results.items()
+            if name in baseline and is_regression(r, baseline[name], args.threshold)
+        ]
+
+    regressed = [] if args.save else regressions()
+    if regressed:
+        # measure them again, a single slow run is more often noise than a regression
+        for name, r in measure(regressed, args.min_time, args.repeat).items():
+            results[name]["ops"] = max(results[name]["ops"], r["ops"])
+
+        regressed = regressions()
+
+    print_results(results, baseline, regressed)
+
+    if args.save:
+        baseline.update(results)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+
+        print(f"Saved {len(results)} cases to {args.baseline}")
+        return 0
+
+    if regressed:
+        print(
+            f"{len(regressed)} of {len(results)} cases regressed by more than {args.threshold:.0%}"
+        )
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
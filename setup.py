@@ -23,6 +23,7 @@ def install():
         packages=[PACKAGE],
         package_dir={"": SRC_DIR},
         install_requires=requirements,
+        extras_require={"fast": ["orjson"], "parquet": ["pyarrow"]},
     )
 
 
@@ -0,0 +1,554 @@
+"""
+A local stand-in for the UONET+ hosts (cufs, uonetplus, uonetplus-uzytkownik and uonetplus-uczen),
+built from the `resources/` fixtures, for end-to-end and load tests without fakelog.cf.
+
+Every subdomain of `HOST` is served by a single aiohttp server on 127.0.0.1, clients reach it
+through a connector from `StandIn.connector()`, which resolves every host name to 127.0.0.1:
+
+    async with StandIn(StandInConfig(accounts=10)) as server:
+        async with VulcanWeb(host=server.host, ssl=False, connector=server.connector(),
+                             email=account_email(0), password=PASSWORD) as v:
+            await v.login()
+
+Run `python src/tests/standin.py --port 8080` from the repository root to serve it standalone
+"""
+
+import asyncio
+import json
+import random
+import re
+import socket
+import secrets
+from dataclasses import dataclass, field
+from html import escape
+from typing import Optional
+
+from aiohttp import TCPConnector, web
+from aiohttp.abc import AbstractResolver
+
+RESOURCES = "resources"
+HOST = "fakelog.test"
+PASSWORD = "jan123"
+# the symbols in the certificate fixture, in order
+SYMBOLS = ("Default", "powiatwulkanowy", "warszawa", "asdf", "asdfsdf")
+
+NOT_LOGGED_IN = "The custom error module does not recognize this error."
+
+
+def account_email(i: int) -> str:
+    return f"jan{i}@{HOST}"
+
+
+def read_resource(path: str) -> str:
+    with open(f"{RESOURCES}/{path}", encoding="utf-8") as f:
+        return f.read()
+
+
+@dataclass
+class StandInConfig:
+    accounts: int = 1
+    instances: int = 3  # schools per account
+    students: int = 8  # students per school
+    subjects: int = 10
+    grades: int = 10  # grades per subject
+    shared_register: bool = (
+        False  # all students of a school in one class diary, like siblings
+    )
+    valid_symbol: str = "powiatwulkanowy"  # the other SYMBOLS are invalid
+    latency: float = 0.0  # seconds added to every response
+    jitter: float = 0.0  # up to this many more seconds, at random
+    maintenance_rate: float = (
+        0.0  # fraction of responses replaced by the maintenance page
+    )
+    seed: int = 0
+
+
+@dataclass
+class StandInStats:
+    requests: int = 0
+    logins: int = 0
+    bad_credentials: int = 0
+    invalid_symbols: int = 0
+    maintenance: int = 0
+    not_logged_in: int = 0
+    by_endpoint: dict[str, int] = field(default_factory=dict)
+
+
+class _Resolver(AbstractResolver):
+    async def resolve(self, host: str, port: int = 0, family=socket.AF_INET):
+        return [
+            {
+                "hostname": host,
+                "host": "127.0.0.1",
+                "port": port,
+                "family": socket.AF_INET,
+                "proto": 0,
+                "flags": socket.AI_NUMERICHOST,
+            }
+        ]
+
+    async def close(self):
+        pass
+
+
+class StandIn:
+    def __init__(self, config: Optional[StandInConfig] = None):
+        self.config = config or StandInConfig()
+        self.stats = StandInStats()
+        self.port = 0
+
+        self._random = random.Random(self.config.seed)
+        self._tickets: dict[str, str] = {}  # wctx ticket -> email
+        self._sessions: dict[str, str] = {}  # session cookie -> email
+        self._runner: Optional[web.AppRunner] = None
+        self._connectors: list[TCPConnector] = []
+
+        self._templates = {
+            "cufs": read_resource("login/cufs.html"),
+            "cert": read_resource("cufs/certresponse.html").replace("fakelog.cf", HOST),
+            "credentials": read_resource("error/credentials.html"),
+            "symbol": read_resource("error/symbol.html"),
+            "maintenance": read_resource("error/baza.html"),
+            "uonetplus": read_resource("uonetplus/start.html"),
+            "uczen": read_resource("uczen/start.html"),
+        }
+        self._timetable = json.loads(read_resource("uczen/timetable/1.json"))["data"]
+
+        self.app = web.Application()
+        self.app.router.add_route("*", "/{path:.*}", self._dispatch)
+
+    @property
+    def host(self) -> str:
+        """The `host` to pass to `VulcanWeb`"""
+
+        return f"{HOST}:{self.port}"
+
+    def connector(self, **kwargs) -> TCPConnector:
+        """A connector that sends requests for any host to the stand-in, closed along with it"""
+
+        connector = TCPConnector(resolver=_Resolver(), **kwargs)
+        self._connectors.append(connector)
+        return connector
+
+    def expire_sessions(self):
+        """Ends all sessions, like the server does after a period of inactivity"""
+
+        self._sessions.clear()
+
+    async def start(self, port: int = 0):
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        for connector in self._connectors:
+            await connector.close()
+
+        self._connectors.clear()
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    # request handling
+
+    async def _dispatch(self, request: web.Request) -> web.StreamResponse:
+        c = self.config
+        self.stats.requests += 1
+        if c.latency or c.jitter:
+            await asyncio.sleep(c.latency + self._random.uniform(0, c.jitter))
+
+        if c.maintenance_rate and self._random.random() < c.maintenance_rate:
+            self.stats.maintenance += 1
+            return self._html("maintenance")
+
+        subd = request.host.split(".", 1)[0]
+        parts = [p for p in request.path.split("/") if p]
+        endpoint = (
+            f"{subd}/{'/'.join(parts[2:] if subd == 'uonetplus-uczen' else parts[1:])}"
+        )
+        self.stats.by_endpoint[endpoint] = self.stats.by_endpoint.get(endpoint, 0) + 1
+
+        if subd == "cufs":
+            return await self._cufs(request, parts)
+
+        if parts and parts[0] != c.valid_symbol:
+            self.stats.invalid_symbols += 1
+            return self._html("symbol")
+
+        if subd == "uonetplus" and len(parts) == 1 and request.method == "POST":
+            return await self._uonetplus_login(request)
+
+        email = self._sessions.get(request.cookies.get("standin", ""))
+        if not email:
+            self.stats.not_logged_in += 1
+            return web.Response(text=NOT_LOGGED_IN, content_type="text/html")
+
+        account = int(email[3 : email.index("@")])
+        if subd == "uonetplus":
+            return self._uonetplus(parts, account)
+
+        if subd == "uonetplus-uzytkownik":
+            return self._json(self._units(account))
+
+        if subd == "uonetplus-uczen" and len(parts) >= 3:
+            return self._uczen(request, parts, account)
+
+        raise web.HTTPNotFound()
+
+    def _html(self, name: str, text: Optional[str] = None) -> web.Response:
+        return web.Response(
+            text=text if text is not None else self._templates[name],
+            content_type="text/html",
+        )
+
+    def _json(self, data) -> web.Response:
+        return web.json_response({"success": True, "data": data})
+
+    async def _cufs(self, request: web.Request, parts: list[str]) -> web.Response:
+        if request.query.get("wa") == "wsignout1.0":
+            res = self._html("", "<html><body>Wylogowano</body></html>")
+            res.del_cookie("standin", domain=HOST)
+            return res
+
+        if request.method == "GET":
+            return self._html("cufs")
+
+        form = await request.post()
+        email = form.get("LoginName", "")
+        if (
+            form.get("Password") != PASSWORD
+            or not email.startswith("jan")
+            or not email.endswith(f"@{HOST}")
+            or not email[3 : email.index("@")].isdigit()
+            or int(email[3 : email.index("@")]) >= self.config.accounts
+        ):
+            self.stats.bad_credentials += 1
+            return self._html("credentials")
+
+        ticket = secrets.token_hex(8)
+        self._tickets[ticket] = email
+        cert = re.sub(
+            r'name="wctx" value="[^"]*"',
+            f'name="wctx" value="{ticket}"',
+            self._templates["cert"],
+        )
+        return self._html("", cert)
+
+    async def _uonetplus_login(self, request: web.Request) -> web.Response:
+        form = await request.post()
+        email = self._tickets.pop(form.get("wctx", ""), None)
+        if not email:
+            self.stats.not_logged_in += 1
+            return self._html("", NOT_LOGGED_IN)
+
+        self.stats.logins += 1
+        token = secrets.token_hex(16)
+        self._sessions[token] = email
+
+        res = self._html("", self._uonetplus_start_page())
+        res.set_cookie("standin", token, domain=HOST)
+        return res
+
+    def _uonetplus_start_page(self) -> str:
+        c = self.config
+        page = self._templates["uonetplus"].replace("powiatwulkanowy", c.valid_symbol)
+        page = page.replace("fakelog.cf", HOST)
+        # replace the fixture's schools with the configured number of them
+        page = re.sub(
+            r'<a href="http://uonetplus-uczen\.[^"]+/\d+/">.*?</a>(<br>)?', "", page
+        )
+        links = "".join(
+            f'<a href="http://uonetplus-uczen.{HOST}/{c.valid_symbol}/{self._school_id(i)}/">'
+            f'<span class="header directLink">SZK{i + 1}</span></a><br>'
+            for i in range(c.instances)
+        )
+        marker = '<div id="idAppUczenExt"><div class="newAppLink">'
+        return page.replace(marker, marker + links)
+
+    def _uonetplus(self, parts: list[str], account: int) -> web.Response:
+        c = self.config
+        action = parts[-1]
+        if action == "GetKidsLuckyNumbers":
+            return self._json(
+                [
+                    {
+                        "Nazwa": f"Publiczna szkoła Wulkanowego nr {i + 1}",
+                        "Nieaktywny": False,
+                        "Zawartosc": [
+                            {
+                                "Nazwa": self._unit_abbr(i),
+                                "Nieaktywny": False,
+                                "Zawartosc": [
+                                    {
+                                        "Nazwa": f"Szczęśliwy numer: {(account + i) % 30 + 1}",
+                                        "Nieaktywny": False,
+                                        "Zawartosc": [],
+                                    }
+                                ],
+                            }
+                        ],
+                    }
+                    for i in range(c.instances)
+                ]
+            )
+
+        if action == "GetStudentDirectorInformations":
+            return self._json(
+                [
+                    {
+                        "Nazwa": "Informacje dyrektora",
+                        "Nieaktywny": False,
+                        "Zawartosc": [
+                            {
+                                "Nazwa": "01.09.2021 Rozpoczęcie roku szkolnego",
+                                "Dane": "Zapraszamy na apel<br />o godzinie 9:00",
+                                "Nieaktywny": False,
+                                "Zawartosc": [],
+                            }
+                        ],
+                    }
+                ]
+            )
+
+        raise web.HTTPNotFound()
+
+    def _uczen(
+        self, request: web.Request, parts: list[str], account: int
+    ) -> web.Response:
+        school_id = parts[1]
+        instance = self._instance_index(school_id)
+        if instance is None:
+            raise web.HTTPNotFound()
+
+        action = "/".join(parts[2:])
+        if action == "Start":
+            return self._html("", self._uczen_start_page(instance))
+
+        if action == "Home.mvc/RefreshSession":
+            return self._json(None)
+
+        if action == "UczenDziennik.mvc/Get":
+            return self._json(self._registers(account, instance))
+
+        student = int(request.cookies.get("idBiezacyUczen", 0) or 0)
+        data = {
+            "Oceny.mvc/Get": lambda: self._grades(student),
+            "UwagiIOsiagniecia.mvc/Get": lambda: self._notes(student),
+            "Zebrania.mvc/Get": lambda: self._meetings(),
+            "PlanZajec.mvc/Get": lambda: self._timetable,
+            "Sprawdziany.mvc/Get": lambda: self._exams(student),
+            "Homework.mvc/Get": lambda: self._homework(student),
+        }.get(action)
+        if not data:
+            raise web.HTTPNotFound()
+
+        return self._json(data())
+
+    def _uczen_start_page(self, instance: int) -> str:
+        page = self._templates["uczen"]
+        page = page.replace("123456", self._school_id(instance))
+        page = page.replace("powiatwulkanowy", self.config.valid_symbol)
+        page = page.replace("fakelog.cf", HOST)
+        return page.replace("Wulkanowego nr 1 w", f"Wulkanowego nr {instance + 1} w")
+
+    # synthetic data
+
+    def _school_id(self, instance: int) -> str:
+        return str(123456 + instance)
+
+    def _instance_index(self, school_id: str) -> Optional[int]:
+        if not school_id.isdigit():
+            return None
+
+        i = int(school_id) - 123456
+        return i if 0 <= i < self.config.instances else None
+
+    def _unit_abbr(self, instance: int) -> str:
+        return f"Fake{self._school_id(instance)}"
+
+    def _units(self, account: int) -> list[dict]:
+        return [
+            {
+                "IdJednostkaSprawozdawcza": 6 + i,
+                "Skrot": self._unit_abbr(i),
+                "Id": account * 1000 + i,
+                "NazwaNadawcy": f"Jan Kowalski - U - ({self._unit_abbr(i)})",
+                "Role": [7],
+            }
+            for i in range(self.config.instances)
+        ]
+
+    def _registers(self, account: int, instance: int) -> list[dict]:
+        ret = []
+        for k in range(self.config.students):
+            n = (account * self.config.instances + instance) * 1000 + k + 1
+            level = 1 + k % 8
+            ret.append(
+                {
+                    "IsDziennik": True,
+                    "Id": n,
+                    "IdDziennik": n - k if self.config.shared_register else n,
+                    "IdPrzedszkoleDziennik": 0,
+                    "Nazwa": f"{level}A",
+                    "Poziom": level,
+                    "Symbol": "A",
+                    "DziennikRokSzkolny": 2021,
+                    "IdUczen": n,
+                    "UczenImie": "Jan",
+                    "UczenImie2": "Marek",
+                    "UczenNazwisko": "Kowalski",
+                    "UczenPelnaNazwa": f"{level}A 2021 - Jan Kowalski",
+                    "Okresy": [
+                        {
+                            "Id": n * 10 + p,
+                            "IdOddzial": n,
+                            "IdJednostkaSprawozdawcza": 6 + instance,
+                            "NumerOkresu": p,
+                            "Poziom": level,
+                            "DataOd": start,
+                            "DataDo": end,
+                            "IsLastOkres": p == 2,
+                        }
+                        for p, start, end in (
+                            (1, "2021-09-01 00:00:00", "2022-01-31 00:00:00"),
+                            (2, "2022-02-01 00:00:00", "2022-08-31 00:00:00"),
+                        )
+                    ],
+                }
+            )
+
+        return ret
+
+    def _grades(self, student: int) -> dict:
+        c = self.config
+        return {
+            "IsSrednia": True,
+            "IsPunkty": False,
+            "TypOcen": 0,
+            "IsOstatniSemestr": False,
+            "IsDlaDoroslych": False,
+            "Oceny": [
+                {
+                    "Przedmiot": f"Przedmiot {s + 1}",
+                    "WidocznyPrzedmiot": True,
+                    "Pozycja": s + 1,
+                    "Srednia": 0,
+                    "ProponowanaOcenaRoczna": "",
+                    "OcenaRoczna": "",
+                    "OcenyCzastkowe": [
+                        {
+                            "Wpis": str(1 + (student + s + i) % 6),
+                            "KolorOceny": 0,
+                            "KodKolumny": f"K{i + 1}",
+                            "NazwaKolumny": f"Kartkówka {i + 1}",
+                            "Waga": 1.0 + i % 3,
+                            "DataOceny": f"{1 + (s + i) % 28:02}.{1 + i % 10:02}.2021",
+                        }
+                        for i in range(c.grades)
+                    ],
+                }
+                for s in range(c.subjects)
+            ],
+            "OcenyOpisowe": [],
+        }
+
+    def _notes(self, student: int) -> dict:
+        return {
+            "Uwagi": [
+                {
+                    "DataWpisu": f"2021-10-{1 + i:02}T08:00:00",
+                    "Nauczyciel": "Kowalski Jan [JK]",
+                    "Kategoria": "Zachowanie",
+                    "TrescUwagi": f"Uwaga {i + 1}",
+                }
+                for i in range(student % 3)
+            ],
+            "Osiagniecia": ["Konkurs matematyczny"],
+        }
+
+    def _meetings(self) -> list[dict]:
+        return [
+            {
+                "Id": 1,
+                "TematZebrania": "Zebranie z rodzicami",
+                "Agenda": "",
+                "ObecniNaZebraniu": "",
+                "Tytul": "Zebranie, 01.10.2021 godzina 17:00, Sala 21",
+                "DataSpotkania": "2021-10-01T17:00:00",
+            }
+        ]
+
+    def _exams(self, student: int) -> list[dict]:
+        return [
+            {
+                "SprawdzianyGroupedByDayList": [
+                    {
+                        "Data": "2021-10-04T00:00:00",
+                        "Sprawdziany": [
+                            {
+                                "DataModyfikacji": "2021-09-27T12:00:00",
+                                "Nazwa": "Matematyka",
+                                "Rodzaj": 1 + student % 3,
+                                "Pracownik": "Kowalski Jan [JK]",
+                                "Opis": "Funkcje",
+                            }
+                        ],
+                    }
+                ]
+            }
+        ]
+
+    def _homework(self, student: int) -> list[dict]:
+        return [
+            {
+                "Date": "2021-10-04T00:00:00",
+                "Homework": [
+                    {
+                        "HomeworkId": student,
+                        "ModificationDate": "2021-10-01T12:00:00",
+                        "Date": "2021-10-04T00:00:00",
+                        "Subject": "Fizyka",
+                        "Description": escape("Zadania 1-5"),
+                        "Teacher": "Kowalski Jan [JK]",
+                        "Attachments": [],
+                    }
+                ],
+            }
+        ]
+
+
+async def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--accounts", type=int, default=1)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--maintenance-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    config = StandInConfig(
+        accounts=args.accounts,
+        latency=args.latency,
+        maintenance_rate=args.maintenance_rate,
+    )
+    server = StandIn(config)
+    await server.start(args.port)
+    print(f"Serving *.{server.host}, log in as {account_email(0)} / {PASSWORD}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
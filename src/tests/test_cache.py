@@ -0,0 +1,75 @@
+import asyncio
+from vulcan_scraper import paths
+from vulcan_scraper.cache import ResponseCache
+from vulcan_scraper.utils import request_key
+
+
+class Fetcher:
+    def __init__(self):
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(0)
+        return self.calls
+
+
+async def test_ttl():
+    cache = ResponseCache({paths.UCZEN.OCENY_GET: 0.05})
+    fetch = Fetcher()
+
+    assert await cache.get(paths.UCZEN.OCENY_GET, "a", fetch) == 1
+    assert await cache.get(paths.UCZEN.OCENY_GET, "a", fetch) == 1
+    await asyncio.sleep(0.06)
+    assert await cache.get(paths.UCZEN.OCENY_GET, "a", fetch) == 2
+
+    # not configured, not cached
+    assert await cache.get(paths.UCZEN.REFRESHSESSION, "b", fetch) == 3
+    assert await cache.get(paths.UCZEN.REFRESHSESSION, "b", fetch) == 4
+
+    assert cache.stats.hits == 1
+    assert cache.stats.misses == 2
+
+
+async def test_lru():
+    cache = ResponseCache(default_ttl=60, maxsize=2)
+    fetch = Fetcher()
+
+    await cache.get(None, "a", fetch)
+    await cache.get(None, "b", fetch)
+    await cache.get(None, "a", fetch)
+    await cache.get(None, "c", fetch)  # evicts b
+
+    assert len(cache) == 2
+    assert cache.stats.evictions == 1
+    assert await cache.get(None, "a", fetch) == 1
+    assert await cache.get(None, "b", fetch) == 4
+
+
+async def test_stale_while_revalidate():
+    cache = ResponseCache(default_ttl=0.01, stale_ttl=60)
+    fetch = Fetcher()
+
+    assert await cache.get(None, "a", fetch) == 1
+    await asyncio.sleep(0.02)
+
+    # stale value is served, a single refresh runs in the background
+    assert await cache.get(None, "a", fetch) == 1
+    assert await cache.get(None, "a", fetch) == 1
+    await asyncio.sleep(0.005)
+
+    assert fetch.calls == 2
+    assert cache.stats.stale_hits == 2
+    assert cache.stats.refreshes == 1
+    assert await cache.get(None, "a", fetch) == 2
+
+    await cache.close()
+
+
+def test_request_key():
+    a = request_key("post", "url", cookies={"a": "1", "b": "2"}, json={"okres": 1})
+    b = request_key("POST", "url", cookies={"b": "2", "a": "1"}, json={"okres": 1})
+    c = request_key("POST", "url", cookies={"b": "2", "a": "1"}, json={"okres": 2})
+
+    assert a == b
+    assert a != c
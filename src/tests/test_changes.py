@@ -0,0 +1,126 @@
+from copy import deepcopy
+from datetime import datetime, timedelta
+from vulcan_scraper.changes import ChangeFeed, ADDED, CHANGED, REMOVED
+
+
+def grade(entry: str, column: str, date: str = "01.10.2021") -> dict:
+    return {
+        "Wpis": entry,
+        "KolorOceny": 0,
+        "KodKolumny": column,
+        "NazwaKolumny": column,
+        "Waga": 1.0,
+        "DataOceny": date,
+    }
+
+
+def subject(name: str, grades: list[dict]) -> dict:
+    return {
+        "Przedmiot": name,
+        "WidocznyPrzedmiot": True,
+        "Pozycja": 1,
+        "Srednia": 0,
+        "ProponowanaOcenaRoczna": "",
+        "OcenaRoczna": "",
+        "OcenyCzastkowe": grades,
+    }
+
+
+GRADES = {
+    "Oceny": [
+        subject("Matematyka", [grade("5", "K1"), grade("4", "K2")]),
+        subject("Fizyka", [grade("3", "S1")]),
+    ]
+}
+
+
+def test_grades():
+    feed = ChangeFeed(None)
+
+    changes = feed.diff_grades(1, GRADES)
+    assert [c.action for c in changes] == [ADDED] * 3
+    assert changes[0].item.entry == "5"
+    assert changes[0].key[:2] == (1, "Matematyka")
+
+    assert feed.diff_grades(1, GRADES) == []
+
+    data = deepcopy(GRADES)
+    maths = data["Oceny"][0]["OcenyCzastkowe"]
+    maths[0]["Wpis"] = "6"
+    del maths[1]
+    maths.append(grade("2", "K3"))
+
+    changes = feed.diff_grades(1, data)
+    assert sorted((c.action, c.key[2][0]) for c in changes) == [
+        (ADDED, "K3"),
+        (CHANGED, "K1"),
+        (REMOVED, "K2"),
+    ]
+    assert next(c for c in changes if c.action == REMOVED).item is None
+
+    del data["Oceny"][1]
+    changes = feed.diff_grades(1, data)
+    assert [(c.kind, c.action, c.key[1]) for c in changes] == [
+        ("grade", REMOVED, "Fizyka")
+    ]
+
+
+def test_unchanged_subject_skipped(monkeypatch):
+    feed = ChangeFeed(None)
+    feed.diff_grades(1, GRADES)
+
+    data = deepcopy(GRADES)
+    data["Oceny"][1]["OcenyCzastkowe"].append(grade("1", "S2"))
+
+    built = []
+    monkeypatch.setattr(
+        "vulcan_scraper.changes.Grade", lambda **raw: built.append(raw) or raw
+    )
+    changes = feed.diff_grades(1, data)
+
+    assert len(changes) == 1
+    assert built == [grade("1", "S2")]
+
+
+def test_duplicate_keys():
+    feed = ChangeFeed(None)
+    data = {"Oceny": [subject("Matematyka", [grade("5", "K1"), grade("5", "K1")])]}
+
+    assert len(feed.diff_grades(1, data)) == 2
+
+    del data["Oceny"][0]["OcenyCzastkowe"][0]
+    changes = feed.diff_grades(1, data)
+    assert [(c.action, c.key[-1]) for c in changes] == [(REMOVED, 1)]
+
+
+def test_achievements():
+    feed = ChangeFeed(None)
+
+    changes = feed.diff_notes({"Uwagi": [], "Osiagniecia": ["Konkurs"]})
+    assert [(c.kind, c.action, c.item) for c in changes] == [
+        ("achievement", ADDED, "Konkurs")
+    ]
+    assert feed.diff_notes({"Uwagi": [], "Osiagniecia": ["Konkurs"]}) == []
+
+
+def test_homework_weeks_bounded():
+    feed = ChangeFeed(None, homework_weeks=2)
+    mondays = [datetime(2021, 10, 4) + timedelta(weeks=i) for i in range(10)]
+    week = [{"Date": "2021-10-04 00:00:00", "Homework": []}]
+
+    for monday in mondays:
+        assert feed.diff_homework(monday, week) == []
+        assert len(feed._scopes) <= 2
+
+    assert list(feed._scopes) == [
+        ("homework", "2021-11-29"),
+        ("homework", "2021-12-06"),
+    ]
+
+    # polling a remembered week keeps it, the oldest one is dropped instead
+    feed.diff_homework(mondays[-2], week)
+    feed.diff_homework(mondays[0], week)
+    assert list(feed._scopes) == [
+        ("homework", "2021-11-29"),
+        ("homework", "2021-10-04"),
+    ]
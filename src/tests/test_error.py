@@ -12,8 +12,9 @@ def check(filename: str, error: type):
     with open(filename) as f:
         text = f.read()
 
-    with raises(error):
-        check_for_vulcan_error(text)
+    for fast in (True, False):
+        with raises(error):
+            check_for_vulcan_error(text, fast=fast)
 
 
 def test_credentials():
@@ -30,3 +31,17 @@ def test_database():
 
 def test_unexpected():
     check("resources/error/nieoczekiwany.html", VulcanException)
+
+
+def test_no_error():
+    for filename in (
+        "resources/login/cufs.html",
+        "resources/login/adfs.html",
+        "resources/uczen/start.html",
+        "resources/uonetplus/start.html",
+    ):
+        with open(filename) as f:
+            text = f.read()
+
+        check_for_vulcan_error(text, fast=True)
+        check_for_vulcan_error(text, fast=False)
@@ -0,0 +1,138 @@
+import csv
+import json
+import pytest
+from vulcan_scraper.error import ScraperException
+from vulcan_scraper.export import Exporter
+from vulcan_scraper.model import GradesData, Homework, NotesAndAchievementsData
+
+
+def grades(n: int) -> GradesData:
+    return GradesData(
+        IsSrednia=True,
+        IsPunkty=False,
+        TypOcen=0,
+        IsOstatniSemestr=False,
+        IsDlaDoroslych=False,
+        Oceny=[
+            {
+                "Przedmiot": "Matematyka",
+                "WidocznyPrzedmiot": True,
+                "Pozycja": 1,
+                "Srednia": 4.0,
+                "ProponowanaOcenaRoczna": "",
+                "OcenaRoczna": "",
+                "OcenyCzastkowe": [
+                    {
+                        "Wpis": str(1 + i % 6),
+                        "KolorOceny": 0,
+                        "KodKolumny": f"K{i}",
+                        "NazwaKolumny": f"Kartkówka {i}",
+                        "Waga": 1.0,
+                        "DataOceny": "05.10.2021",
+                    }
+                    for i in range(n)
+                ],
+            }
+        ],
+        OcenyOpisowe=[],
+    )
+
+
+class FakeStudent:
+    def __init__(self, id: int, n: int):
+        self.id = id
+        self.school_id = "123456"
+        self.n = n
+
+    async def get_grades(self, *, period: int = 0):
+        return grades(self.n)
+
+    async def get_notes_and_achievements(self):
+        return NotesAndAchievementsData(Uwagi=[], Osiagniecia=[])
+
+    async def get_exams(self, week_day):
+        return []
+
+    async def get_homework(self, week_day):
+        return [
+            Homework(
+                HomeworkId=self.id,
+                ModificationDate="2021-10-01T12:00:00",
+                Date="2021-10-04T00:00:00",
+                Subject="Fizyka",
+                Description="Zadania 1-5",
+                Teacher="Jan Kowalski",
+                Attachments=[],
+            )
+        ]
+
+    def __str__(self):
+        return str(self.id)
+
+
+async def test_export_ndjson(tmp_path):
+    async def students():
+        for i in range(3):
+            yield FakeStudent(i, 5)
+
+    counts = await Exporter(str(tmp_path), batch_size=4).export(students())
+    assert counts == {"grades": 15, "notes": 0, "exams": 0, "homework": 3}
+
+    lines = (tmp_path / "grades.ndjson").read_text(encoding="utf-8").splitlines()
+    rows = [json.loads(line) for line in lines]
+    assert len(rows) == 15
+    assert rows[-1]["student_id"] == 2
+    assert rows[0]["date"] == "2021-10-05T00:00:00"
+    assert rows[0]["description"] == "Kartkówka 0"
+
+
+async def test_export_csv(tmp_path):
+    exporter = Exporter(str(tmp_path), format="csv", kinds=["homework"])
+    counts = await exporter.export([FakeStudent(1, 0), FakeStudent(2, 0)])
+    assert counts == {"homework": 2}
+    assert not (tmp_path / "grades.csv").exists()
+
+    with open(tmp_path / "homework.csv", encoding="utf-8", newline="") as f:
+        rows = list(csv.DictReader(f))
+
+    assert [r["id"] for r in rows] == ["1", "2"]
+    assert rows[0]["entry_date"] == "2021-10-01T12:00:00"
+
+
+async def test_export_arrow(tmp_path):
+    try:
+        import pyarrow
+    except ImportError:
+        with pytest.raises(ScraperException):
+            await Exporter(str(tmp_path), format="parquet").export([])
+        return
+
+    exporter = Exporter(str(tmp_path), format="arrow", batch_size=2)
+    await exporter.export([FakeStudent(1, 3)])
+    with pyarrow.ipc.open_file(str(tmp_path / "grades.arrow")) as f:
+        assert f.num_record_batches == 2
+        assert f.read_all().num_rows == 3
+
+
+async def test_export_errors(tmp_path):
+    class BrokenStudent(FakeStudent):
+        async def get_grades(self, *, period: int = 0):
+            raise ScraperException("Brak uprawnień")
+
+    exporter = Exporter(str(tmp_path), kinds=["grades", "homework"])
+    students = [FakeStudent(1, 2), BrokenStudent(2, 2), FakeStudent(3, 2)]
+    counts = await exporter.export(students)
+    assert counts == {"grades": 4, "homework": 3}
+
+    [(student, kind, error)] = exporter.errors
+    assert student is students[1]
+    assert kind == "grades"
+    assert isinstance(error, ScraperException)
+
+
+def test_export_invalid():
+    with pytest.raises(ValueError):
+        Exporter(".", format="xlsx")
+
+    with pytest.raises(ValueError):
+        Exporter(".", kinds=["timetable"])
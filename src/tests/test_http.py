@@ -0,0 +1,167 @@
+import json
+import pytest
+from vulcan_scraper.cache import ResponseCache
+from vulcan_scraper.error import ScraperException, VulcanException
+from vulcan_scraper.http import HTTP
+from vulcan_scraper.utils import unwrap_api_response
+
+
+def test_unwrap_api_response():
+    assert unwrap_api_response({"success": True, "data": [1]}, "GET /") == [1]
+
+    with pytest.raises(VulcanException, match="Brak uprawnień"):
+        unwrap_api_response(
+            {"success": False, "feedback": {"Message": "Brak uprawnień"}}, "GET /"
+        )
+
+    with pytest.raises(VulcanException, match="GET / res.success = False"):
+        unwrap_api_response({"success": False}, "GET /")
+
+    with pytest.raises(ScraperException):
+        unwrap_api_response([], "GET /")
+
+
+@pytest.mark.parametrize("backend", [None, json.loads])
+async def test_api_request_bytes(backend):
+    kwargs = {"json_loads": backend} if backend else {}
+    http = HTTP("fakelog.cf", **kwargs)
+    calls = []
+
+    async def send(verb, url, binary, endpoint, parse, **kwargs):
+        calls.append(endpoint)
+        return parse(b'{"success": true, "data": {"Oceny": []}}'), url
+
+    http._send = send
+    try:
+        assert await http.api_request("POST", "https://a/b", endpoint="/b") == {
+            "Oceny": []
+        }
+        assert calls == ["/b"]
+
+        async def invalid(verb, url, binary, endpoint, parse, **kwargs):
+            return parse(b"<html>"), url
+
+        http._send = invalid
+        with pytest.raises(ScraperException, match="JSON"):
+            await http.api_request("POST", "https://a/b")
+    finally:
+        await http.close()
+
+
+async def test_coalescing():
+    import asyncio
+
+    http = HTTP("fakelog.cf")
+    calls = 0
+
+    async def send(verb, url, binary, endpoint, parse, **kwargs):
+        nonlocal calls
+        calls += 1
+        n = calls
+        await asyncio.sleep(0.02)
+        return parse(json.dumps({"success": True, "data": n}).encode()), url
+
+    http._send = send
+    try:
+        url = "https://a/b"
+        tasks = [
+            asyncio.ensure_future(http.api_request("POST", url, cookies={"a": "1"}))
+            for _ in range(5)
+        ]
+        other = asyncio.ensure_future(http.api_request("POST", url, cookies={"a": "2"}))
+        await asyncio.sleep(0.005)
+        tasks[0].cancel()
+
+        assert await asyncio.gather(*tasks[1:]) == [1, 1, 1, 1]
+        assert await other == 2
+        assert calls == 2
+        assert http.stats.api_requests == 2
+        assert http.stats.coalesced == 4
+
+        # finished requests are not reused
+        assert await http.api_request("POST", url, cookies={"a": "1"}) == 3
+
+        http.coalesce = False
+        results = await asyncio.gather(
+            *[http.api_request("POST", url) for _ in range(2)]
+        )
+        assert sorted(results) == [4, 5]
+    finally:
+        await http.close()
+
+
+async def test_request_hooks():
+    from aiohttp import web
+    from aiohttp.test_utils import TestServer
+
+    async def handler(request: web.Request):
+        if request.path == "/redirect":
+            raise web.HTTPFound("/Oceny.mvc/Get")
+
+        if request.path == "/error":
+            return web.json_response({"success": False})
+
+        return web.json_response({"success": True, "data": [1, 2, 3]})
+
+    app = web.Application()
+    app.router.add_route("*", "/{path:.*}", handler)
+
+    async with TestServer(app) as server:
+        http = HTTP(f"{server.host}:{server.port}", ssl=False)
+        metrics = []
+        http.add_hook(metrics.append)
+        http.add_hook(lambda m: 1 / 0)  # a failing hook does not break requests
+        try:
+            url = http.build_url(path="/redirect")
+            assert await http.api_request("POST", url, endpoint="/redirect") == [
+                1,
+                2,
+                3,
+            ]
+
+            m = metrics[-1]
+            assert (m.method, m.endpoint, m.host) == ("POST", "/redirect", server.host)
+            assert (m.status, m.redirects, m.error) == (200, 1, None)
+            assert m.bytes == len(b'{"success": true, "data": [1, 2, 3]}')
+            assert 0 < m.ttfb <= m.total and 0 < m.parse <= m.total
+
+            with pytest.raises(VulcanException):
+                await http.api_request("GET", http.build_url(path="/error"))
+
+            assert isinstance(metrics[-1].error, VulcanException)
+            assert metrics[-1].endpoint is None
+
+            http.remove_hook(metrics.append)
+            await http.request("GET", url)
+            assert len(metrics) == 2
+        finally:
+            await http.close()
+
+
+async def test_response_cache():
+    http = HTTP("fakelog.cf", cache=ResponseCache(default_ttl=60))
+    calls = 0
+
+    async def send(verb, url, binary, endpoint, parse, **kwargs):
+        nonlocal calls
+        calls += 1
+        return parse(b'{"success": true, "data": []}'), url
+
+    http._send = send
+    try:
+        args = ("powiatwulkanowy", "123456", {}, {})
+        for _ in range(3):
+            assert await http.uczen_get_meetings(*args) == []
+
+        assert calls == 1
+        assert len(http.cache) == 1
+        assert http.cache.stats.misses == 1
+        assert http.cache.stats.hits == 2
+
+        # every refresh has a new _dc, so it is sent and not stored
+        await http.uczen_refresh_session("powiatwulkanowy", "123456")
+        await http.uczen_refresh_session("powiatwulkanowy", "123456")
+        assert calls == 3
+        assert len(http.cache) == 1
+    finally:
+        await http.close()
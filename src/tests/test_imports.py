@@ -0,0 +1,52 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+import vulcan_scraper
+
+# seconds, generous enough for slow CI machines, most of it is aiohttp
+IMPORT_BUDGET = 1.5
+
+SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+from vulcan_scraper import VulcanWeb
+elapsed = time.perf_counter() - start
+print(json.dumps({"elapsed": elapsed, "modules": sorted(sys.modules)}))
+"""
+
+
+def run_isolated(script: str) -> dict:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(sys.path)
+    res = subprocess.run(
+        [sys.executable, "-c", script], env=env, capture_output=True, check=True
+    )
+    return json.loads(res.stdout)
+
+
+def test_import_time():
+    res = run_isolated(SCRIPT)
+    assert res["elapsed"] < IMPORT_BUDGET
+
+    # the parsers are only imported when first used
+    assert "bs4" not in res["modules"]
+    assert "lxml" not in res["modules"]
+
+
+def test_package_import_is_light():
+    res = run_isolated(
+        SCRIPT.replace("from vulcan_scraper import VulcanWeb", "import vulcan_scraper")
+    )
+    assert "aiohttp" not in res["modules"]
+
+
+def test_lazy_attributes():
+    from vulcan_scraper.client import VulcanWeb
+
+    assert vulcan_scraper.VulcanWeb is VulcanWeb
+    assert "Exporter" in dir(vulcan_scraper)
+    with pytest.raises(AttributeError):
+        vulcan_scraper.Missing
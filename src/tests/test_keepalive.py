@@ -0,0 +1,127 @@
+import asyncio
+from types import SimpleNamespace
+from pytest import fixture
+from vulcan_scraper import keepalive as keepalive_module
+from vulcan_scraper.error import NotLoggedInException
+from vulcan_scraper.keepalive import KeepAlive
+
+
+class FakeStudent:
+    def __init__(self, school_id: str):
+        self.school_id = school_id
+
+
+class FakeHTTP:
+    def __init__(self, client):
+        self.client = client
+        self.refreshed = []
+
+    async def uczen_refresh_session(self, symbol: str, schoolid: str):
+        if self.client.expired:
+            raise NotLoggedInException
+
+        self.refreshed.append((symbol, schoolid))
+
+
+class FakeClient:
+    def __init__(self, *school_ids: str):
+        self.email = "jan@fakelog.cf"
+        self.symbol = "powiatwulkanowy"
+        self.logged_in = True
+        self.expired = False
+        self.students = [FakeStudent(i) for i in school_ids]
+        self.http = FakeHTTP(self)
+        self._login_count = 1
+        self.relogins = 0
+
+    async def relogin(self, login_count=None):
+        self.relogins += 1
+        self.expired = False
+
+
+class SimulatedTime:
+    """A clock that only moves when the keepalive sleeps, up to `run_until`"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.until = 0.0
+        self.idle = asyncio.Event()
+        self._advanced = asyncio.Event()
+
+    def clock(self) -> float:
+        return self.now
+
+    async def sleep(self, delay: float):
+        while self.now + delay > self.until:
+            self.idle.set()
+            self._advanced.clear()
+            await self._advanced.wait()
+
+        self.now += delay
+        await asyncio.sleep(0)
+
+    async def run_until(self, t: float):
+        self.until = t
+        self.idle.clear()
+        self._advanced.set()
+        await self.idle.wait()
+        await asyncio.sleep(0)  # let the last refreshes finish
+
+
+@fixture
+def time(monkeypatch) -> SimulatedTime:
+    # first refreshes half an interval after adding, no jitter
+    monkeypatch.setattr(
+        keepalive_module, "random", SimpleNamespace(uniform=lambda a, b: (a + b) / 2)
+    )
+    return SimulatedTime()
+
+
+def make_keepalive(time: SimulatedTime, **kwargs) -> KeepAlive:
+    return KeepAlive(
+        interval=10, jitter=0, clock=time.clock, sleep=time.sleep, **kwargs
+    )
+
+
+async def test_refresh_per_instance(time: SimulatedTime):
+    a = FakeClient("123456", "123456", "123457")
+    b = FakeClient("123456")
+
+    async with make_keepalive(time) as keepalive:
+        keepalive.add(a)
+        keepalive.add(b)
+        await time.run_until(30)  # at 5, 15 and 25
+
+    assert a.http.refreshed.count(("powiatwulkanowy", "123456")) == 3
+    assert a.http.refreshed.count(("powiatwulkanowy", "123457")) == 3
+    assert len(b.http.refreshed) == 3
+
+
+async def test_remove_and_add_again(time: SimulatedTime):
+    a = FakeClient("123456")
+    b = FakeClient("123456")
+
+    async with make_keepalive(time) as keepalive:
+        keepalive.add(a)
+        keepalive.add(b)
+        await time.run_until(6)  # at 5
+        keepalive.remove(a)
+        await time.run_until(7)
+        keepalive.add(a)
+        await time.run_until(30)  # at 12 and 22, not also at 15 and 25
+
+    assert len(a.http.refreshed) == 3
+    assert len(b.http.refreshed) == 3
+
+
+async def test_relogin(time: SimulatedTime):
+    a = FakeClient("123456")
+    a.expired = True
+
+    async with make_keepalive(time) as keepalive:
+        keepalive.add(a)
+        await time.run_until(20)  # at 5, then at 15
+
+    assert a.relogins == 1
+    assert keepalive.stats.relogins == 1
+    assert keepalive.stats.refreshes == 1
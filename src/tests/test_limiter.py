@@ -0,0 +1,89 @@
+import asyncio
+from pytest import raises
+from vulcan_scraper.error import ServiceUnavailableException
+from vulcan_scraper.limiter import RateLimiter, HostLimit
+
+HOST: str = "uonetplus-uczen.fakelog.cf"
+
+
+async def test_concurrency_limit():
+    limiter = RateLimiter(HostLimit(rate=0, concurrency=2, max_concurrency=2))
+    running = 0
+    max_running = 0
+
+    async def request():
+        nonlocal running, max_running
+        async with limiter.slot(HOST):
+            running += 1
+            max_running = max(max_running, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+    tasks = [asyncio.ensure_future(request()) for _ in range(6)]
+    await asyncio.sleep(0.001)
+    [stats] = limiter.stats()
+    assert stats.in_flight == 2
+    assert stats.queued == 4
+
+    await asyncio.gather(*tasks)
+    assert max_running == 2
+    assert limiter.stats()[0].requests == 6
+
+
+async def test_aimd():
+    limiter = RateLimiter(HostLimit(rate=0, concurrency=8, max_concurrency=8))
+
+    with raises(ServiceUnavailableException):
+        async with limiter.slot(HOST):
+            raise ServiceUnavailableException
+
+    [stats] = limiter.stats()
+    assert stats.limit == 4
+    assert stats.congested == 1
+
+    for _ in range(40):
+        async with limiter.slot(HOST):
+            pass
+
+    assert limiter.stats()[0].limit == 8
+
+
+async def test_cancelled_not_recorded():
+    limiter = RateLimiter(HostLimit(rate=0, concurrency=2))
+
+    async def request():
+        async with limiter.slot(HOST):
+            await asyncio.sleep(1)
+
+    task = asyncio.ensure_future(request())
+    await asyncio.sleep(0.001)
+    task.cancel()
+    with raises(asyncio.CancelledError):
+        await task
+
+    [stats] = limiter.stats()
+    assert stats.in_flight == 0
+    assert stats.requests == 0
+    assert stats.limit == 2
+
+
+async def test_token_bucket():
+    limiter = RateLimiter(HostLimit(rate=100, burst=2))
+
+    start = asyncio.get_running_loop().time()
+    for _ in range(4):
+        async with limiter.slot(HOST):
+            pass
+
+    # 2 from the burst, then 2 more at 100/s
+    assert asyncio.get_running_loop().time() - start >= 0.015
+
+
+def test_host_config():
+    uczen = HostLimit(concurrency=2)
+    cufs = HostLimit(concurrency=1)
+    limiter = RateLimiter(hosts={"uonetplus-uczen": uczen, "cufs.fakelog.cf": cufs})
+
+    assert limiter.config_for(HOST) is uczen
+    assert limiter.config_for("cufs.fakelog.cf") is cufs
+    assert limiter.config_for("cufs.vulcan.net.pl") is limiter.default
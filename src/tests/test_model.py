@@ -0,0 +1,150 @@
+from vulcan_scraper.model import (
+    GradesData,
+    HomeworkResponse,
+    LazyList,
+    NotesAndAchievementsData,
+)
+
+
+def grade(entry: str, date: str) -> dict:
+    return {
+        "Wpis": entry,
+        "KolorOceny": 0,
+        "KodKolumny": entry,
+        "NazwaKolumny": entry,
+        "Waga": 1.0,
+        "DataOceny": date,
+    }
+
+
+def grades_data() -> dict:
+    return {
+        "IsSrednia": True,
+        "IsPunkty": False,
+        "TypOcen": 0,
+        "IsOstatniSemestr": False,
+        "IsDlaDoroslych": False,
+        "Oceny": [
+            {
+                "Przedmiot": name,
+                "WidocznyPrzedmiot": True,
+                "Pozycja": i,
+                "Srednia": 4.0 + i,
+                "ProponowanaOcenaRoczna": "",
+                "OcenaRoczna": "",
+                "OcenyCzastkowe": [
+                    grade("5", "03.11.2021"),
+                    grade("3", "20.09.2021"),
+                    grade("4", "01.10.2021"),
+                ],
+            }
+            for i, name in enumerate(["Matematyka", "Fizyka", "Chemia"])
+        ],
+        "OcenyOpisowe": [],
+    }
+
+
+def test_lazy_list():
+    calls = []
+
+    def factory(x):
+        calls.append(x)
+        return x * 2
+
+    items = LazyList([1, 2, 3], factory)
+    assert len(items) == 3 and items.decoded == 0
+
+    assert items[-1] == 6
+    assert items[2] == 6
+    assert calls == [3]
+
+    assert list(items) == [2, 4, 6]
+    assert items[:2] == [2, 4]
+    assert calls == [3, 1, 2]
+
+
+def test_lazy_grades_match_eager():
+    eager = GradesData(**grades_data())
+    lazy = GradesData(lazy=True, **grades_data())
+
+    assert lazy.subjects.decoded == 0
+
+    for e, l in zip(eager.subjects, lazy.subjects):
+        assert e.subject_name == l.subject_name
+        assert [g.entry for g in e.grades] == [g.entry for g in l.grades]
+        assert [g.date for g in e.grades] == [g.date for g in l.grades]
+
+
+def test_lazy_get_subject():
+    data = GradesData(lazy=True, **grades_data())
+
+    subject = data.get_subject("Fizyka")
+    assert subject.average == 5.0
+    assert data.subjects.decoded == 1
+    assert subject.grades.decoded == 0
+    assert subject.grades[0].entry == "3"
+
+    assert data.get_subject("Biologia") is None
+    assert GradesData(**grades_data()).get_subject("Chemia").position == 2
+
+
+def test_lazy_homework():
+    raw = [
+        {
+            "Date": "2021-10-04T00:00:00",
+            "Homework": [
+                {
+                    "HomeworkId": 1,
+                    "ModificationDate": "2021-10-01T12:00:00",
+                    "Date": "2021-10-04T00:00:00",
+                    "Subject": "Matematyka",
+                    "Description": "Zadania 1-5",
+                    "Teacher": "Kowalski Jan [JK]",
+                    "Attachments": [],
+                }
+            ],
+        }
+    ]
+    res = HomeworkResponse(raw, lazy=True)
+    assert res.days.decoded == 0
+    assert res.days[0].homework[0].description == "Zadania 1-5"
+
+
+def test_memoized_dates():
+    from datetime import datetime, time
+    from vulcan_scraper.utils import parse_date, parse_isodatetime, parse_time
+
+    assert parse_date("05.10.2021") == datetime(2021, 10, 5)
+    assert parse_date("05.10.2021") is parse_date("05.10.2021")
+    assert parse_date("05.10.2021 12:30", "%d.%m.%Y %H:%M") == datetime(
+        2021, 10, 5, 12, 30
+    )
+    assert parse_isodatetime("2021-10-05T08:00:00") == datetime(2021, 10, 5, 8)
+    assert parse_time("08:00") == time(8)
+
+
+def note(date: str) -> dict:
+    return {
+        "DataWpisu": date,
+        "Nauczyciel": "Jan Kowalski",
+        "Kategoria": date,
+        "TrescUwagi": "",
+    }
+
+
+def test_lazy_notes_match_eager():
+    # string order differs from the datetime order
+    data = {
+        "Uwagi": [
+            note("2021-10-05T10:00:00+02:00"),
+            note("2021-10-05T09:30:00+00:00"),
+            note("2021-10-04T23:00:00-03:00"),
+        ],
+        "Osiagniecia": [],
+    }
+    eager = NotesAndAchievementsData(**data)
+    lazy = NotesAndAchievementsData(lazy=True, **data)
+
+    dates = [n.date for n in eager.notes]
+    assert dates == sorted(dates)
+    assert [n.category for n in lazy.notes] == [n.category for n in eager.notes]
@@ -0,0 +1,37 @@
+from pytest import raises
+from vulcan_scraper import VulcanPool, VulcanWeb
+from vulcan_scraper.error import HTTPException
+
+
+async def test_shared_connector():
+    async with VulcanPool(host="fakelog.cf", limit_per_host=4) as pool:
+        a = pool.add(email="a@fakelog.cf", password="a")
+        b = pool.add(email="b@fakelog.cf", password="b")
+
+        assert a.http.session.connector is pool.connector
+        assert b.http.session.connector is pool.connector
+        assert a.http.session.cookie_jar is not b.http.session.cookie_jar
+        assert pool.connector.limit_per_host == 4
+
+        assert await pool.logout_all() == [None, None]
+
+    assert pool.connector.closed
+    assert a.http.session.closed and b.http.session.closed
+
+
+async def test_close_after_failed_logout():
+    async def logout():
+        raise HTTPException("logout failed")
+
+    v = VulcanWeb(host="fakelog.cf", email="a@fakelog.cf", password="a")
+    v.logout = logout
+    with raises(HTTPException):
+        await v.close()
+
+    assert v.http.session.closed
+
+    async with VulcanPool(host="fakelog.cf") as pool:
+        a = pool.add(email="a@fakelog.cf", password="a")
+        a.logout = logout
+
+    assert pool.connector.closed
@@ -0,0 +1,98 @@
+from http.cookies import SimpleCookie
+from aiohttp import CookieJar
+from pytest import raises
+from yarl import URL
+from vulcan_scraper import VulcanWeb
+from vulcan_scraper.error import NotLoggedInException, ScraperException
+from vulcan_scraper.model import ReportingUnit
+from vulcan_scraper.session import _is_host_only, load_session
+from vulcan_scraper.utils import Instance
+
+HOST: str = "fakelog.cf"
+EMAIL: str = "jan@fakelog.cf"
+
+HEADERS = {
+    "X-V-AppGuid": "guid",
+    "X-V-AppVersion": "1.0",
+    "X-V-RequestVerificationToken": "token",
+}
+UNIT = {
+    "IdJednostkaSprawozdawcza": 1,
+    "Skrot": "Fake123456",
+    "Id": 2,
+    "NazwaNadawcy": "Jan Kowalski",
+    "Role": [1],
+}
+
+
+async def test_export_resume():
+    async with VulcanWeb(host=HOST, email=EMAIL, password="jan123") as v:
+        with raises(NotLoggedInException):
+            v.export_session()
+
+        v.logged_in = True
+        v.symbol = v.uonetplus.symbol = "powiatwulkanowy"
+        v.uonetplus.permissions = "permissions"
+        v.uonetplus.instances = [Instance(id="123456", name="SZK1")]
+        v._units = [ReportingUnit(**UNIT)]
+        v._start_data["123456"] = (HEADERS, "Szkoła")
+        v.http.session.cookie_jar.update_cookies(
+            {"ASP.NET_SessionId": "abc"},
+            URL("http://uonetplus-uczen.fakelog.cf/powiatwulkanowy/123456/Start"),
+        )
+        v.http.session.cookie_jar.update_cookies(
+            SimpleCookie("shared=1; Domain=fakelog.cf; Path=/"),
+            URL("http://cufs.fakelog.cf/powiatwulkanowy"),
+        )
+
+        data = v.export_session()
+        v.logged_in = False
+
+    async with VulcanWeb(host=HOST, email=EMAIL, password="jan123") as v:
+        load_session(v, data)
+
+        assert v.logged_in
+        assert v.symbol == "powiatwulkanowy"
+        assert v.uonetplus.permissions == "permissions"
+        assert v.uonetplus.instances == [Instance(id="123456", name="SZK1")]
+        assert v._units[0].abbreviation == "Fake123456"
+        assert v._start_data == {"123456": (HEADERS, "Szkoła")}
+
+        cookies = v.http.session.cookie_jar.filter_cookies(
+            URL("http://uonetplus-uczen.fakelog.cf/powiatwulkanowy/123456/Start")
+        )
+        assert cookies["ASP.NET_SessionId"].value == "abc"
+
+        # host-only cookies are not sent to subdomains, domain cookies still are
+        other = v.http.session.cookie_jar.filter_cookies(
+            URL("http://a.uonetplus-uczen.fakelog.cf/powiatwulkanowy/123456/Start")
+        )
+        assert "ASP.NET_SessionId" not in other
+        assert other["shared"].value == "1"
+
+        v._cufs_logged_in = v.logged_in = False
+
+    async with VulcanWeb(host=HOST, email="other@fakelog.cf", password="a") as v:
+        with raises(ScraperException):
+            await v.resume(data)
+
+
+async def test_host_only_flag():
+    jar = CookieJar()
+    jar.update_cookies(
+        {"host": "1"}, URL("http://uonetplus-uczen.fakelog.cf/powiatwulkanowy/")
+    )
+    jar.update_cookies(
+        SimpleCookie("empty=; Path=/"), URL("http://uonetplus.fakelog.cf/")
+    )
+    jar.update_cookies(
+        SimpleCookie("shared=2; Domain=fakelog.cf; Path=/"),
+        URL("http://cufs.fakelog.cf/"),
+    )
+    jar.update_cookies(
+        SimpleCookie("tls=3; Domain=fakelog.cf; Path=/; Secure"),
+        URL("https://cufs.fakelog.cf/"),
+    )
+
+    flags = {morsel.key: _is_host_only(jar, morsel) for morsel in jar}
+    assert flags == {"host": True, "empty": True, "shared": False, "tls": False}
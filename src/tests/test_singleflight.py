@@ -0,0 +1,54 @@
+import asyncio
+from vulcan_scraper.singleflight import SingleFlight
+
+
+async def test_shared_fetch():
+    flights = SingleFlight()
+    calls = 0
+    stored = []
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return calls
+
+    tasks = [
+        asyncio.ensure_future(flights.run("a", fetch, stored.append)) for _ in range(3)
+    ]
+    await asyncio.sleep(0)
+    assert "a" in flights
+    tasks[0].cancel()
+
+    assert await asyncio.gather(*tasks[1:]) == [1, 1]
+    assert calls == 1
+    assert stored == [1]
+    assert len(flights) == 0
+
+
+async def test_clear_in_flight():
+    flights = SingleFlight()
+    stored = []
+
+    async def fetch():
+        await asyncio.sleep(0.01)
+        return "old"
+
+    task = asyncio.ensure_future(flights.run("a", fetch, stored.append))
+    await asyncio.sleep(0)
+    flights.clear()
+    assert "a" not in flights
+
+    # the caller still gets its result, but it is not stored
+    assert await task == "old"
+    assert stored == []
+
+
+async def test_cancel():
+    flights = SingleFlight()
+    task = asyncio.ensure_future(flights.run("a", lambda: asyncio.sleep(1)))
+    await asyncio.sleep(0)
+    await flights.cancel()
+
+    assert task.cancelled() or isinstance(task.exception(), asyncio.CancelledError)
+    assert len(flights) == 0
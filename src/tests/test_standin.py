@@ -0,0 +1,167 @@
+from datetime import datetime
+from vulcan_scraper import VulcanWeb
+from vulcan_scraper.error import (
+    BadCredentialsException,
+    NoValidSymbolException,
+    NotLoggedInException,
+    ServiceUnavailableException,
+)
+from vulcan_scraper.model import LazyList
+from pytest import raises
+from pytest_asyncio import fixture
+
+from standin import PASSWORD, StandIn, StandInConfig, account_email
+
+
+@fixture
+async def server():
+    async with StandIn(StandInConfig(accounts=2)) as s:
+        yield s
+
+
+def client(server: StandIn, i: int = 0, **kwargs) -> VulcanWeb:
+    return VulcanWeb(
+        host=server.host,
+        ssl=False,
+        connector=server.connector(),
+        email=account_email(i),
+        password=PASSWORD,
+        **kwargs,
+    )
+
+
+async def test_login_logout(server: StandIn):
+    async with client(server) as v:
+        v.password = "example"
+        with raises(BadCredentialsException):
+            await v.login()
+
+        assert not v.logged_in
+
+        v.password = PASSWORD
+        await v.login()
+        assert v.logged_in
+        assert v.symbol == "powiatwulkanowy"
+
+        await v.logout()
+        assert not v.logged_in
+
+    assert server.stats.bad_credentials == 1
+    assert server.stats.logins == 1
+
+
+async def test_students(server: StandIn):
+    async with client(server, 1) as v:
+        await v.login()
+        students = await v.get_students()
+        assert len(students) == 24
+
+        student = students[0]
+        assert student.first_name == "Jan"
+        assert student.school_id == "123456"
+        assert student.school_name == "Publiczna szkoła Wulkanowego nr 1 w fakelog.test"
+        assert student.school_abbreviation == "Fake123456"
+
+        snapshot = await student.snapshot()
+        assert snapshot.ok, snapshot.errors
+        assert snapshot.lucky_number == 2
+        assert snapshot.grades[0].subjects[0].grades
+
+
+async def test_shared_register():
+    async with StandIn(StandInConfig(students=3, shared_register=True)) as server:
+        async with client(server) as v:
+            await v.login()
+            students = await v.get_students()
+            assert len(students) == 9
+            assert len({(s.school_id, s.register_id) for s in students}) == 3
+
+            school_id, register_id = students[0].school_id, students[0].register_id
+            first, second = await v.get_students_by_ids(
+                [(school_id, register_id), (school_id, register_id, students[1].id)]
+            )
+            assert first.id == students[0].id
+            assert second.id == students[1].id
+
+
+async def test_invalid_symbol():
+    async with StandIn(StandInConfig(valid_symbol="asdf")) as server:
+        async with client(server) as v:
+            await v.login()
+            assert v.symbol == "asdf"
+
+        assert server.stats.invalid_symbols == 2  # powiatwulkanowy, warszawa
+
+    async with StandIn(StandInConfig(valid_symbol="gdansk")) as server:
+        async with client(server) as v:
+            with raises(NoValidSymbolException):
+                await v.login()
+
+
+async def test_maintenance():
+    async with StandIn(StandInConfig(maintenance_rate=1.0)) as server:
+        async with client(server) as v:
+            with raises(ServiceUnavailableException):
+                await v.login()
+
+
+async def test_resume(server: StandIn):
+    async with client(server) as v:
+        await v.login()
+        students = await v.get_students()
+        data = v.export_session()
+
+    async with client(server) as v:
+        # left over from an earlier session of this client
+        v._registers["123456"] = []
+        v._register_index["123456"] = {}
+
+        assert await v.resume(data)
+        assert v._registers == {} and v._register_index == {}
+        resumed = await v.get_students()
+        assert [s.id for s in resumed] == [s.id for s in students]
+        assert await resumed[0].get_meetings()
+
+    assert server.stats.logins == 1
+
+
+async def test_resume_expired(server: StandIn):
+    async with client(server) as v:
+        await v.login()
+        data = v.export_session()
+
+    server.expire_sessions()
+    async with client(server) as v:
+        assert not await v.resume(data)
+        assert v.logged_in
+        assert await v.get_students()
+
+    assert server.stats.logins == 2
+
+
+async def test_session_expiry(server: StandIn):
+    async with client(server) as v:
+        await v.login()
+        student = (await v.get_students())[0]
+
+        server.expire_sessions()
+        with raises(NotLoggedInException):
+            await student.get_meetings()
+
+        v.auto_relogin = True
+        assert await student.get_meetings()
+        assert server.stats.logins == 2
+
+
+async def test_lazy_exams_homework(server: StandIn):
+    async with client(server) as v:
+        await v.login()
+        student = (await v.get_students())[0]
+
+        for get in (student.get_exams, student.get_homework):
+            eager = await get(datetime.now())
+            lazy = await get(datetime.now(), lazy=True)
+            assert isinstance(lazy, LazyList)
+            assert lazy.decoded == 0
+            assert [repr(x) for x in lazy] == [repr(x) for x in eager]
+            assert lazy[0].teacher == eager[0].teacher
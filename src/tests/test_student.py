@@ -0,0 +1,224 @@
+import asyncio
+import gc
+import warnings
+from datetime import datetime, timedelta
+from pytest import raises
+from vulcan_scraper import Student
+from vulcan_scraper.error import NotLoggedInException, ScraperException
+from vulcan_scraper.timetable import TimetableDay
+from vulcan_scraper.utils import Instance
+
+
+class FakeTimetable:
+    def __init__(self, monday: datetime):
+        self.days = [
+            TimetableDay(date=monday + timedelta(days=i), lessons=[], additionals=[])
+            for i in reversed(range(5))
+        ]
+
+
+async def test_timetable_range():
+    student = Student.__new__(Student)
+    in_flight = 0
+    max_in_flight = 0
+
+    async def get_timetable(monday: datetime):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        # later weeks arrive first
+        await asyncio.sleep(0.05 - monday.day / 1000)
+        in_flight -= 1
+        return FakeTimetable(monday)
+
+    student.get_timetable = get_timetable
+
+    days = [
+        day.date
+        async for day in student.get_timetable_range(
+            datetime(2022, 1, 5, 12), datetime(2022, 2, 1), concurrency=2
+        )
+    ]
+
+    assert days[0] == datetime(2022, 1, 5)
+    assert days[-1] == datetime(2022, 2, 1)
+    assert days == sorted(days)
+    assert len(days) == 3 + 5 * 3 + 2
+    assert max_in_flight == 2
+
+
+async def test_relogin_on_expiry():
+    class FakeVulcan:
+        auto_relogin = False
+        _login_count = 1
+        _start_data = {}
+
+        async def relogin(self, login_count=None):
+            self._login_count += 1
+            self._start_data["123456"] = ({"X-V-AppGuid": "new"}, "Szkoła")
+
+    student = Student.__new__(Student)
+    student._v = FakeVulcan()
+    student.school_id = "123456"
+    student._headers = {"X-V-AppGuid": "old"}
+
+    calls = []
+
+    async def refresh():
+        calls.append(student._headers)
+        if len(calls) == 1:
+            raise NotLoggedInException
+
+    class FakeHTTP:
+        async def uczen_refresh_session(self, symbol, schoolid):
+            await refresh()
+
+    student._http = FakeHTTP()
+    student._symbol = "powiatwulkanowy"
+    student._instance = Instance(id="123456", name="SZK1")
+
+    with raises(NotLoggedInException):
+        await student.refresh_session()
+
+    calls.clear()
+    student._v.auto_relogin = True
+    await student.refresh_session()
+
+    assert calls == [{"X-V-AppGuid": "old"}, {"X-V-AppGuid": "new"}]
+    assert student._v._login_count == 2
+
+
+async def test_snapshot():
+    class FakePeriod:
+        pass
+
+    class FakeRegister:
+        periods = [FakePeriod(), FakePeriod()]
+
+    student = Student.__new__(Student)
+    student.register = FakeRegister()
+    student.full_name_with_year = "Jan Kowalski 2021/2022"
+    in_flight = 0
+    max_in_flight = 0
+
+    def fake(value):
+        async def get(*args, **kwargs):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            if isinstance(value, Exception):
+                raise value
+            return value(*args, **kwargs) if callable(value) else value
+
+        return get
+
+    student.get_grades = fake(lambda *, period: f"grades {period}")
+    student.get_notes_and_achievements = fake("notes")
+    student.get_meetings = fake([])
+    student.get_exams = fake(NotLoggedInException())
+    student.get_homework = fake(["homework"])
+    student.get_timetable = fake("timetable")
+    student.get_lucky_number = fake(7)
+
+    snapshot = await student.snapshot(concurrency=3)
+
+    assert snapshot.grades == {0: "grades 0", 1: "grades 1"}
+    assert snapshot.notes_and_achievements == "notes"
+    assert snapshot.homework == ["homework"]
+    assert snapshot.lucky_number == 7
+    assert snapshot.exams is None
+    assert list(snapshot.errors) == ["exams"]
+    assert not snapshot.ok
+    assert set(snapshot.timings) == {
+        "grades[0]",
+        "grades[1]",
+        "notes_and_achievements",
+        "meetings",
+        "exams",
+        "homework",
+        "timetable",
+        "lucky_number",
+    }
+    assert max_in_flight == 3
+
+    # validated before any request is made
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        with raises(ValueError):
+            await student.snapshot(parts=["grades", "attendance"])
+        gc.collect()
+
+    assert not [w for w in caught if "never awaited" in str(w.message)]
+
+
+class FakeRegister:
+    def __init__(self, register_id: int):
+        self.register_id = register_id
+        self.student_id = register_id * 10
+        self.kindergarten_register_id = 0
+        self.year = 2021
+        self.level = 1
+        self.symbol = "A"
+        self.student_first_name = "Jan"
+        self.student_middle_name = ""
+        self.student_last_name = "Kowalski"
+        self.student_full_name_with_year = "Jan Kowalski 2021/2022"
+        self.periods = []
+
+
+async def test_get_students_by_ids():
+    from vulcan_scraper import VulcanWeb
+
+    async with VulcanWeb(host="fakelog.cf", email="a", password="a") as v:
+        start_pages = []
+        register_calls = []
+
+        async def get_start_data(instance_id):
+            start_pages.append(instance_id)
+            await asyncio.sleep(0.01)
+            return {"X-V-AppGuid": instance_id}, "Szkoła"
+
+        async def get_registers(symbol, instance_id, headers):
+            register_calls.append(instance_id)
+            return [FakeRegister(i) for i in range(1, 4)]
+
+        v._fetch_uczen_start_data = get_start_data
+        v.http.uczen_get_registers = get_registers
+        v.logged_in = True
+        v.uonetplus.instances = [Instance("s1", "A"), Instance("s2", "B")]
+
+        ids = [("s1", 1), ("s2", 3), ("s1", 2), ("s1", 1)]
+        students, single = await asyncio.gather(
+            v.get_students_by_ids(ids),
+            Student.from_data(v, school_id="s1", register_id=3),
+        )
+
+        assert [(s.school_id, s.register_id) for s in students] == ids
+        assert single.register_id == 3
+        assert students[1]._headers == {"X-V-AppGuid": "s2"}
+        assert sorted(start_pages) == ["s1", "s2"]
+        assert sorted(register_calls) == ["s1", "s2"]
+
+        # cached until the next login
+        assert len(await v.get_students()) == 6
+        assert len(register_calls) == 2
+
+        with raises(ScraperException):
+            await v.get_students_by_ids([("s1", 4)])
+
+        with raises(ScraperException):
+            await v.get_students_by_ids([("s3", 1)])
+
+        # a fetch in flight during a logout or relogin does not bring back the old data
+        v._clear_start_data()
+        task = asyncio.ensure_future(v.get_students())
+        await asyncio.sleep(0.005)
+        assert len(v._instance_flights) == 2
+        v._clear_start_data()
+        assert len(await task) == 6
+        assert v._start_data == {}
+        assert v._registers == {}
+
+        v.logged_in = False
@@ -0,0 +1,62 @@
+import asyncio
+from vulcan_scraper import VulcanWeb
+from vulcan_scraper.error import InvalidSymbolException
+
+# symbol -> (delay, valid)
+SYMBOLS = {
+    "asdf": (0.01, False),
+    "warszawa": (0.05, True),
+    "powiatwulkanowy": (0.01, True),
+    "asdfsdf": (0.2, False),
+}
+
+
+class FakeCertResponse:
+    request_body = {}
+
+
+async def probe(v: VulcanWeb, concurrency: int, ordered: bool):
+    started = []
+    finished = []
+    in_flight = []
+
+    async def send_cert(symbol, data):
+        started.append(symbol)
+        in_flight.append(len(started) - len(finished))
+        delay, valid = SYMBOLS[symbol]
+        await asyncio.sleep(delay)
+        finished.append(symbol)
+        if not valid:
+            raise InvalidSymbolException
+        return "VParam"
+
+    v.http.uonetplus_send_cert = send_cert
+    found = await v._probe_symbols(
+        list(SYMBOLS), FakeCertResponse(), concurrency, ordered
+    )
+    return found, started, finished, max(in_flight)
+
+
+async def test_probe_ordered():
+    async with VulcanWeb(host="fakelog.cf", email="a", password="a") as v:
+        found, started, finished, _ = await probe(v, 4, True)
+
+    assert found == ("warszawa", "VParam")
+    assert started == list(SYMBOLS)
+    assert "asdfsdf" not in finished  # cancelled
+
+
+async def test_probe_first():
+    async with VulcanWeb(host="fakelog.cf", email="a", password="a") as v:
+        found, started, finished, _ = await probe(v, 4, False)
+
+    assert found == ("powiatwulkanowy", "VParam")
+    assert "warszawa" not in finished
+
+
+async def test_probe_bounded():
+    async with VulcanWeb(host="fakelog.cf", email="a", password="a") as v:
+        found, _, _, max_in_flight = await probe(v, 2, True)
+
+    assert found == ("warszawa", "VParam")
+    assert max_in_flight == 2
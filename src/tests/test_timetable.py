@@ -1,5 +1,8 @@
+import json
 from datetime import datetime
-from vulcan_scraper.timetable import parse_lesson
+from os import listdir
+from vulcan_scraper.model import TimetableResponse
+from vulcan_scraper.timetable import parse_lesson, Timetable
 
 PATH = "resources/uczen/timetable"
 HEADER = "1<br />08:00<br />08:45"
@@ -171,3 +174,59 @@ def test_1div_old_7():
     assert lesson.new_teacher == "Hugh Jass"
     assert lesson.new_group == ""
     assert lesson.new_comment == ""
+
+
+def check_single_pass(data: TimetableResponse):
+    single = Timetable(data)
+    separate = Timetable(data, single_pass=False)
+
+    assert single.days == separate.days
+
+
+def test_single_pass_response():
+    with open(f"{PATH}/1.json") as f:
+        data = json.load(f)["data"]
+
+    check_single_pass(TimetableResponse(**data))
+
+
+def test_single_pass_fixtures():
+    cells = []
+    for filename in sorted(listdir(PATH)):
+        if filename.endswith(".html"):
+            with open(f"{PATH}/{filename}") as f:
+                cells.append(f.read())
+
+    data = TimetableResponse(
+        Data="2022-01-10 00:00:00",
+        Headers=[{"Text": "Lekcja", "Distinction": False, "Flex": 0}]
+        + [
+            {"Text": f"dzień<br />{10 + i}.01.2022", "Distinction": False, "Flex": 1}
+            for i in range(len(cells))
+        ],
+        Rows=[[HEADER, *cells], ["2<br />08:50<br />09:35", *reversed(cells)]],
+        Additionals=[
+            {
+                "Header": "Poniedziałek, 10.01.2022",
+                "Descriptions": [
+                    {
+                        "Description": "<span>14:50 - 15:35 Zajęcia <b>dodatkowe</b></span>"
+                    },
+                    {"Description": "13:20 - 14:05 Koło"},
+                ],
+            }
+        ],
+    )
+
+    check_single_pass(data)
+
+
+def test_get_day():
+    with open(f"{PATH}/1.json") as f:
+        data = json.load(f)["data"]
+
+    timetable = Timetable(TimetableResponse(**data))
+    for day in timetable.days:
+        assert timetable.get_day(day.date.replace(hour=12)) is day
+
+    assert timetable.get_day(datetime(2000, 1, 1)) is None
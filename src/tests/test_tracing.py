@@ -0,0 +1,138 @@
+import asyncio
+import gc
+import weakref
+import pytest
+from vulcan_scraper import VulcanWeb
+from vulcan_scraper.error import BadCredentialsException
+from vulcan_scraper.tracing import SpanRecorder, span
+
+from standin import PASSWORD, StandIn, StandInConfig, account_email
+
+
+def names(root) -> list[tuple[int, str]]:
+    return [(depth, s.name) for depth, s in root.walk()]
+
+
+def test_span_recorder():
+    recorder = SpanRecorder(max_spans=2)
+    with span(recorder, "a", x=1, y=None) as a:
+        with span(recorder, "b"):
+            pass
+
+        with pytest.raises(ValueError):
+            with span(recorder, "c"):
+                raise ValueError
+
+    assert list(recorder.spans) == [a]
+    assert names(a) == [(0, "a"), (1, "b"), (1, "c")]
+    assert a.attributes == {"x": 1}
+    assert isinstance(a.children[1].error, ValueError)
+    assert a.duration >= a.children[0].duration > 0
+    assert "c" in a.format() and "!ValueError" in a.format()
+
+    with span(None, "a") as s:
+        assert s is None
+
+
+async def test_separate_recorders():
+    first, second = SpanRecorder(), SpanRecorder()
+    with span(first, "a") as a:
+        with span(second, "b") as b:
+            with span(first, "c"):
+                pass
+
+    assert list(first.spans) == [a]
+    assert names(a) == [(0, "a"), (1, "c")]
+    assert list(second.spans) == [b]
+    assert not b.children
+
+    # nothing keeps a recorder alive once its spans are closed
+    ref = weakref.ref(second)
+    del second
+    gc.collect()
+    assert ref() is None
+
+
+async def test_span_outlives_parent():
+    recorder = SpanRecorder()
+
+    async def child():
+        with span(recorder, "child"):
+            await asyncio.sleep(0.01)
+
+    with span(recorder, "parent") as parent:
+        task = asyncio.ensure_future(child())
+        await asyncio.sleep(0)
+
+    await task
+    assert not parent.children
+    assert [s.name for s in recorder.spans] == ["parent", "child"]
+
+
+async def test_measure_performance_deprecated():
+    from vulcan_scraper.utils import measure_performance
+
+    class Client:
+        tracer = SpanRecorder()
+
+        async def get(self):
+            return 1
+
+    with pytest.warns(DeprecationWarning):
+        Client.get = measure_performance(Client.get)
+
+    assert await Client().get() == 1
+    [s] = Client.tracer.spans
+    assert s.name.endswith("Client.get")
+
+
+async def test_login_spans():
+    recorder = SpanRecorder()
+    async with StandIn(StandInConfig(instances=2, students=1)) as server:
+        async with VulcanWeb(
+            host=server.host,
+            ssl=False,
+            connector=server.connector(),
+            email=account_email(0),
+            password=PASSWORD,
+            tracer=recorder,
+        ) as v:
+            await v.login()
+            login = recorder.spans[-1]
+            assert names(login)[:4] == [
+                (0, "VulcanWeb.login"),
+                (1, "login.credentials"),
+                (2, "login.get_login_info"),
+                (3, "http GET"),
+            ]
+            steps = [s.name for s in login.children]
+            assert steps == [
+                "login.credentials",
+                "login.extract_symbols",
+                "login.send_cert",
+                "login.extract_instances",
+                "login.reporting_units",
+            ]
+            request = login.children[0].children[0].children[0]
+            assert "/Account/LogOn" in request.attributes["endpoint"]
+            assert [c.name for c in request.children] == ["decode"]
+
+            students = await v.get_students()
+            root = recorder.spans[-1]
+            assert root.name == "VulcanWeb.get_students"
+            assert [c.name for c in root.children] == ["get_students.instance"] * 2
+
+            await students[0].get_grades()
+            grades = recorder.spans[-1]
+            assert names(grades) == [
+                (0, "Student.get_grades"),
+                (1, "http POST"),
+                (2, "decode"),
+                (1, "parse"),
+            ]
+
+            v.password = "wrong"
+            with pytest.raises(BadCredentialsException):
+                await v.login()
+
+            assert isinstance(recorder.spans[-1].error, BadCredentialsException)
@@ -0,0 +1,76 @@
+import asyncio
+from vulcan_scraper import VulcanWeb
+
+
+class FakeTile:
+    def __init__(self, name, content=()):
+        self.name = name
+        self.content = list(content)
+
+
+async def test_tiles_fetched_once():
+    async with VulcanWeb(host="fakelog.cf", email="a", password="a") as v:
+        calls = 0
+
+        async def get_lucky_numbers(symbol, permissions):
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return [
+                FakeTile(
+                    "Szkoła",
+                    [FakeTile("SP1", [FakeTile(f"Szczęśliwy numer: {calls}")])],
+                )
+            ]
+
+        v.http.uonetplus_get_lucky_numbers = get_lucky_numbers
+        v.uonetplus.symbol = "powiatwulkanowy"
+        v.uonetplus.permissions = "perm"
+
+        results = await asyncio.gather(
+            *[v.uonetplus.get_lucky_numbers() for _ in range(24)]
+        )
+        assert calls == 1
+        assert all(r[0].value == 1 for r in results)
+
+        # cached
+        assert (await v.uonetplus.get_lucky_numbers())[0].value == 1
+        assert calls == 1
+
+        v.uonetplus.tile_ttl = 0
+        assert (await v.uonetplus.get_lucky_numbers())[0].value == 2
+
+        v.uonetplus.tile_ttl = 60
+        v.uonetplus.clear_tiles()
+        assert (await v.uonetplus.get_lucky_numbers())[0].value == 3
+        assert calls == 3
+
+
+async def test_lucky_number_lookup():
+    async with VulcanWeb(host="fakelog.cf", email="a", password="a") as v:
+
+        async def get_lucky_numbers(symbol, permissions):
+            return [
+                FakeTile(
+                    "Szkoła A",
+                    [
+                        FakeTile("SP1", [FakeTile("Szczęśliwy numer: 1")]),
+                        FakeTile("SP2", [FakeTile("Szczęśliwy numer: 2")]),
+                    ],
+                ),
+                FakeTile("Szkoła B", [FakeTile("LO", [FakeTile("numer: 3")])]),
+            ]
+
+        v.http.uonetplus_get_lucky_numbers = get_lucky_numbers
+        v.uonetplus.symbol = "powiatwulkanowy"
+        v.uonetplus.permissions = "perm"
+
+        async def find(unit, instance):
+            number = await v.uonetplus.get_lucky_number(
+                unit_abbr=unit, instance_name=instance
+            )
+            return number.value
+
+        assert await find("SP2", "Szkoła A") == 2
+        assert await find("", "Szkoła B") == 3
+        assert await find("", "") == 1
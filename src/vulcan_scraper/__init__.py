@@ -1,5 +1,36 @@
-from .client import VulcanWeb
-from .student import Student
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .client import VulcanWeb
+    from .student import Student
+    from .pool import VulcanPool
+    from .export import Exporter
 
 __version__ = "0.2.1"
 __author__ = "drobotk"
+
+# imported on first access, so importing the package (e.g. for its exceptions or models)
+# does not load aiohttp
+_LAZY = {
+    "VulcanWeb": "client",
+    "Student": "student",
+    "VulcanPool": "pool",
+    "Exporter": "export",
+}
+
+__all__ = list(_LAZY)
+
+
+def __getattr__(name: str):
+    if name in _LAZY:
+        from importlib import import_module
+
+        value = getattr(import_module(f".{_LAZY[name]}", __name__), name)
+        globals()[name] = value
+        return value
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
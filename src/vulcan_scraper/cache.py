@@ -0,0 +1,127 @@
+import asyncio
+from collections import OrderedDict
+from dataclasses import dataclass
+from logging import getLogger
+from time import monotonic
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    stale_hits: int = 0
+    misses: int = 0
+    refreshes: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.stale_hits + self.misses
+        return (self.hits + self.stale_hits) / total if total else 0.0
+
+
+class ResponseCache:
+    """
+    In-memory cache of decoded API responses, used by `HTTP.api_request`.
+
+    `ttl` maps endpoint paths (from `paths`) to the number of seconds their responses stay fresh,
+    endpoints not in `ttl` use `default_ttl` and are not cached at all if it is 0.
+    Expired entries are served for up to `stale_ttl` more seconds while a single
+    background request refreshes them.
+    When more than `maxsize` entries are stored, the least recently used ones are evicted
+    """
+
+    def __init__(
+        self,
+        ttl: Optional[dict[str, float]] = None,
+        *,
+        default_ttl: float = 0,
+        stale_ttl: float = 0,
+        maxsize: int = 1024,
+    ):
+        self._log = getLogger(__name__)
+
+        self.ttl = dict(ttl or {})
+        self.default_ttl = default_ttl
+        self.stale_ttl = stale_ttl
+        self.maxsize = maxsize
+        self.stats = CacheStats()
+
+        # key -> (expiry time, value)
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._refreshing: dict[Hashable, asyncio.Task] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def ttl_for(self, endpoint: Optional[str]) -> float:
+        return self.ttl.get(endpoint, self.default_ttl)
+
+    async def get(
+        self,
+        endpoint: Optional[str],
+        key: Hashable,
+        fetch: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """Returns the cached value for `key`, calling `fetch` if there is no usable one"""
+
+        ttl = self.ttl_for(endpoint)
+        if ttl <= 0:
+            return await fetch()
+
+        entry = self._entries.get(key)
+        if entry:
+            expires, value = entry
+            now = monotonic()
+            if now < expires:
+                self.stats.hits += 1
+                self._entries.move_to_end(key)
+                return value
+
+            if now < expires + self.stale_ttl:
+                self.stats.stale_hits += 1
+                self._entries.move_to_end(key)
+                self._refresh(key, ttl, fetch)
+                return value
+
+        self.stats.misses += 1
+        value = await fetch()
+        self._store(key, value, ttl)
+        return value
+
+    def _store(self, key: Hashable, value: Any, ttl: float):
+        self._entries[key] = (monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    def _refresh(self, key: Hashable, ttl: float, fetch: Callable[[], Awaitable[Any]]):
+        if key in self._refreshing:
+            return
+
+        async def refresh():
+            try:
+                self._store(key, await fetch(), ttl)
+            except Exception as e:
+                self._log.debug(
+                    f"Background refresh failed: {e.__class__.__name__}: {e}"
+                )
+            finally:
+                self._refreshing.pop(key, None)
+
+        self.stats.refreshes += 1
+        self._refreshing[key] = asyncio.ensure_future(refresh())
+
+    def clear(self):
+        self._entries.clear()
+
+    async def close(self):
+        """Cancels pending background refreshes"""
+
+        tasks = list(self._refreshing.values())
+        self._refreshing.clear()
+        for task in tasks:
+            task.cancel()
+
+        await asyncio.gather(*tasks, return_exceptions=True)
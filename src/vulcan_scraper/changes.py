@@ -0,0 +1,222 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .student import Student
+
+import asyncio
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from hashlib import blake2b
+from typing import Any, Callable, Hashable, Iterable, Optional
+
+from .model import Grade, Note, Homework, Meeting
+from .utils import get_monday, reverse_teacher_name, sub_before
+
+ADDED: str = "added"
+CHANGED: str = "changed"
+REMOVED: str = "removed"
+
+KINDS = ("grades", "notes", "homework", "meetings")
+
+
+@dataclass
+class Change:
+    kind: str  # grade, note, achievement, homework, meeting
+    action: str  # added, changed, removed
+    key: tuple
+    item: Any = None  # None for removed items
+
+
+def fingerprint(data: Any) -> bytes:
+    """A compact hash of a raw JSON value"""
+
+    text = json.dumps(data, sort_keys=True, separators=(",", ":"), default=str)
+    return blake2b(text.encode(), digest_size=8).digest()
+
+
+def _keyed(
+    items: Iterable[dict], key: Callable[[dict], Hashable]
+) -> Iterable[tuple[tuple, dict]]:
+    # items without an id can share a key, number them in order
+    seen: dict[Hashable, int] = {}
+    for item in items:
+        k = key(item)
+        n = seen[k] = seen.get(k, -1) + 1
+        yield (k, n), item
+
+
+def _grade_key(raw: dict) -> Hashable:
+    return raw["KodKolumny"], raw["NazwaKolumny"], raw["DataOceny"]
+
+
+def _note_key(raw: dict) -> Hashable:
+    return raw.get("Id") or (raw["DataWpisu"], raw["Nauczyciel"], raw["Kategoria"])
+
+
+def _build_homework(raw: dict) -> Homework:
+    h = Homework(**raw)
+    h.teacher = reverse_teacher_name(sub_before(h.teacher, " ["))
+    return h
+
+
+class ChangeFeed:
+    """
+    Keeps a fingerprint of every grade, note, achievement, homework and meeting
+    of a student and reports what changed since the previous poll.
+
+    Scopes (a subject's grades, the notes, a week of homework...) whose raw
+    payload did not change are skipped without building any model objects.
+    The first poll reports everything as added. Only the `homework_weeks` most
+    recently polled weeks of homework are remembered, a week polled again after
+    that is reported as added again
+    """
+
+    def __init__(self, student: Student, homework_weeks: int = 4):
+        self._student = student
+        self._homework_weeks = homework_weeks
+        # scope -> (scope fingerprint, item key -> item fingerprint)
+        self._scopes: dict[tuple, tuple[bytes, dict[tuple, bytes]]] = {}
+
+    def _diff(
+        self,
+        scope: tuple,
+        payload: Any,
+        kind: str,
+        items: Iterable[tuple[tuple, Any]],
+        build: Callable[[Any], Any],
+    ) -> list[Change]:
+        fp = fingerprint(payload)
+        prev = self._scopes.get(scope)
+        if prev and prev[0] == fp:
+            return []
+
+        old = prev[1] if prev else {}
+        new = {}
+        changes = []
+        for key, raw in items:
+            item_fp = new[key] = fingerprint(raw)
+            if key not in old:
+                changes.append(Change(kind, ADDED, scope[1:] + key, build(raw)))
+            elif old[key] != item_fp:
+                changes.append(Change(kind, CHANGED, scope[1:] + key, build(raw)))
+
+        for key in old.keys() - new.keys():
+            changes.append(Change(kind, REMOVED, scope[1:] + key))
+
+        self._scopes[scope] = (fp, new)
+        return changes
+
+    def _drop_scopes(self, prefix: tuple, keep: set[tuple], kind: str) -> list[Change]:
+        changes = []
+        for scope in [s for s in self._scopes if s[: len(prefix)] == prefix]:
+            if scope not in keep:
+                _, items = self._scopes.pop(scope)
+                changes += [Change(kind, REMOVED, scope[1:] + k) for k in items]
+
+        return changes
+
+    def diff_grades(self, period_id: int, data: dict) -> list[Change]:
+        changes = []
+        scopes = set()
+        for subject in data["Oceny"]:
+            scope = ("grades", period_id, subject["Przedmiot"])
+            scopes.add(scope)
+            changes += self._diff(
+                scope,
+                subject,
+                "grade",
+                _keyed(subject["OcenyCzastkowe"], _grade_key),
+                lambda raw: Grade(**raw),
+            )
+
+        return changes + self._drop_scopes(("grades", period_id), scopes, "grade")
+
+    def diff_notes(self, data: dict) -> list[Change]:
+        return self._diff(
+            ("notes",),
+            data["Uwagi"],
+            "note",
+            _keyed(data["Uwagi"], _note_key),
+            lambda raw: Note(**raw),
+        ) + self._diff(
+            ("achievements",),
+            data["Osiagniecia"],
+            "achievement",
+            _keyed(data["Osiagniecia"], lambda raw: raw),
+            lambda raw: raw,
+        )
+
+    def diff_homework(self, monday: datetime, data: list) -> list[Change]:
+        homework = [h for day in data for h in day["Homework"]]
+        scope = ("homework", monday.date().isoformat())
+        # move the week to the end, the scopes are kept in the order they were polled in
+        if scope in self._scopes:
+            self._scopes[scope] = self._scopes.pop(scope)
+
+        changes = self._diff(
+            scope,
+            homework,
+            "homework",
+            _keyed(homework, lambda raw: raw["HomeworkId"]),
+            _build_homework,
+        )
+
+        # forget the least recently polled weeks, their homework was not removed
+        weeks = [s for s in self._scopes if s[0] == "homework"]
+        for old in weeks[: max(len(weeks) - self._homework_weeks, 0)]:
+            del self._scopes[old]
+
+        return changes
+
+    def diff_meetings(self, data: list) -> list[Change]:
+        return self._diff(
+            ("meetings",),
+            data,
+            "meeting",
+            _keyed(data, lambda raw: raw["Id"]),
+            lambda raw: Meeting(**raw),
+        )
+
+    async def poll(
+        self,
+        *,
+        period: int = 0,
+        week_day: Optional[datetime] = None,
+        kinds: Iterable[str] = KINDS,
+    ) -> list[Change]:
+        """
+        Fetches the raw data of `kinds` concurrently and returns the changes since the last poll.
+
+        Grades are fetched for the period with the index `period`, homework for the week `week_day` is in
+        """
+        s = self._student
+        http = s._http
+        args = (s._symbol, s._instance.id, s._headers, s._cookies)
+        monday = get_monday(week_day or datetime.now())
+        period_id = s.register.periods[period].id
+
+        fetchers = {
+            "grades": lambda: http.uczen_get_grades(*args, period_id, raw=True),
+            "notes": lambda: http.uczen_get_notes_achievements(*args, raw=True),
+            "homework": lambda: http.uczen_get_homework(
+                *args, monday, s.year, raw=True
+            ),
+            "meetings": lambda: http.uczen_get_meetings(*args, raw=True),
+        }
+        kinds = list(kinds)
+        results = await asyncio.gather(*[fetchers[k]() for k in kinds])
+
+        changes = []
+        for kind, data in zip(kinds, results):
+            if kind == "grades":
+                changes += self.diff_grades(period_id, data)
+            elif kind == "notes":
+                changes += self.diff_notes(data)
+            elif kind == "homework":
+                changes += self.diff_homework(monday, data)
+            elif kind == "meetings":
+                changes += self.diff_meetings(data)
+
+        return changes
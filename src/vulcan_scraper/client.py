@@ -1,7 +1,9 @@
 import logging
 import asyncio
 import sys
-from typing import Optional
+from typing import Iterable, Optional, Union
+
+from aiohttp import BaseConnector
 
 from .error import (
     ScraperException,
@@ -10,11 +12,16 @@ from .error import (
     NoValidSymbolException,
 )
 from .http import HTTP
+from .cache import ResponseCache
+from .limiter import RateLimiter
 from .student import Student
-from .model import CertificateResponse, ReportingUnit
+from .model import CertificateResponse, ReportingUnit, StudentRegister
 from .enum import LoginType
 from .uonetplus import Uonetplus
-from . import utils
+from .session import dump_session, load_session
+from .singleflight import SingleFlight
+from .tracing import Tracer, span, traced
+from . import paths, utils
 
 if (
     sys.version_info[0] == 3
@@ -24,6 +31,21 @@ if (
     asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
 
 
+# register id -> registers with that id, in server order.
+# Students sharing a class diary (e.g. siblings) have the same register id
+RegisterIndex = dict[int, list[StudentRegister]]
+
+
+def _find_register(
+    index: RegisterIndex, register_id: int, student_id: Optional[int] = None
+) -> Optional[StudentRegister]:
+    for register in index.get(register_id, ()):
+        if student_id is None or register.student_id == student_id:
+            return register
+
+    return None
+
+
 class VulcanWeb:
     def __init__(
         self,
@@ -33,6 +55,12 @@ class VulcanWeb:
         password: str,
         symbol: Optional[str] = None,
         ssl: bool = True,
+        connector: Optional[BaseConnector] = None,
+        cache: Optional[ResponseCache] = None,
+        limiter: Optional[RateLimiter] = None,
+        auto_relogin: bool = False,
+        tile_ttl: float = 600.0,
+        tracer: Optional[Tracer] = None,
     ):
         self._log = logging.getLogger(__name__)
 
@@ -45,26 +73,50 @@ class VulcanWeb:
         if self.symbol and not utils.re_valid_symbol.fullmatch(self.symbol):
             raise ValueError("Symbol can only contain letters and numbers")
 
-        self.http = HTTP(host, ssl)
+        self.http = HTTP(host, ssl, connector, cache, limiter)
 
-        self.uonetplus = Uonetplus(self)
+        # an OpenTelemetry tracer or a tracing.SpanRecorder, spans are emitted for logins,
+        # requests and Student getters with the network and parsing time separated
+        self.tracer = tracer
+        self.http.tracer = tracer
+
+        self.uonetplus = Uonetplus(self, tile_ttl=tile_ttl)
 
         self._cufs_logged_in = False
         self.logged_in = False
-        self._units: list[ReportingUnit] = []
+        self._units: list[ReportingUnit] = []  # see _get_unit
+        # instance id -> (X-V-* headers, school name)
+        self._start_data: dict[str, tuple[dict[str, str], str]] = {}
+        # instance id -> registers in the order the server returned them, see _get_instance_data
+        self._registers: dict[str, list[StudentRegister]] = {}
+        self._register_index: dict[str, RegisterIndex] = {}
+        self._instance_flights = SingleFlight()
         self.students: list[Student] = []
 
-    async def login(self):
-        """Attempts the login process using credentials passed in the constructor"""
+        # with auto_relogin, Student methods log in again and retry once on NotLoggedInException
+        self.auto_relogin = auto_relogin
+        self._login_count = 0  # successful logins so far
+        self._relogin_lock: Optional[asyncio.Lock] = None
+
+    @traced("VulcanWeb.login")
+    async def login(self, *, concurrency: int = 1, ordered: bool = True):
+        """
+        Attempts the login process using credentials passed in the constructor
+
+        If no symbol was passed, up to `concurrency` symbols from the certificate are probed at once.
+        With `ordered` the first valid symbol in certificate order is used, otherwise the first one to respond
+        """
 
         self._cufs_logged_in = False
         self.logged_in = False
+        self._clear_start_data()
 
         cres = await self._send_credentials()
         self._cufs_logged_in = True
 
         if not self.symbol:
-            symbols = utils.extract_symbols(cres.wresult)
+            with span(self.tracer, "login.extract_symbols"):
+                symbols = utils.extract_symbols(cres.wresult)
             self._log.debug(f"Symbols: { ', '.join(symbols) }")
 
         else:
@@ -75,17 +127,67 @@ class VulcanWeb:
         except ValueError:
             pass
 
-        for s in symbols:
-            if await self._login_uonetplus(s, cres):
-                self.logged_in = True
-                self.symbol = self.uonetplus.symbol
-                break
+        if concurrency > 1 and len(symbols) > 1:
+            found = await self._probe_symbols(symbols, cres, concurrency, ordered)
 
-        if not self.logged_in:
+        else:
+            found = None
+            for s in symbols:
+                text = await self._probe_symbol(s, cres)
+                if text is not None:
+                    found = s, text
+                    break
+
+        if not found:
             raise NoValidSymbolException(
                 f"Could not login on any symbol ({ ', '.join(symbols) })"
             )
 
+        await self._login_uonetplus(*found)
+        self.logged_in = True
+        self.symbol = self.uonetplus.symbol
+        self._login_count += 1
+
+    async def _probe_symbols(
+        self,
+        symbols: list[str],
+        cres: CertificateResponse,
+        concurrency: int,
+        ordered: bool,
+    ) -> Optional[tuple[str, str]]:
+        sem = asyncio.Semaphore(concurrency)
+
+        async def probe(symbol: str) -> Optional[tuple[str, str]]:
+            async with sem:
+                text = await self._probe_symbol(symbol, cres)
+                return (symbol, text) if text is not None else None
+
+        tasks = [asyncio.ensure_future(probe(s)) for s in symbols]
+        try:
+            for task in tasks if ordered else asyncio.as_completed(tasks):
+                found = await task
+                if found:
+                    return found
+
+        finally:
+            for task in tasks:
+                task.cancel()
+
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _probe_symbol(
+        self, symbol: str, cres: CertificateResponse
+    ) -> Optional[str]:
+        try:
+            with span(self.tracer, "login.send_cert", symbol=symbol):
+                text = await self.http.uonetplus_send_cert(symbol, cres.request_body)
+        except InvalidSymbolException:
+            return None
+
+        assert "VParam" in text
+        return text
+
+    @traced("login.credentials")
     async def _send_credentials(self) -> CertificateResponse:
         info = await self._get_login_info()
         self._log.debug(info)
@@ -103,6 +205,7 @@ class VulcanWeb:
                 "POST",
                 info.url,
                 data={"LoginName": login, "Password": self.password},
+                endpoint=paths.CUFS.START,
             )
 
         else:
@@ -127,29 +230,41 @@ class VulcanWeb:
                 data = {"Username": login, "Password": self.password}
 
             text, _ = await self.http.request("POST", info.url, data=data)
-            cres = CertificateResponse(text)
+            with span(self.tracer, "parse"):
+                cres = CertificateResponse(text)
 
-            text = await self.http.execute_cert_form(cres)
+            with span(self.tracer, "login.execute_cert_form"):
+                text = await self.http.execute_cert_form(cres)
 
-        return CertificateResponse(text)
-
-    async def _login_uonetplus(self, symbol: str, cres: CertificateResponse) -> bool:
-        try:
-            text = await self.http.uonetplus_send_cert(symbol, cres.request_body)
-        except InvalidSymbolException:
-            return False
-
-        assert "VParam" in text
+        with span(self.tracer, "parse"):
+            return CertificateResponse(text)
 
+    async def _login_uonetplus(self, symbol: str, text: str):
         self.uonetplus.symbol = symbol
         self.uonetplus.text = text
-        self.uonetplus.permissions = utils.get_script_param(text, "permissions")
-        self.uonetplus.instances = utils.extract_instances(text)
+        with span(self.tracer, "login.extract_instances"):
+            self.uonetplus.permissions = utils.get_script_param(text, "permissions")
+            self.uonetplus.instances = utils.extract_instances(text)
+        self.uonetplus.clear_tiles()
 
-        self._units = await self.http.uzytkownik_get_reporting_units(symbol)
+        with span(self.tracer, "login.reporting_units"):
+            self._units = await self.http.uzytkownik_get_reporting_units(symbol)
 
-        return True
+    @property
+    def _units(self) -> list[ReportingUnit]:
+        return self._unit_list
+
+    @_units.setter
+    def _units(self, units: list[ReportingUnit]):
+        self._unit_list = units
+        self._units_by_id: dict[int, ReportingUnit] = {}
+        for unit in units:
+            self._units_by_id.setdefault(unit.id, unit)
+
+    def _get_unit(self, unit_id: int) -> Optional[ReportingUnit]:
+        return self._units_by_id.get(unit_id)
 
+    @traced("VulcanWeb.get_students")
     async def get_students(self) -> list[Student]:
         """Fetches all students from all schools available on the account"""
 
@@ -160,7 +275,7 @@ class VulcanWeb:
 
         students = await asyncio.gather(
             *[
-                self._get_students_for_instance(instance, self._units)
+                self._get_students_for_instance(instance)
                 for instance in self.uonetplus.instances
             ]
         )
@@ -169,15 +284,137 @@ class VulcanWeb:
 
         return self.students
 
-    async def _get_uczen_start_data(self, instance_id: str) -> tuple[str, str]:
+    @traced("VulcanWeb.get_students_by_ids")
+    async def get_students_by_ids(
+        self, ids: Iterable[Union[tuple[str, int], tuple[str, int, int]]]
+    ) -> list[Student]:
+        """
+        Creates the students with the given `(school_id, register_id)` pairs, in the same order.
+
+        Students sharing a register (e.g. siblings in one class) are told apart by adding
+        their student id, `(school_id, register_id, student_id)`, otherwise the first one is used.
+
+        The start page and registers of each school are fetched once (and cached until the next login),
+        no matter how many of its students are requested
+        """
+        if not self.logged_in:
+            raise NotLoggedInException
+
+        ids = list(ids)
+        instances: dict[str, utils.Instance] = {}
+        for school_id, *_ in ids:
+            if school_id not in instances:
+                instance = self.uonetplus.get_instance(school_id)
+                if not instance:
+                    raise ScraperException(f"Invalid school_id provided: {school_id}")
+
+                instances[school_id] = instance
+
+        data = dict(
+            zip(
+                instances,
+                await asyncio.gather(*[self._get_instance_data(i) for i in instances]),
+            )
+        )
+
+        students = []
+        for school_id, register_id, *student_id in ids:
+            headers, school_name, _, index = data[school_id]
+            register = _find_register(index, register_id, *student_id)
+            if not register:
+                raise ScraperException(
+                    f"Invalid register_id provided: {register_id} ({school_id})"
+                )
+
+            students.append(
+                self._make_student(instances[school_id], headers, school_name, register)
+            )
+
+        return students
+
+    def _make_student(
+        self,
+        instance: utils.Instance,
+        headers: dict[str, str],
+        school_name: str,
+        register: StudentRegister,
+    ) -> Student:
+        unit = self._get_unit(register.periods[0].unit_id) if register.periods else None
+        return Student(self, instance, headers, school_name, register, unit)
+
+    def _clear_start_data(self):
+        self._start_data.clear()
+        self._registers.clear()
+        self._register_index.clear()
+        # fetches in flight must not store what they got with the old session
+        self._instance_flights.clear()
+
+    async def _get_instance_data(
+        self, instance_id: str
+    ) -> tuple[dict[str, str], str, list[StudentRegister], RegisterIndex]:
+        """
+        Returns the headers, school name, registers and register index of an instance.
+
+        They are fetched once per login, concurrent callers share the requests
+        """
+        if instance_id in self._start_data and instance_id in self._registers:
+            headers, school_name = self._start_data[instance_id]
+            return (
+                headers,
+                school_name,
+                self._registers[instance_id],
+                self._register_index[instance_id],
+            )
+
+        def store(
+            data: tuple[dict[str, str], str, list[StudentRegister], RegisterIndex],
+        ):
+            headers, school_name, registers, index = data
+            self._start_data[instance_id] = (headers, school_name)
+            self._registers[instance_id] = registers
+            self._register_index[instance_id] = index
+
+        return await self._instance_flights.run(
+            instance_id, lambda: self._fetch_instance_data(instance_id), store
+        )
+
+    async def _fetch_instance_data(
+        self, instance_id: str
+    ) -> tuple[dict[str, str], str, list[StudentRegister], RegisterIndex]:
+        with span(self.tracer, "get_students.instance", instance=instance_id):
+            if instance_id in self._start_data:
+                headers, school_name = self._start_data[instance_id]
+            else:
+                headers, school_name = await self._fetch_uczen_start_data(instance_id)
+
+            registers = await self.http.uczen_get_registers(
+                self.symbol, instance_id, headers
+            )
+            index: RegisterIndex = {}
+            for r in registers:
+                index.setdefault(r.register_id, []).append(r)
+
+            return headers, school_name, registers, index
+
+    async def _get_uczen_start_data(
+        self, instance_id: str
+    ) -> tuple[dict[str, str], str]:
+        headers, school_name = await self._fetch_uczen_start_data(instance_id)
+        self._start_data[instance_id] = (headers, school_name)
+        return headers, school_name
+
+    async def _fetch_uczen_start_data(
+        self, instance_id: str
+    ) -> tuple[dict[str, str], str]:
         text = await self.http.uczen_start(self.symbol, instance_id)
         if "VParam" not in text:
             raise ScraperException("VParam not found on uczen start page")
 
-        aft = utils.get_script_param(text, "antiForgeryToken")
-        ag = utils.get_script_param(text, "appGuid")
-        v = utils.get_script_param(text, "version")
-        school_name = utils.get_script_param(text, "organizationName")
+        with span(self.tracer, "parse"):
+            aft = utils.get_script_param(text, "antiForgeryToken")
+            ag = utils.get_script_param(text, "appGuid")
+            v = utils.get_script_param(text, "version")
+            school_name = utils.get_script_param(text, "organizationName")
 
         headers = {
             "X-V-AppGuid": ag,
@@ -187,30 +424,19 @@ class VulcanWeb:
         return headers, school_name
 
     async def _get_students_for_instance(
-        self, instance: utils.Instance, units: list[ReportingUnit]
+        self, instance: utils.Instance
     ) -> list[Student]:
-        students = []
-
-        headers, school_name = await self._get_uczen_start_data(instance.id)
-
-        registers = await self.http.uczen_get_registers(
-            self.symbol, instance.id, headers
-        )
-        for register in registers:
-            unit = (
-                utils.get_first(units, id=register.periods[0].unit_id)
-                if register.periods
-                else None
-            )
-            students.append(
-                Student(self, instance, headers, school_name, register, unit)
-            )
-
-        return students
+        headers, school_name, registers, _ = await self._get_instance_data(instance.id)
+        return [
+            self._make_student(instance, headers, school_name, register)
+            for register in registers
+        ]
 
+    @traced("login.get_login_info")
     async def _get_login_info(self):
         text, url = await self.http.get_login_page(self.symbol)
-        info = utils.extract_login_info(text)
+        with span(self.tracer, "parse"):
+            info = utils.extract_login_info(text)
         info.url = url
         return info
 
@@ -221,8 +447,83 @@ class VulcanWeb:
         if not self.students:
             raise ScraperException("Unable to refresh session: no students in cache")
 
-        await self.students[0].refresh_session()
+        instance_ids = {s.school_id for s in self.students}
+        await asyncio.gather(
+            *[self.http.uczen_refresh_session(self.symbol, i) for i in instance_ids]
+        )
+
+    async def relogin(self, login_count: Optional[int] = None):
+        """
+        Logs in again and updates the request headers of cached students.
+
+        If `login_count` is given and another login has happened since it was read
+        (e.g. a concurrent call already logged in again), nothing is done
+        """
+        if not self._relogin_lock:
+            self._relogin_lock = asyncio.Lock()
+
+        async with self._relogin_lock:
+            if login_count is not None and login_count != self._login_count:
+                return
+
+            self._log.debug("Session expired, logging in again")
+            await self.login()
+
+            instance_ids = {s.school_id for s in self.students}
+            start_data = dict(
+                zip(
+                    instance_ids,
+                    await asyncio.gather(
+                        *[self._get_uczen_start_data(i) for i in instance_ids]
+                    ),
+                )
+            )
+            for student in self.students:
+                student._headers, student.school_name = start_data[student.school_id]
+
+    def export_session(self) -> bytes:
+        """Exports the session state, so it can be restored later with `resume`"""
+
+        return dump_session(self)
+
+    def save_session(self, path: str):
+        """Exports the session state to a file"""
+
+        with open(path, "wb") as f:
+            f.write(self.export_session())
+
+    async def resume(
+        self, data: Optional[bytes] = None, *, path: Optional[str] = None
+    ) -> bool:
+        """
+        Restores a session exported with `export_session` or `save_session`.
 
+        If the restored session has already expired, the full login process is performed instead.
+        Returns whether the session was resumed without logging in again
+        """
+        if path is not None:
+            with open(path, "rb") as f:
+                data = f.read()
+
+        if data is None:
+            raise ValueError("Either data or path must be provided")
+
+        load_session(self, data)
+        if not self.uonetplus.instances:
+            return True
+
+        try:
+            await self.http.uczen_refresh_session(
+                self.symbol, self.uonetplus.instances[0].id
+            )
+        except NotLoggedInException:
+            self._log.debug("Restored session has expired, logging in again")
+            await self.login()
+            return False
+
+        return True
+
+    @traced("VulcanWeb.logout")
     async def logout(self):
         if self._cufs_logged_in:
             self._log.debug("Logging out...")
@@ -230,13 +531,17 @@ class VulcanWeb:
 
         self._cufs_logged_in = False
         self.logged_in = False
+        self._clear_start_data()
+        self.uonetplus.clear_tiles()
         self.http.session.cookie_jar.clear()
 
     async def close(self):
-        """Logs out and closes the client"""
+        """Logs out and closes the client, the HTTP session is closed even if logging out fails"""
 
-        await self.logout()
-        await self.http.close()
+        try:
+            await self.logout()
+        finally:
+            await self.http.close()
 
     async def __aenter__(self):
         return self
@@ -0,0 +1,335 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .student import Student
+
+import asyncio
+import csv
+from abc import ABC, abstractmethod
+import json
+import os
+from datetime import datetime
+from logging import getLogger
+from typing import Any, AsyncIterable, Iterable, Iterator, Optional, Union
+
+from .error import ScraperException
+
+EXPORT_KINDS = ("grades", "notes", "exams", "homework")
+
+# kind -> ((column, type), ...)
+COLUMNS: dict[str, tuple[tuple[str, type], ...]] = {
+    "grades": (
+        ("student_id", int),
+        ("school_id", str),
+        ("period", int),
+        ("subject", str),
+        ("entry", str),
+        ("symbol", str),
+        ("description", str),
+        ("weight", float),
+        ("date", datetime),
+    ),
+    "notes": (
+        ("student_id", int),
+        ("school_id", str),
+        ("date", datetime),
+        ("teacher", str),
+        ("category", str),
+        ("content", str),
+        ("points", str),
+    ),
+    "exams": (
+        ("student_id", int),
+        ("school_id", str),
+        ("date", datetime),
+        ("entry_date", datetime),
+        ("subject", str),
+        ("type", str),
+        ("teacher", str),
+        ("description", str),
+    ),
+    "homework": (
+        ("student_id", int),
+        ("school_id", str),
+        ("id", int),
+        ("date", datetime),
+        ("entry_date", datetime),
+        ("subject", str),
+        ("teacher", str),
+        ("description", str),
+    ),
+}
+
+
+def _rows(kind: str, student: Student, data: Any, period: int) -> Iterator[dict]:
+    ids = {"student_id": student.id, "school_id": student.school_id}
+    if kind == "grades":
+        for subject in data.subjects:
+            for g in subject.grades:
+                yield {
+                    **ids,
+                    "period": period,
+                    "subject": subject.subject_name,
+                    "entry": g.entry,
+                    "symbol": g.symbol,
+                    "description": g.description,
+                    "weight": g.weight,
+                    "date": g.date,
+                }
+    elif kind == "notes":
+        for n in data.notes:
+            yield {
+                **ids,
+                "date": n.date,
+                "teacher": n.teacher,
+                "category": n.category,
+                "content": n.content,
+                "points": n.points,
+            }
+    elif kind == "exams":
+        for e in data:
+            yield {
+                **ids,
+                "date": e.date,
+                "entry_date": e.entry_date,
+                "subject": e.subject,
+                "type": e.type,
+                "teacher": e.teacher,
+                "description": e.description,
+            }
+    elif kind == "homework":
+        for h in data:
+            yield {
+                **ids,
+                "id": h.id,
+                "date": h.date,
+                "entry_date": h.entry_date,
+                "subject": h.subject,
+                "teacher": h.teacher,
+                "description": h.description,
+            }
+
+
+class _Writer(ABC):
+    extension: str
+
+    def __init__(self, path: str, kind: str):
+        self.path = path
+        self.columns = COLUMNS[kind]
+
+    @abstractmethod
+    def write(self, rows: list[dict]): ...
+
+    def close(self):
+        pass
+
+
+class _NDJSONWriter(_Writer):
+    extension = "ndjson"
+
+    def __init__(self, path: str, kind: str):
+        super().__init__(path, kind)
+        self._f = open(path, "w", encoding="utf-8")
+
+    def write(self, rows: list[dict]):
+        self._f.writelines(
+            json.dumps(row, ensure_ascii=False, default=datetime.isoformat) + "\n"
+            for row in rows
+        )
+
+    def close(self):
+        self._f.close()
+
+
+class _CSVWriter(_Writer):
+    extension = "csv"
+
+    def __init__(self, path: str, kind: str):
+        super().__init__(path, kind)
+        self._f = open(path, "w", encoding="utf-8", newline="")
+        self._csv = csv.DictWriter(self._f, [name for name, _ in self.columns])
+        self._csv.writeheader()
+
+    def write(self, rows: list[dict]):
+        for row in rows:
+            self._csv.writerow(
+                {
+                    k: v.isoformat() if isinstance(v, datetime) else v
+                    for k, v in row.items()
+                }
+            )
+
+    def close(self):
+        self._f.close()
+
+
+class _ArrowWriter(_Writer):
+    extension = "arrow"
+
+    def __init__(self, path: str, kind: str):
+        super().__init__(path, kind)
+        try:
+            import pyarrow
+        except ImportError:
+            raise ScraperException(f"{self.extension} export requires pyarrow")
+
+        self._pa = pyarrow
+        types = {
+            int: pyarrow.int64(),
+            float: pyarrow.float64(),
+            str: pyarrow.string(),
+            datetime: pyarrow.timestamp("s"),
+        }
+        self.schema = pyarrow.schema([(n, types[t]) for n, t in self.columns])
+        self._writer = self._open()
+
+    def _open(self):
+        return self._pa.ipc.new_file(self.path, self.schema)
+
+    def write(self, rows: list[dict]):
+        batch = self._pa.RecordBatch.from_pylist(rows, schema=self.schema)
+        self._writer.write_batch(batch)
+
+    def close(self):
+        self._writer.close()
+
+
+class _ParquetWriter(_ArrowWriter):
+    extension = "parquet"
+
+    def _open(self):
+        import pyarrow.parquet
+
+        return pyarrow.parquet.ParquetWriter(self.path, self.schema)
+
+
+WRITERS: dict[str, type[_Writer]] = {
+    "ndjson": _NDJSONWriter,
+    "csv": _CSVWriter,
+    "arrow": _ArrowWriter,
+    "parquet": _ParquetWriter,
+}
+
+
+async def _aiter(students: Union[Iterable, AsyncIterable]):
+    if hasattr(students, "__aiter__"):
+        async for s in students:
+            yield s
+    else:
+        for s in students:
+            yield s
+
+
+class Exporter:
+    """
+    Streams the grades, notes, exams and homework of many students into one file per kind,
+    e.g. `grades.csv`, in the `directory`.
+
+    `format` is one of "ndjson", "csv", "arrow" or "parquet" (the last two need pyarrow).
+    Students are fetched one at a time and rows are written in batches of `batch_size`,
+    so memory use does not grow with the number of students.
+    `students` can also be an async iterable, e.g. one that logs in to each account in turn.
+
+    A kind that fails to download for a student is logged and skipped, the export goes on
+    with the other students. The failures of the last export are kept in `errors`
+    as (student, kind, exception) tuples
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        *,
+        format: str = "ndjson",
+        batch_size: int = 1000,
+        kinds: Iterable[str] = EXPORT_KINDS,
+    ):
+        self._log = getLogger(__name__)
+
+        self.directory = directory
+        self.format = format
+        self.batch_size = batch_size
+        self.kinds = tuple(kinds)
+        self.errors: list[tuple[Student, str, Exception]] = []
+
+        if format not in WRITERS:
+            raise ValueError(f"Unknown export format: {format}")
+
+        unknown = set(self.kinds) - COLUMNS.keys()
+        if unknown:
+            raise ValueError(f"Unknown export kinds: {', '.join(sorted(unknown))}")
+
+    def _fetch(self, student: Student, kind: str, period: int, week_day: datetime):
+        if kind == "grades":
+            return student.get_grades(period=period)
+        if kind == "notes":
+            return student.get_notes_and_achievements()
+        if kind == "exams":
+            return student.get_exams(week_day)
+        return student.get_homework(week_day)
+
+    async def export(
+        self,
+        students: Union[Iterable[Student], AsyncIterable[Student]],
+        *,
+        period: int = 0,
+        week_day: Optional[datetime] = None,
+    ) -> dict[str, int]:
+        """
+        Exports `students` and returns the number of rows written for each kind,
+        see `errors` for the students and kinds that were skipped.
+
+        Grades are exported for the period with the index `period`, exams and homework
+        for the week `week_day` is in (exams for the next 4 weeks)
+        """
+        week_day = week_day or datetime.now()
+        os.makedirs(self.directory, exist_ok=True)
+        self.errors = []
+
+        cls = WRITERS[self.format]
+        writers: dict[str, _Writer] = {}
+        batches: dict[str, list[dict]] = {k: [] for k in self.kinds}
+        counts = {k: 0 for k in self.kinds}
+
+        def flush(kind: str):
+            if batches[kind]:
+                writers[kind].write(batches[kind])
+                counts[kind] += len(batches[kind])
+                batches[kind] = []
+
+        try:
+            for kind in self.kinds:
+                path = os.path.join(self.directory, f"{kind}.{cls.extension}")
+                writers[kind] = cls(path, kind)
+
+            async for student in _aiter(students):
+                results = await asyncio.gather(
+                    *[self._fetch(student, k, period, week_day) for k in self.kinds],
+                    return_exceptions=True,
+                )
+                for kind, data in zip(self.kinds, results):
+                    if isinstance(data, BaseException):
+                        if not isinstance(data, Exception):
+                            raise data
+
+                        self._log.warning(
+                            f"Could not export {kind} of {student}: {data!r}"
+                        )
+                        self.errors.append((student, kind, data))
+                        continue
+
+                    for row in _rows(kind, student, data, period):
+                        batches[kind].append(row)
+                        if len(batches[kind]) >= self.batch_size:
+                            flush(kind)
+
+                self._log.debug(f"Exported {student}")
+
+            for kind in self.kinds:
+                flush(kind)
+
+        finally:
+            for writer in writers.values():
+                writer.close()
+
+        return counts
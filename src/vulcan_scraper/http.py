@@ -1,13 +1,24 @@
+from dataclasses import dataclass
 from logging import getLogger
-from aiohttp import ClientSession
-from json import loads
+from aiohttp import ClientResponse, ClientSession, BaseConnector, CookieJar
+from time import perf_counter
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Hashable,
+    Literal,
+    Optional,
+    Union,
+    overload,
+)
 from urllib.parse import quote
 from datetime import datetime
+from yarl import URL
 
 from . import paths
 from .error import ScraperException, HTTPException, VulcanException
 from .model import (
-    ApiResponse,
     CertificateResponse,
     ReportingUnit,
     StudentRegister,
@@ -19,18 +30,78 @@ from .model import (
     HomeworkResponse,
     UonetplusTileResponse,
 )
-from .utils import check_for_vulcan_error
+from .cache import ResponseCache
+from .limiter import RateLimiter
+from .singleflight import SingleFlight
+from .tracing import Tracer, span
+from .utils import check_for_vulcan_error, json_loads, request_key, unwrap_api_response
+
+
+@dataclass
+class HTTPStats:
+    api_requests: int = 0  # sent to the server (or the cache)
+    coalesced: int = 0  # answered by an identical request already in flight
+
+
+@dataclass
+class RequestMetrics:
+    """
+    Measurements of a single request, passed to the hooks registered with `HTTP.add_hook`.
+
+    `endpoint` is the path template from `paths` (e.g. `paths.UCZEN.OCENY_GET`), `None` for
+    requests outside of UONET+ (ADFS login forms). Times are in seconds: `ttfb` until the
+    response headers arrived, `total` until the body was read and parsed, `parse` spent
+    decoding the body and checking it for errors (and decoding JSON for API requests)
+    """
+
+    method: str
+    endpoint: Optional[str]
+    host: str
+    status: int = 0  # 0 if no response was received
+    redirects: int = 0
+    bytes: int = 0
+    ttfb: float = 0.0
+    total: float = 0.0
+    parse: float = 0.0
+    error: Optional[Exception] = None
+
+
+RequestHook = Callable[[RequestMetrics], None]
 
 
 class HTTP:
     SYMBOL_DEFAULT = "Default"
 
-    def __init__(self, host: str, ssl: bool = True):
+    def __init__(
+        self,
+        host: str,
+        ssl: bool = True,
+        connector: Optional[BaseConnector] = None,
+        cache: Optional[ResponseCache] = None,
+        limiter: Optional[RateLimiter] = None,
+        json_loads: Callable[[bytes], Any] = json_loads,
+        coalesce: bool = True,
+    ):
         self.base_host = host
         self.ssl = ssl
+        self.cache = cache
+        self.limiter = limiter
+        self.json_loads = json_loads
+        self.coalesce = coalesce
+        self.stats = HTTPStats()
+        self._in_flight = SingleFlight()
+        self.hooks: list[RequestHook] = []
+        self.tracer: Optional[Tracer] = None  # see VulcanWeb
 
         self._log = getLogger(__name__)
-        self.session = ClientSession()
+        if connector is not None:
+            # shared connector (see VulcanPool), the session must not close it
+            # and every client still needs a cookie jar of its own
+            self.session = ClientSession(
+                connector=connector, connector_owner=False, cookie_jar=CookieJar()
+            )
+        else:
+            self.session = ClientSession()
         self.session.headers.update(
             {
                 "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:93.0) Gecko/20100101 Firefox/93.0"
@@ -38,6 +109,11 @@ class HTTP:
         )
 
     async def close(self):
+        await self._in_flight.cancel()
+
+        if self.cache is not None:
+            await self.cache.close()
+
         if self.session:
             await self.session.close()
 
@@ -69,40 +145,203 @@ class HTTP:
 
         return url
 
-    async def request(self, verb: str, url: str, **kwargs) -> tuple[str, str]:
-        verb = verb.upper()
-        async with self.session.request(verb, url, **kwargs) as res:
-            for r in res.history:
-                self._log.debug(f"{r.status} {r.method} {r.url}")
+    def add_hook(self, hook: RequestHook):
+        """
+        Registers `hook` to be called with the `RequestMetrics` of every request sent,
+        e.g. to feed latency histograms and error counters to a metrics backend.
+
+        Hooks are called synchronously after each request and should be cheap.
+        Requests answered by the cache or by an identical request in flight are not reported
+        """
+        self.hooks.append(hook)
+
+    def remove_hook(self, hook: RequestHook):
+        self.hooks.remove(hook)
+
+    async def request(
+        self,
+        verb: str,
+        url: str,
+        *,
+        binary: bool = False,
+        endpoint: Optional[str] = None,
+        **kwargs,
+    ) -> tuple[Union[str, bytes], str]:
+        """
+        Sends a request and returns the response body and the final URL.
 
-            self._log.debug(f"{res.status} {res.method} {res.url}")
+        With `binary`, the body is returned as bytes and only decoded to look for
+        Vulcan error pages when it is not JSON. `endpoint` is the path template from `paths`,
+        reported to the hooks
+        """
+        return await self._send(verb, url, binary, endpoint, None, **kwargs)
 
-            # if not res.ok:
-            #     raise HTTPException(f"{verb} {url} got {res.status}")
+    async def _send(
+        self,
+        verb: str,
+        url: str,
+        binary: bool,
+        endpoint: Optional[str],
+        parse: Optional[Callable[[bytes], Any]],
+        **kwargs,
+    ) -> tuple[Any, str]:
+        if self.limiter:
+            async with self.limiter.slot(URL(url).host):
+                return await self._request(verb, url, binary, endpoint, parse, **kwargs)
 
-            text = await res.text()
-            if res.content_type.lower().split("/")[-1] != "json":
-                check_for_vulcan_error(text)
+        return await self._request(verb, url, binary, endpoint, parse, **kwargs)
 
-            return (text, str(res.url))
+    async def _request(
+        self,
+        verb: str,
+        url: str,
+        binary: bool,
+        endpoint: Optional[str],
+        parse: Optional[Callable[[bytes], Any]],
+        **kwargs,
+    ) -> tuple[Any, str]:
+        verb = verb.upper()
+        with span(self.tracer, f"http {verb}", endpoint=endpoint, host=URL(url).host):
+            return await self._measured_request(
+                verb, url, binary, endpoint, parse, **kwargs
+            )
 
-    async def api_request(self, verb: str, url: str, **kwargs):
-        text, _ = await self.request(verb, url, **kwargs)
+    async def _measured_request(
+        self,
+        verb: str,
+        url: str,
+        binary: bool,
+        endpoint: Optional[str],
+        parse: Optional[Callable[[bytes], Any]],
+        **kwargs,
+    ) -> tuple[Any, str]:
+        # without hooks nothing is measured
+        metrics = RequestMetrics(verb, endpoint, URL(url).host) if self.hooks else None
+        start = perf_counter()
         try:
-            data = loads(text)
-        except:
-            raise ScraperException("Failed to parse JSON data")
+            async with self.session.request(verb, url, **kwargs) as res:
+                if metrics:
+                    metrics.ttfb = perf_counter() - start
+                    metrics.status = res.status
+                    metrics.redirects = len(res.history)
+
+                for r in res.history:
+                    self._log.debug(f"{r.status} {r.method} {r.url}")
 
-        res = ApiResponse(**data)
-        if not res.success:
-            msg = (
-                res.feedback.Message
-                if res.feedback is not None
-                else f"{verb} {url} {res.success = }"
+                self._log.debug(f"{res.status} {res.method} {res.url}")
+
+                # if not res.ok:
+                #     raise HTTPException(f"{verb} {url} got {res.status}")
+
+                body = await res.read()
+                if metrics:
+                    metrics.bytes = len(body)
+                    parse_start = perf_counter()
+
+                try:
+                    with span(self.tracer, "decode"):
+                        ret = self._decode(res, body, binary, parse)
+                finally:
+                    if metrics:
+                        metrics.parse = perf_counter() - parse_start
+
+                return (ret, str(res.url))
+
+        except Exception as e:
+            if metrics:
+                metrics.error = e
+            raise
+
+        finally:
+            if metrics:
+                metrics.total = perf_counter() - start
+                self._report(metrics)
+
+    def _decode(
+        self,
+        res: ClientResponse,
+        body: bytes,
+        binary: bool,
+        parse: Optional[Callable[[bytes], Any]],
+    ) -> Any:
+        text = None
+        if res.content_type.lower().split("/")[-1] != "json":
+            text = body.decode(res.get_encoding())
+            check_for_vulcan_error(text)
+
+        if parse:
+            return parse(body)
+
+        if binary:
+            return body
+
+        if text is None:
+            text = body.decode(res.get_encoding())
+
+        return text
+
+    def _report(self, metrics: RequestMetrics):
+        for hook in self.hooks:
+            try:
+                hook(metrics)
+            except Exception:
+                self._log.exception(f"Request hook {hook!r} failed")
+
+    async def api_request(
+        self,
+        verb: str,
+        url: str,
+        *,
+        endpoint: Optional[str] = None,
+        cache: bool = True,
+        **kwargs,
+    ):
+        """
+        Sends a request to a JSON endpoint and returns the response `data`.
+
+        `endpoint` is the path template from `paths`, used to look up the cache TTL.
+        Without `cache`, the response cache is bypassed, for requests that are never repeated.
+        With `coalesce`, identical requests (verb, URL, params, cookies and body) made
+        while one is already in flight wait for its result instead of being sent again
+        """
+        key = request_key(verb, url, **kwargs)
+
+        def fetch():
+            return self._coalesced(
+                key, lambda: self._api_request(verb, url, endpoint, **kwargs)
             )
-            raise VulcanException(msg)
 
-        return res.data
+        if cache and self.cache is not None:
+            return await self.cache.get(endpoint, key, fetch)
+
+        return await fetch()
+
+    async def _coalesced(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]):
+        if not self.coalesce:
+            self.stats.api_requests += 1
+            return await fetch()
+
+        if key in self._in_flight:
+            self.stats.coalesced += 1
+        else:
+            self.stats.api_requests += 1
+
+        return await self._in_flight.run(key, fetch)
+
+    async def _api_request(
+        self, verb: str, url: str, endpoint: Optional[str], **kwargs
+    ):
+        def parse(body: bytes) -> Any:
+            return unwrap_api_response(self._parse_json(body), f"{verb} {url}")
+
+        data, _ = await self._send(verb, url, False, endpoint, parse, **kwargs)
+        return data
+
+    def _parse_json(self, body: bytes) -> Any:
+        try:
+            return self.json_loads(body)
+        except Exception:
+            raise ScraperException("Failed to parse JSON data")
 
     async def get_login_page(self, symbol: str = None) -> tuple[str, str]:
         realm = self.build_url(subd="uonetplus")
@@ -112,7 +351,7 @@ class HTTP:
             symbol=symbol,
             realm=quote(quote(realm, safe=""), safe=""),  # double encoding
         )
-        return await self.request("GET", url)
+        return await self.request("GET", url, endpoint=paths.CUFS.START)
 
     async def execute_cert_form(self, cres: CertificateResponse) -> str:
         return (await self.request("POST", cres.action, data=cres.request_body))[0]
@@ -121,11 +360,13 @@ class HTTP:
         url = self.build_url(
             subd="uonetplus", path=paths.UONETPLUS.START, symbol=symbol
         )
-        return (await self.request("POST", url, data=data))[0]
+        return (
+            await self.request("POST", url, data=data, endpoint=paths.UONETPLUS.START)
+        )[0]
 
     async def cufs_logout(self, symbol) -> str:
         url = self.build_url(subd="cufs", path=paths.CUFS.LOGOUT, symbol=symbol)
-        return (await self.request("GET", url))[0]
+        return (await self.request("GET", url, endpoint=paths.CUFS.LOGOUT))[0]
 
     async def uczen_start(self, symbol: str, schoolid: str) -> str:
         url = self.build_url(
@@ -134,7 +375,7 @@ class HTTP:
             symbol=symbol,
             schoolid=schoolid,
         )
-        return (await self.request("GET", url))[0]
+        return (await self.request("GET", url, endpoint=paths.UCZEN.START))[0]
 
     async def uzytkownik_get_reporting_units(self, symbol: str) -> list[ReportingUnit]:
         url = self.build_url(
@@ -142,8 +383,11 @@ class HTTP:
             path=paths.UZYTKOWNIK.NOWAWIADOMOSC_GETJEDNOSTKIUZYTKOWNIKA,
             symbol=symbol,
         )
-        data = await self.api_request("GET", url)
-        return [ReportingUnit(**x) for x in data]
+        data = await self.api_request(
+            "GET", url, endpoint=paths.UZYTKOWNIK.NOWAWIADOMOSC_GETJEDNOSTKIUZYTKOWNIKA
+        )
+        with span(self.tracer, "parse"):
+            return [ReportingUnit(**x) for x in data]
 
     async def uczen_get_registers(
         self, symbol: str, schoolid: str, headers: dict[str, str]
@@ -154,9 +398,13 @@ class HTTP:
             symbol=symbol,
             schoolid=schoolid,
         )
-        data = await self.api_request("POST", url, headers=headers)
-        return [StudentRegister(**x) for x in data]
+        data = await self.api_request(
+            "POST", url, headers=headers, endpoint=paths.UCZEN.UCZENDZIENNIK_GET
+        )
+        with span(self.tracer, "parse"):
+            return [StudentRegister(**x) for x in data]
 
+    @overload
     async def uczen_get_grades(
         self,
         symbol: str,
@@ -164,7 +412,35 @@ class HTTP:
         headers: dict[str, str],
         cookies: dict[str, str],
         period_id: int,
-    ) -> GradesData:
+        *,
+        raw: Literal[False] = False,
+        lazy: bool = False,
+    ) -> GradesData: ...
+
+    @overload
+    async def uczen_get_grades(
+        self,
+        symbol: str,
+        schoolid: str,
+        headers: dict[str, str],
+        cookies: dict[str, str],
+        period_id: int,
+        *,
+        raw: Literal[True],
+        lazy: bool = False,
+    ) -> dict[str, Any]: ...
+
+    async def uczen_get_grades(
+        self,
+        symbol: str,
+        schoolid: str,
+        headers: dict[str, str],
+        cookies: dict[str, str],
+        period_id: int,
+        *,
+        raw: bool = False,
+        lazy: bool = False,
+    ) -> Union[GradesData, dict[str, Any]]:
         url = self.build_url(
             subd="uonetplus-uczen",
             path=paths.UCZEN.OCENY_GET,
@@ -172,9 +448,42 @@ class HTTP:
             schoolid=schoolid,
         )
         data = await self.api_request(
-            "POST", url, headers=headers, cookies=cookies, json={"okres": period_id}
+            "POST",
+            url,
+            headers=headers,
+            cookies=cookies,
+            json={"okres": period_id},
+            endpoint=paths.UCZEN.OCENY_GET,
         )
-        return GradesData(**data)
+        if raw:
+            return data
+
+        with span(self.tracer, "parse"):
+            return GradesData(lazy=lazy, **data)
+
+    @overload
+    async def uczen_get_notes_achievements(
+        self,
+        symbol: str,
+        schoolid: str,
+        headers: dict[str, str],
+        cookies: dict[str, str],
+        *,
+        raw: Literal[False] = False,
+        lazy: bool = False,
+    ) -> NotesAndAchievementsData: ...
+
+    @overload
+    async def uczen_get_notes_achievements(
+        self,
+        symbol: str,
+        schoolid: str,
+        headers: dict[str, str],
+        cookies: dict[str, str],
+        *,
+        raw: Literal[True],
+        lazy: bool = False,
+    ) -> dict[str, Any]: ...
 
     async def uczen_get_notes_achievements(
         self,
@@ -182,15 +491,50 @@ class HTTP:
         schoolid: str,
         headers: dict[str, str],
         cookies: dict[str, str],
-    ) -> NotesAndAchievementsData:
+        *,
+        raw: bool = False,
+        lazy: bool = False,
+    ) -> Union[NotesAndAchievementsData, dict[str, Any]]:
         url = self.build_url(
             subd="uonetplus-uczen",
             path=paths.UCZEN.UWAGIIOSIAGNIECIA_GET,
             symbol=symbol,
             schoolid=schoolid,
         )
-        data = await self.api_request("POST", url, headers=headers, cookies=cookies)
-        return NotesAndAchievementsData(**data)
+        data = await self.api_request(
+            "POST",
+            url,
+            headers=headers,
+            cookies=cookies,
+            endpoint=paths.UCZEN.UWAGIIOSIAGNIECIA_GET,
+        )
+        if raw:
+            return data
+
+        with span(self.tracer, "parse"):
+            return NotesAndAchievementsData(lazy=lazy, **data)
+
+    @overload
+    async def uczen_get_meetings(
+        self,
+        symbol: str,
+        schoolid: str,
+        headers: dict[str, str],
+        cookies: dict[str, str],
+        *,
+        raw: Literal[False] = False,
+    ) -> list[Meeting]: ...
+
+    @overload
+    async def uczen_get_meetings(
+        self,
+        symbol: str,
+        schoolid: str,
+        headers: dict[str, str],
+        cookies: dict[str, str],
+        *,
+        raw: Literal[True],
+    ) -> list[dict[str, Any]]: ...
 
     async def uczen_get_meetings(
         self,
@@ -198,15 +542,27 @@ class HTTP:
         schoolid: str,
         headers: dict[str, str],
         cookies: dict[str, str],
-    ) -> list[Meeting]:
+        *,
+        raw: bool = False,
+    ) -> Union[list[Meeting], list[dict[str, Any]]]:
         url = self.build_url(
             subd="uonetplus-uczen",
             path=paths.UCZEN.ZEBRANIA_GET,
             symbol=symbol,
             schoolid=schoolid,
         )
-        data = await self.api_request("POST", url, headers=headers, cookies=cookies)
-        return [Meeting(**x) for x in data]
+        data = await self.api_request(
+            "POST",
+            url,
+            headers=headers,
+            cookies=cookies,
+            endpoint=paths.UCZEN.ZEBRANIA_GET,
+        )
+        if raw:
+            return data
+
+        with span(self.tracer, "parse"):
+            return [Meeting(**x) for x in data]
 
     async def uczen_get_timetable(
         self,
@@ -228,8 +584,10 @@ class HTTP:
             headers=headers,
             cookies=cookies,
             data={"data": date.strftime("%Y-%m-%dT00:00:00")},
+            endpoint=paths.UCZEN.PLANZAJEC_GET,
         )
-        return TimetableResponse(**data)
+        with span(self.tracer, "parse"):
+            return TimetableResponse(**data)
 
     async def uczen_get_exams(
         self,
@@ -239,6 +597,8 @@ class HTTP:
         cookies: dict[str, str],
         date: datetime,
         year: int,
+        *,
+        lazy: bool = False,
     ) -> ExamsResponse:
         url = self.build_url(
             subd="uonetplus-uczen",
@@ -252,9 +612,26 @@ class HTTP:
             headers=headers,
             cookies=cookies,
             data={"data": date.strftime("%Y-%m-%dT00:00:00"), "rokSzkolny": year},
+            endpoint=paths.UCZEN.SPRAWDZIANY_GET,
         )
-        return ExamsResponse(data)
+        with span(self.tracer, "parse"):
+            return ExamsResponse(data, lazy=lazy)
+
+    @overload
+    async def uczen_get_homework(
+        self,
+        symbol: str,
+        schoolid: str,
+        headers: dict[str, str],
+        cookies: dict[str, str],
+        date: datetime,
+        year: int,
+        *,
+        raw: Literal[False] = False,
+        lazy: bool = False,
+    ) -> HomeworkResponse: ...
 
+    @overload
     async def uczen_get_homework(
         self,
         symbol: str,
@@ -263,7 +640,23 @@ class HTTP:
         cookies: dict[str, str],
         date: datetime,
         year: int,
-    ) -> HomeworkResponse:
+        *,
+        raw: Literal[True],
+        lazy: bool = False,
+    ) -> list[dict[str, Any]]: ...
+
+    async def uczen_get_homework(
+        self,
+        symbol: str,
+        schoolid: str,
+        headers: dict[str, str],
+        cookies: dict[str, str],
+        date: datetime,
+        year: int,
+        *,
+        raw: bool = False,
+        lazy: bool = False,
+    ) -> Union[HomeworkResponse, list[dict[str, Any]]]:
         url = self.build_url(
             subd="uonetplus-uczen",
             path=paths.UCZEN.HOMEWORK_GET,
@@ -276,8 +669,13 @@ class HTTP:
             headers=headers,
             cookies=cookies,
             data={"date": date.strftime("%Y-%m-%dT00:00:00"), "schoolYear": year},
+            endpoint=paths.UCZEN.HOMEWORK_GET,
         )
-        return HomeworkResponse(data)
+        if raw:
+            return data
+
+        with span(self.tracer, "parse"):
+            return HomeworkResponse(data, lazy=lazy)
 
     async def uonetplus_get_lucky_numbers(
         self, symbol: str, permissions: str
@@ -287,8 +685,14 @@ class HTTP:
             path=paths.UONETPLUS.GETKIDSLUCKYNUMBERS,
             symbol=symbol,
         )
-        data = await self.api_request("POST", url, data={"permissions": permissions})
-        return [UonetplusTileResponse(**x) for x in data]
+        data = await self.api_request(
+            "POST",
+            url,
+            data={"permissions": permissions},
+            endpoint=paths.UONETPLUS.GETKIDSLUCKYNUMBERS,
+        )
+        with span(self.tracer, "parse"):
+            return [UonetplusTileResponse(**x) for x in data]
 
     async def uonetplus_get_school_announcements(
         self, symbol: str, permissions: str
@@ -298,8 +702,14 @@ class HTTP:
             path=paths.UONETPLUS.GETSTUDENTDIRECTORINFORMATIONS,
             symbol=symbol,
         )
-        data = await self.api_request("POST", url, data={"permissions": permissions})
-        return [UonetplusTileResponse(**x) for x in data]
+        data = await self.api_request(
+            "POST",
+            url,
+            data={"permissions": permissions},
+            endpoint=paths.UONETPLUS.GETSTUDENTDIRECTORINFORMATIONS,
+        )
+        with span(self.tracer, "parse"):
+            return [UonetplusTileResponse(**x) for x in data]
 
     async def uczen_refresh_session(self, symbol: str, schoolid: str):
         url = self.build_url(
@@ -309,5 +719,10 @@ class HTTP:
             schoolid=schoolid,
         )
         await self.api_request(
-            "GET", url, params={"_dc": int(datetime.now().timestamp() * 1000)}
+            "GET",
+            url,
+            params={"_dc": int(datetime.now().timestamp() * 1000)},
+            endpoint=paths.UCZEN.REFRESHSESSION,
+            # every call has a new _dc, its entry would never be hit
+            cache=False,
         )
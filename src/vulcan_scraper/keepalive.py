@@ -0,0 +1,181 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .client import VulcanWeb
+
+import asyncio
+import heapq
+import random
+from dataclasses import dataclass
+from itertools import count
+from logging import getLogger
+from time import monotonic
+from typing import Any, Awaitable, Callable, Optional
+
+from .error import NotLoggedInException
+
+
+@dataclass
+class KeepAliveStats:
+    refreshes: int = 0
+    relogins: int = 0
+    failures: int = 0
+
+
+class KeepAlive:
+    """
+    Keeps the sessions of many clients alive in the background.
+
+    Every (symbol, instance) of every added client's students is refreshed once per
+    `interval` seconds, +/- `jitter` (a fraction of the interval), with at most `concurrency`
+    refreshes running at once. When a session has already expired, the client logs in again.
+
+    `clock` and `sleep` can be replaced, e.g. by a simulated clock in tests
+    """
+
+    def __init__(
+        self,
+        *,
+        interval: float = 300.0,
+        jitter: float = 0.1,
+        concurrency: int = 10,
+        clock: Callable[[], float] = monotonic,
+        sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep,
+    ):
+        self._log = getLogger(__name__)
+
+        self.interval = interval
+        self.jitter = jitter
+        self.concurrency = concurrency
+        self.stats = KeepAliveStats()
+        self._clock = clock
+        self._sleep = sleep
+
+        self._clients: list[VulcanWeb] = []
+        # (due time, sequence number, (client, instance id))
+        self._heap: list[tuple[float, int, tuple[VulcanWeb, str]]] = []
+        # (client, instance id) -> sequence number of its live heap entry,
+        # entries with another number are left over from a removed client
+        self._scheduled: dict[tuple[VulcanWeb, str], int] = {}
+        self._seq = count()
+        self._task: Optional[asyncio.Task] = None
+        self._running: set[asyncio.Task] = set()
+        self._changed: Optional[asyncio.Event] = None
+        self._sem: Optional[asyncio.Semaphore] = None
+
+    def add(self, vulcan: VulcanWeb):
+        if vulcan not in self._clients:
+            self._clients.append(vulcan)
+            self._notify()
+
+    def remove(self, vulcan: VulcanWeb):
+        if vulcan in self._clients:
+            self._clients.remove(vulcan)
+            self._notify()
+
+    def _notify(self):
+        if self._changed:
+            self._changed.set()
+
+    def _next_interval(self) -> float:
+        return self.interval * (1 + random.uniform(-self.jitter, self.jitter))
+
+    def _sync(self, now: float):
+        keys = {
+            (client, student.school_id)
+            for client in self._clients
+            if client.logged_in
+            for student in client.students
+        }
+        for key in keys - self._scheduled.keys():
+            # spread the first refreshes over the whole interval
+            self._push(key, now + random.uniform(0, self.interval))
+
+        for key in self._scheduled.keys() - keys:
+            del self._scheduled[key]
+
+        # drop the entries of removed clients once they are most of the heap
+        if len(self._heap) > 2 * len(self._scheduled):
+            self._heap = [e for e in self._heap if self._scheduled.get(e[2]) == e[1]]
+            heapq.heapify(self._heap)
+
+    def _push(self, key: tuple[VulcanWeb, str], due: float):
+        seq = self._scheduled[key] = next(self._seq)
+        heapq.heappush(self._heap, (due, seq, key))
+
+    async def _refresh(self, client: VulcanWeb, instance_id: str):
+        async with self._sem:
+            login_count = client._login_count
+            try:
+                try:
+                    await client.http.uczen_refresh_session(client.symbol, instance_id)
+                    self.stats.refreshes += 1
+                except NotLoggedInException:
+                    self.stats.relogins += 1
+                    await client.relogin(login_count)
+
+            except Exception as e:
+                self.stats.failures += 1
+                self._log.debug(
+                    f"Keeping {client.email} ({instance_id}) alive failed: {e!r}"
+                )
+
+    async def _run(self):
+        while True:
+            now = self._clock()
+            self._sync(now)
+
+            while self._heap and self._heap[0][0] <= now:
+                _, seq, key = heapq.heappop(self._heap)
+                if self._scheduled.get(key) != seq:
+                    continue  # removed, or removed and added again
+
+                task = asyncio.ensure_future(self._refresh(*key))
+                self._running.add(task)
+                task.add_done_callback(self._running.discard)
+                self._push(key, now + self._next_interval())
+
+            # wake up now and then to pick up newly fetched students
+            delay = self.interval / 10
+            if self._heap:
+                delay = min(delay, self._heap[0][0] - now)
+
+            self._changed.clear()
+            waiters = [
+                asyncio.ensure_future(self._sleep(delay)),
+                asyncio.ensure_future(self._changed.wait()),
+            ]
+            try:
+                await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                for waiter in waiters:
+                    waiter.cancel()
+
+    def start(self):
+        if self._task:
+            return
+
+        self._changed = asyncio.Event()
+        self._sem = asyncio.Semaphore(self.concurrency)
+        self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        if not self._task:
+            return
+
+        tasks = [self._task, *self._running]
+        for task in tasks:
+            task.cancel()
+
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._task = None
+        self._heap.clear()
+        self._scheduled.clear()
+
+    async def __aenter__(self):
+        self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.stop()
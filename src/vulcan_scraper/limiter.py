@@ -0,0 +1,185 @@
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from time import monotonic
+from typing import AsyncIterator, Optional
+
+from aiohttp import ClientError
+
+from .error import ServiceUnavailableException
+
+# exceptions treated as a sign of an overloaded server
+CONGESTION_ERRORS = (ServiceUnavailableException, ClientError, asyncio.TimeoutError)
+
+
+@dataclass
+class HostLimit:
+    rate: float = 20.0  # requests per second, 0 for no limit
+    burst: int = 20
+    concurrency: int = 8  # initial concurrency limit
+    min_concurrency: int = 1
+    max_concurrency: int = 64
+    # responses slower than this are treated like errors
+    target_latency: float = 2.0
+
+
+@dataclass
+class LimiterStats:
+    host: str
+    limit: int
+    in_flight: int
+    queued: int
+    requests: int
+    congested: int  # requests that failed or exceeded the target latency
+
+
+class _HostState:
+    def __init__(self, host: str, config: HostLimit):
+        self.host = host
+        self.config = config
+        self.limit = float(config.concurrency)
+        self.in_flight = 0
+        self.queued = 0
+        self.requests = 0
+        self.congested = 0
+
+        self._tokens = float(config.burst)
+        self._updated = monotonic()
+        self._last_decrease = 0.0
+        self._waiters: deque[asyncio.Future] = deque()
+
+    async def _take_token(self):
+        rate = self.config.rate
+        if rate <= 0:
+            return
+
+        while True:
+            now = monotonic()
+            self._tokens = min(
+                self.config.burst, self._tokens + (now - self._updated) * rate
+            )
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+
+            await asyncio.sleep((1 - self._tokens) / rate)
+
+    def _wake(self):
+        while self._waiters and self.in_flight < int(self.limit):
+            fut = self._waiters.popleft()
+            if not fut.done():
+                self.in_flight += 1
+                fut.set_result(None)
+
+    async def acquire(self):
+        self.queued += 1
+        try:
+            await self._take_token()
+
+            if self.in_flight < int(self.limit) and not self._waiters:
+                self.in_flight += 1
+                return
+
+            fut = asyncio.get_running_loop().create_future()
+            self._waiters.append(fut)
+            try:
+                await fut
+            except asyncio.CancelledError:
+                if fut.done() and not fut.cancelled():
+                    self.release()  # the slot was granted, pass it on
+                else:
+                    self._waiters.remove(fut)
+                raise
+
+        finally:
+            self.queued -= 1
+
+    def release(self):
+        self.in_flight -= 1
+        self._wake()
+
+    def record(self, latency: float, congested: bool):
+        """AIMD: increase the limit by ~1 per window of successes, halve it on congestion"""
+
+        c = self.config
+        self.requests += 1
+        if congested or latency > c.target_latency:
+            self.congested += 1
+            now = monotonic()
+            # at most once per round trip, so a burst of failures counts once
+            if now - self._last_decrease > latency:
+                self._last_decrease = now
+                self.limit = max(c.min_concurrency, self.limit / 2)
+        else:
+            self.limit = min(c.max_concurrency, self.limit + 1 / self.limit)
+            self._wake()
+
+
+class RateLimiter:
+    """
+    Token bucket and adaptive concurrency limits for each host.
+
+    `hosts` maps either full host names ("uonetplus-uczen.fakelog.cf")
+    or subdomains ("uonetplus-uczen") to their limits, other hosts use `default`.
+    A limiter can be shared between many clients, e.g. all clients of a `VulcanPool`
+    """
+
+    def __init__(
+        self,
+        default: Optional[HostLimit] = None,
+        hosts: Optional[dict[str, HostLimit]] = None,
+    ):
+        self.default = default or HostLimit()
+        self.hosts = dict(hosts or {})
+        self._states: dict[str, _HostState] = {}
+
+    def config_for(self, host: str) -> HostLimit:
+        return (
+            self.hosts.get(host)
+            or self.hosts.get(host.split(".", 1)[0])
+            or self.default
+        )
+
+    def _state(self, host: str) -> _HostState:
+        state = self._states.get(host)
+        if not state:
+            state = self._states[host] = _HostState(host, self.config_for(host))
+
+        return state
+
+    @asynccontextmanager
+    async def slot(self, host: str) -> AsyncIterator[None]:
+        """Waits until a request to `host` is allowed and records its outcome"""
+
+        state = self._state(host)
+        await state.acquire()
+        start = monotonic()
+        congested = cancelled = False
+        try:
+            yield
+        except CONGESTION_ERRORS:
+            congested = True
+            raise
+        except asyncio.CancelledError:
+            # says nothing about the server, e.g. a losing symbol probe
+            cancelled = True
+            raise
+        finally:
+            state.release()
+            if not cancelled:
+                state.record(monotonic() - start, congested)
+
+    def stats(self) -> list[LimiterStats]:
+        return [
+            LimiterStats(
+                host=s.host,
+                limit=int(s.limit),
+                in_flight=s.in_flight,
+                queued=s.queued,
+                requests=s.requests,
+                congested=s.congested,
+            )
+            for s in self._states.values()
+        ]
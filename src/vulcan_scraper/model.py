@@ -1,9 +1,10 @@
-from dataclasses import dataclass, is_dataclass
-from typing import Any
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
 from datetime import datetime
-from bs4 import BeautifulSoup
 
 from .error import ScraperException
+from .utils import SLOTS, make_soup, parse_date, parse_isodatetime
 
 
 def reprable(*attrs):
@@ -18,32 +19,59 @@ def reprable(*attrs):
     return wrapper
 
 
-def nested_dataclass(*args, **kwargs):
-    def wrapper(cls):
-        cls = dataclass(cls, **kwargs)
-        original_init = cls.__init__
-
-        def __init__(self, *args, **kwargs):
-            for name, value in kwargs.items():
-                field_type = cls.__annotations__.get(name, None)
-                if is_dataclass(field_type) and isinstance(value, dict):
-                    new_obj = field_type(**value)
-                    kwargs[name] = new_obj
-            original_init(self, *args, **kwargs)
-
-        cls.__init__ = __init__
-        return cls
+def get_default(data: dict, key: str, default: Any):
+    return data.get(key, default) or default
 
-    return wrapper(args[0]) if args else wrapper
 
+_MISSING = object()
+
+
+class LazyList(Sequence):
+    """
+    A read-only list that builds its items from the raw JSON data on first access.
+
+    Every item is decoded at most once, the decoded items are kept
+    """
+
+    __slots__ = ("raw", "_factory", "_items")
+
+    def __init__(self, raw: list, factory: Callable[[Any], Any]):
+        self.raw = raw
+        self._factory = factory
+        self._items = [_MISSING] * len(raw)
+
+    def __len__(self) -> int:
+        return len(self.raw)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self.raw)))]
+
+        item = self._items[index]
+        if item is _MISSING:
+            item = self._items[index] = self._factory(self.raw[index])
+
+        return item
+
+    @property
+    def decoded(self) -> int:
+        return sum(item is not _MISSING for item in self._items)
+
+    def __repr__(self) -> str:
+        return f"<LazyList {self.decoded}/{len(self)} decoded>"
 
-def get_default(data: dict, key: str, default: Any):
-    return data.get(key, default) or default
+
+def _grade_sort_key(raw: dict) -> tuple[int, int, int]:
+    # same order as sorting by Grade.date, without strptime
+    day, month, year = raw["DataOceny"].split(".")
+    return int(year), int(month), int(day)
 
 
 class CertificateResponse:
+    __slots__ = ("action", "wa", "wresult", "wctx")
+
     def __init__(self, text: str):
-        soup = BeautifulSoup(text, "lxml")
+        soup = make_soup(text)
         try:
             self.action: str = soup.select("form")[0]["action"]
             self.wa: str = soup.select('input[name="wa"]')[0]["value"]
@@ -66,30 +94,10 @@ class CertificateResponse:
         return data
 
 
-@dataclass
-class Feedback:
-    Handled: bool = None
-    FType: str = None
-    Message: str = None
-    ExceptionType: Any = None
-    ExceptionMessage: str = None
-    InnerExceptionMessage: str = None
-    Action: Any = None
-    data: Any = None
-    success: bool = None
-    requestId: Any = None
-
-
-@nested_dataclass
-class ApiResponse:
-    success: bool
-    data: Any = None
-    feedback: Feedback = None
-    errorMessage: Any = None
-
-
 @reprable("id", "abbreviation")
 class ReportingUnit:
+    __slots__ = ("id", "abbreviation", "sender_id", "sender_name", "roles")
+
     def __init__(self, **data):
         self.id: int = data["IdJednostkaSprawozdawcza"]
         self.abbreviation: str = data["Skrot"]
@@ -100,19 +108,47 @@ class ReportingUnit:
 
 @reprable("id", "number", "start", "end")
 class Period:
+    __slots__ = (
+        "id",
+        "class_id",
+        "unit_id",
+        "number",
+        "level",
+        "start",
+        "end",
+        "is_last",
+    )
+
     def __init__(self, **data):
         self.id: int = data["Id"]
         self.class_id: int = data["IdOddzial"]
         self.unit_id = data["IdJednostkaSprawozdawcza"]
         self.number: int = data["NumerOkresu"]
         self.level: int = data["Poziom"]
-        self.start: datetime = datetime.fromisoformat(data["DataOd"])
-        self.end: datetime = datetime.fromisoformat(data["DataDo"])
+        self.start: datetime = parse_isodatetime(data["DataOd"])
+        self.end: datetime = parse_isodatetime(data["DataDo"])
         self.is_last: bool = data["IsLastOkres"]
 
 
 @reprable("register_id", "student_id", "year", "level")
 class StudentRegister:
+    __slots__ = (
+        "is_register",
+        "id",
+        "register_id",
+        "kindergarten_register_id",
+        "name",
+        "level",
+        "symbol",
+        "year",
+        "student_id",
+        "student_first_name",
+        "student_middle_name",
+        "student_last_name",
+        "student_full_name_with_year",
+        "periods",
+    )
+
     def __init__(self, **data):
         self.is_register: bool = data["IsDziennik"]
         self.id: int = data["Id"]
@@ -134,13 +170,15 @@ class StudentRegister:
 
 @reprable("entry", "weight", "symbol", "description", "date")
 class Grade:
+    __slots__ = ("entry", "color", "symbol", "description", "weight", "date")
+
     def __init__(self, **data):
         self.entry: str = data["Wpis"]
         self.color: int = data["KolorOceny"]
         self.symbol: str = data["KodKolumny"]
         self.description: str = data["NazwaKolumny"]
         self.weight: float = data["Waga"]
-        self.date: datetime = datetime.strptime(data["DataOceny"], "%d.%m.%Y")
+        self.date: datetime = parse_date(data["DataOceny"])
 
     def __str__(self) -> str:
         return self.entry
@@ -148,7 +186,21 @@ class Grade:
 
 @reprable("subject_name", "average")
 class SubjectGrades:
-    def __init__(self, **data):
+    __slots__ = (
+        "subject_name",
+        "subject_visible",
+        "position",
+        "average",
+        "proposed_annual",
+        "annual",
+        "proposed_annual_points",
+        "annual_points",
+        "points_sum",
+        "_grades",
+        "_raw_grades",
+    )
+
+    def __init__(self, *, lazy: bool = False, **data):
         self.subject_name: str = data["Przedmiot"]
         self.subject_visible: bool = data["WidocznyPrzedmiot"]
         self.position: int = data["Pozycja"]
@@ -160,8 +212,24 @@ class SubjectGrades:
         )
         self.annual_points: str = get_default(data, "OcenaRocznaPunkty", "")
         self.points_sum: str = get_default(data, "SumaPunktow", "")
-        self.grades: list[Grade] = [Grade(**d) for d in data["OcenyCzastkowe"]]
-        self.grades.sort(key=lambda grade: grade.date)
+        self._raw_grades: Optional[list[dict]] = data["OcenyCzastkowe"]
+        self._grades: Optional[list[Grade]] = None
+        if not lazy:
+            self.grades = [Grade(**d) for d in self._raw_grades]
+            self._grades.sort(key=lambda grade: grade.date)
+
+    @property
+    def grades(self) -> list[Grade]:
+        if self._grades is None:
+            raw = sorted(self._raw_grades, key=_grade_sort_key)
+            self.grades = LazyList(raw, lambda d: Grade(**d))
+
+        return self._grades
+
+    @grades.setter
+    def grades(self, value: list[Grade]):
+        self._grades = value
+        self._raw_grades = None
 
     def __str__(self) -> str:
         return self.subject_name
@@ -169,6 +237,8 @@ class SubjectGrades:
 
 @reprable("subject_name")
 class DescriptiveAssessment:
+    __slots__ = ("subject_name", "assessment", "is_religia_etyka")
+
     def __init__(self, **data):
         self.subject_name: str = data["NazwaPrzedmiotu"]
         self.assessment: str = data["Opis"]
@@ -180,22 +250,62 @@ class DescriptiveAssessment:
 
 @reprable("is_average_available", "uses_points", "grades_type")
 class GradesData:
-    def __init__(self, **data):
+    __slots__ = (
+        "is_average_available",
+        "uses_points",
+        "grades_type",
+        "is_last_period",
+        "is_adult",
+        "subjects",
+        "descriptive",
+    )
+
+    def __init__(self, *, lazy: bool = False, **data):
         self.is_average_available: bool = data["IsSrednia"]
         self.uses_points: bool = data["IsPunkty"]
         self.grades_type: int = data["TypOcen"]
         self.is_last_period: bool = data["IsOstatniSemestr"]
         self.is_adult: bool = data["IsDlaDoroslych"]
-        self.subjects: list[SubjectGrades] = [SubjectGrades(**d) for d in data["Oceny"]]
-        self.descriptive: list[DescriptiveAssessment] = [
-            DescriptiveAssessment(**d) for d in data["OcenyOpisowe"]
-        ]
+        if lazy:
+            self.subjects: list[SubjectGrades] = LazyList(
+                data["Oceny"], lambda d: SubjectGrades(lazy=True, **d)
+            )
+            self.descriptive: list[DescriptiveAssessment] = LazyList(
+                data["OcenyOpisowe"], lambda d: DescriptiveAssessment(**d)
+            )
+        else:
+            self.subjects = [SubjectGrades(**d) for d in data["Oceny"]]
+            self.descriptive = [
+                DescriptiveAssessment(**d) for d in data["OcenyOpisowe"]
+            ]
+
+    def get_subject(self, name: str) -> Optional[SubjectGrades]:
+        """Returns the grades of the subject `name`, in lazy mode without decoding the other subjects"""
+
+        if isinstance(self.subjects, LazyList):
+            for i, raw in enumerate(self.subjects.raw):
+                if raw["Przedmiot"] == name:
+                    return self.subjects[i]
+
+            return None
+
+        return next((s for s in self.subjects if s.subject_name == name), None)
 
 
 @reprable("date", "category", "teacher")
 class Note:
+    __slots__ = (
+        "date",
+        "teacher",
+        "category",
+        "content",
+        "category_type",
+        "points",
+        "show_points",
+    )
+
     def __init__(self, **data):
-        self.date: datetime = datetime.fromisoformat(data["DataWpisu"])
+        self.date: datetime = parse_isodatetime(data["DataWpisu"])
         self.teacher: str = data["Nauczyciel"]
         self.category: str = data["Kategoria"]
         self.content: str = data["TrescUwagi"]
@@ -205,14 +315,23 @@ class Note:
 
 
 class NotesAndAchievementsData:
-    def __init__(self, **data):
-        self.notes: list[Note] = [Note(**d) for d in data["Uwagi"]]
-        self.notes.sort(key=lambda note: note.date)
+    __slots__ = ("notes", "achievements")
+
+    def __init__(self, *, lazy: bool = False, **data):
+        # the same order in both modes, by the parsed date like Note.date
+        raw = sorted(data["Uwagi"], key=lambda d: parse_isodatetime(d["DataWpisu"]))
+        if lazy:
+            self.notes: list[Note] = LazyList(raw, lambda d: Note(**d))
+        else:
+            self.notes = [Note(**d) for d in raw]
+
         self.achievements: list[str] = data["Osiagniecia"]
 
 
 @reprable("title", "topic", "date")
 class Meeting:
+    __slots__ = ("id", "topic", "agenda", "people_present", "online", "title", "date")
+
     def __init__(self, **data):
         self.id: int = data["Id"]
         self.topic: str = data["TematZebrania"]
@@ -225,14 +344,14 @@ class Meeting:
 
         date = get_default(data, "DataSpotkania", "")
         if date:
-            self.date = datetime.fromisoformat(date)
+            self.date = parse_isodatetime(date)
         else:
-            self.date = datetime.strptime(
-                split[1].replace(" godzina", ""), "%d.%m.%Y %H:%M"
-            )
+            self.date = parse_date(split[1].replace(" godzina", ""), "%d.%m.%Y %H:%M")
 
 
 class TimetableHeader:
+    __slots__ = ("text", "width", "distinction", "flex")
+
     def __init__(self, **data):
         self.text: str = data["Text"]
         self.width: str = get_default(data, "Width", "")
@@ -241,6 +360,8 @@ class TimetableHeader:
 
 
 class TimetableAdditional:
+    __slots__ = ("header", "descriptions")
+
     def __init__(self, **data):
         self.header: str = data["Header"]
         self.descriptions: list[str] = [
@@ -249,6 +370,8 @@ class TimetableAdditional:
 
 
 class TimetableResponse:
+    __slots__ = ("date", "headers", "rows", "additionals")
+
     def __init__(self, **data):
         self.date: str = data["Data"]
         self.headers: list[TimetableHeader] = [
@@ -262,11 +385,13 @@ class TimetableResponse:
 
 @reprable("date", "subject", "type", "description")
 class Exam:
+    __slots__ = ("date", "type", "entry_date", "subject", "teacher", "description")
+
     date: datetime
     type: str
 
     def __init__(self, **data):
-        self.entry_date: datetime = datetime.fromisoformat(data["DataModyfikacji"])
+        self.entry_date: datetime = parse_isodatetime(data["DataModyfikacji"])
         self.subject: str = data["Nazwa"]
         self.type = data["Rodzaj"]
         self.teacher: str = data["Pracownik"]
@@ -274,19 +399,32 @@ class Exam:
 
 
 class ExamsDay:
-    def __init__(self, **data):
-        self.date: datetime = datetime.fromisoformat(data["Data"])
-        self.exams: list[Exam] = [Exam(**d) for d in data["Sprawdziany"]]
+    __slots__ = ("date", "exams")
+
+    def __init__(self, *, lazy: bool = False, **data):
+        self.date: datetime = parse_isodatetime(data["Data"])
+        if lazy:
+            self.exams: list[Exam] = LazyList(data["Sprawdziany"], lambda d: Exam(**d))
+        else:
+            self.exams = [Exam(**d) for d in data["Sprawdziany"]]
 
 
 class ExamsResponse:
-    def __init__(self, data):
-        self.days = [
-            ExamsDay(**d) for x in data for d in x["SprawdzianyGroupedByDayList"]
-        ]
+    __slots__ = ("days",)
+
+    def __init__(self, data, *, lazy: bool = False):
+        days = [d for x in data for d in x["SprawdzianyGroupedByDayList"]]
+        if lazy:
+            self.days: list[ExamsDay] = LazyList(
+                days, lambda d: ExamsDay(lazy=True, **d)
+            )
+        else:
+            self.days = [ExamsDay(**d) for d in days]
 
 
 class HomeworkAttachment:
+    __slots__ = ("homework_id", "url", "filename", "html", "onedrive_id")
+
     def __init__(self, **data):
         self.homework_id: int = data["IdZadanieDomowe"]
         self.url: str = data["Url"]
@@ -297,10 +435,20 @@ class HomeworkAttachment:
 
 @reprable("date", "subject", "description")
 class Homework:
+    __slots__ = (
+        "id",
+        "entry_date",
+        "date",
+        "subject",
+        "description",
+        "teacher",
+        "attachments",
+    )
+
     def __init__(self, **data):
         self.id: int = data["HomeworkId"]
-        self.entry_date: datetime = datetime.fromisoformat(data["ModificationDate"])
-        self.date: datetime = datetime.fromisoformat(data["Date"])
+        self.entry_date: datetime = parse_isodatetime(data["ModificationDate"])
+        self.date: datetime = parse_isodatetime(data["Date"])
         self.subject: str = data["Subject"]
         self.description: str = data["Description"]
         self.teacher: str = data["Teacher"]
@@ -310,18 +458,43 @@ class Homework:
 
 
 class HomeworkDay:
-    def __init__(self, **data):
-        self.date: datetime = datetime.fromisoformat(data["Date"])
-        self.homework: list[Homework] = [Homework(**d) for d in data["Homework"]]
+    __slots__ = ("date", "homework")
+
+    def __init__(self, *, lazy: bool = False, **data):
+        self.date: datetime = parse_isodatetime(data["Date"])
+        if lazy:
+            self.homework: list[Homework] = LazyList(
+                data["Homework"], lambda d: Homework(**d)
+            )
+        else:
+            self.homework = [Homework(**d) for d in data["Homework"]]
 
 
 class HomeworkResponse:
-    def __init__(self, data):
-        self.days = [HomeworkDay(**d) for d in data]
+    __slots__ = ("days",)
+
+    def __init__(self, data, *, lazy: bool = False):
+        if lazy:
+            self.days: list[HomeworkDay] = LazyList(
+                data, lambda d: HomeworkDay(lazy=True, **d)
+            )
+        else:
+            self.days = [HomeworkDay(**d) for d in data]
 
 
 @reprable("name", "content")
 class UonetplusTileResponse:
+    __slots__ = (
+        "icon_name",
+        "number",
+        "name",
+        "url",
+        "data",
+        "symbol",
+        "inactive",
+        "content",
+    )
+
     def __init__(self, **data):
         self.icon_name: str = get_default(data, "IkonkaNazwa", "")
         self.number: int = get_default(data, "Num", 0)
@@ -334,14 +507,14 @@ class UonetplusTileResponse:
         self.content = [self.__class__(**d) for d in data["Zawartosc"]]
 
 
-@dataclass
+@dataclass(**SLOTS)
 class LuckyNumber:
     instance_name: str
     unit_abbr: str
     value: int
 
 
-@dataclass
+@dataclass(**SLOTS)
 class SchoolAnnouncement:
     date: datetime
     subject: str
@@ -0,0 +1,99 @@
+import asyncio
+from logging import getLogger
+from typing import Optional
+
+from aiohttp import TCPConnector
+
+from .client import VulcanWeb
+from .limiter import RateLimiter
+
+
+class VulcanPool:
+    """
+    A group of `VulcanWeb` clients sharing a single connector.
+
+    All clients reuse the same DNS cache and keep-alive connections to the
+    `cufs.`, `uonetplus.` and `uonetplus-uczen.` hosts, while every client keeps
+    a cookie jar of its own. If a `limiter` is given, it is shared by all clients too.
+    """
+
+    def __init__(
+        self,
+        *,
+        host: str,
+        ssl: bool = True,
+        limit: int = 100,
+        limit_per_host: int = 10,
+        concurrency: int = 50,
+        limiter: Optional[RateLimiter] = None,
+    ):
+        self._log = getLogger(__name__)
+
+        self.host = host
+        self.ssl = ssl
+        self.connector = TCPConnector(
+            limit=limit, limit_per_host=limit_per_host, ttl_dns_cache=300
+        )
+        self.limiter = limiter
+        self.clients: list[VulcanWeb] = []
+
+        self._sem = asyncio.Semaphore(concurrency)
+
+    def add(
+        self, *, email: str, password: str, symbol: Optional[str] = None
+    ) -> VulcanWeb:
+        """Creates a client for the given account, using the shared connector"""
+
+        client = VulcanWeb(
+            host=self.host,
+            email=email,
+            password=password,
+            symbol=symbol,
+            ssl=self.ssl,
+            connector=self.connector,
+            limiter=self.limiter,
+        )
+        self.clients.append(client)
+        return client
+
+    async def _run(self, coro) -> Optional[Exception]:
+        async with self._sem:
+            try:
+                await coro
+            except Exception as e:
+                return e
+
+    async def _run_all(self, name: str) -> list[Optional[Exception]]:
+        return await asyncio.gather(
+            *[self._run(getattr(client, name)()) for client in self.clients]
+        )
+
+    async def login_all(self) -> list[Optional[Exception]]:
+        """
+        Logs in all clients concurrently.
+
+        Returns a list with the exception raised for each client (or `None`), in the order the clients were added
+        """
+        return await self._run_all("login")
+
+    async def logout_all(self) -> list[Optional[Exception]]:
+        """Logs out all clients concurrently"""
+
+        return await self._run_all("logout")
+
+    async def close(self):
+        """Logs out and closes all clients, then closes the shared connector"""
+
+        errors = await self._run_all("close")
+        for client, e in zip(self.clients, errors):
+            if e:
+                self._log.debug(f"Closing {client.email} failed: {e!r}")
+
+        self.clients.clear()
+        await self.connector.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
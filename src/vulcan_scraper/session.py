@@ -0,0 +1,113 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .client import VulcanWeb
+
+import json
+from http.cookies import Morsel, SimpleCookie
+from aiohttp.abc import AbstractCookieJar
+from yarl import URL
+
+from .error import ScraperException, NotLoggedInException
+from .model import ReportingUnit
+from .utils import Instance
+
+SESSION_VERSION = 1
+
+
+def _dump_unit(unit: ReportingUnit) -> dict:
+    return {
+        "IdJednostkaSprawozdawcza": unit.id,
+        "Skrot": unit.abbreviation,
+        "Id": unit.sender_id,
+        "NazwaNadawcy": unit.sender_name,
+        "Role": unit.roles,
+    }
+
+
+def _is_host_only(jar: AbstractCookieJar, morsel: Morsel) -> bool:
+    """
+    Whether the cookie was set without a Domain attribute, so it is only sent to its own host.
+
+    aiohttp keeps no public record of it (the jar fills in the domain either way),
+    so the jar is asked whether it would send the cookie to a subdomain
+    """
+    url = URL.build(
+        scheme="https" if morsel["secure"] else "http",
+        host=f"subdomain.{morsel['domain']}",
+        path=morsel["path"] or "/",
+    )
+    sent = jar.filter_cookies(url).get(morsel.key)
+    return sent is None or sent.value != morsel.value
+
+
+def dump_session(vulcan: VulcanWeb) -> bytes:
+    """Serializes the session state of a logged in client"""
+
+    if not vulcan.logged_in:
+        raise NotLoggedInException
+
+    jar = vulcan.http.session.cookie_jar
+    cookies = [
+        [morsel["domain"], morsel.OutputString(), _is_host_only(jar, morsel)]
+        for morsel in jar
+    ]
+
+    data = {
+        "version": SESSION_VERSION,
+        "host": vulcan.http.base_host,
+        "email": vulcan.email,
+        "symbol": vulcan.symbol,
+        "permissions": vulcan.uonetplus.permissions,
+        "instances": [[i.id, i.name] for i in vulcan.uonetplus.instances],
+        "units": [_dump_unit(u) for u in vulcan._units],
+        "start_data": vulcan._start_data,
+        "cookies": cookies,
+    }
+    return json.dumps(data).encode()
+
+
+def load_session(vulcan: VulcanWeb, blob: bytes):
+    """Restores session state exported with `dump_session` into a client"""
+
+    try:
+        data = json.loads(blob)
+    except ValueError as e:
+        raise ScraperException(f"Failed to parse session data: {e}")
+
+    if data.get("version") != SESSION_VERSION:
+        raise ScraperException("Unsupported session data version")
+
+    if data["host"] != vulcan.http.base_host or data["email"] != vulcan.email:
+        raise ScraperException("Session data belongs to a different account")
+
+    jar = vulcan.http.session.cookie_jar
+    jar.clear()
+    scheme = "https" if vulcan.http.ssl else "http"
+    for domain, cookie, *rest in data["cookies"]:
+        cookies = SimpleCookie(cookie)
+        if rest and rest[0]:
+            # host-only, restored without Domain so it is not sent to other subdomains
+            for morsel in cookies.values():
+                morsel["domain"] = ""
+
+        jar.update_cookies(cookies, URL.build(scheme=scheme, host=domain))
+
+    # nothing fetched with the previous session may be used with this one
+    vulcan._clear_start_data()
+    vulcan.symbol = data["symbol"]
+    vulcan._units = [ReportingUnit(**u) for u in data["units"]]
+    vulcan._start_data = {
+        k: (headers, school_name)
+        for k, (headers, school_name) in data["start_data"].items()
+    }
+
+    vulcan.uonetplus.symbol = data["symbol"]
+    vulcan.uonetplus.text = ""
+    vulcan.uonetplus.permissions = data["permissions"]
+    vulcan.uonetplus.instances = [Instance(id=i, name=n) for i, n in data["instances"]]
+    vulcan.uonetplus.clear_tiles()
+
+    vulcan._cufs_logged_in = True
+    vulcan.logged_in = True
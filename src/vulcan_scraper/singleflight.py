@@ -0,0 +1,76 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+
+class SingleFlight:
+    """
+    Runs at most one fetch per key at a time, callers asking for a key that is already
+    being fetched wait for the same result.
+
+    Cancelling one caller does not cancel the fetch for the others. After `clear`,
+    fetches started before it no longer call their `store`, so they cannot bring back
+    data that was dropped (e.g. on logout) while they were in flight
+    """
+
+    def __init__(self):
+        self._tasks: dict[Hashable, asyncio.Future] = {}
+        self._generation = 0
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._tasks
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    async def run(
+        self,
+        key: Hashable,
+        fetch: Callable[[], Awaitable[Any]],
+        store: Optional[Callable[[Any], None]] = None,
+    ) -> Any:
+        """Returns the result of `fetch`, or of the fetch of `key` already in flight"""
+
+        task = self._tasks.get(key)
+        if not task:
+            task = self._tasks[key] = asyncio.ensure_future(
+                self._fetch(fetch, store, self._generation)
+            )
+
+            def done(t: asyncio.Future):
+                if self._tasks.get(key) is t:
+                    del self._tasks[key]
+
+                if not t.cancelled():
+                    t.exception()  # retrieved, even if every waiter was cancelled
+
+            task.add_done_callback(done)
+
+        return await asyncio.shield(task)
+
+    async def _fetch(
+        self,
+        fetch: Callable[[], Awaitable[Any]],
+        store: Optional[Callable[[Any], None]],
+        generation: int,
+    ) -> Any:
+        value = await fetch()
+        if store and generation == self._generation:
+            store(value)
+
+        return value
+
+    def clear(self):
+        """Forgets the fetches in flight, their results are still returned to their callers"""
+
+        self._tasks.clear()
+        self._generation += 1
+
+    async def cancel(self):
+        """Cancels the fetches in flight"""
+
+        tasks = list(self._tasks.values())
+        self.clear()
+        for task in tasks:
+            task.cancel()
+
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,123 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .student import Student
+
+import asyncio
+from dataclasses import dataclass, field
+from datetime import datetime
+from logging import getLogger
+from time import perf_counter
+from typing import Any, Awaitable, Callable, Iterable, Optional
+
+from .model import Exam, GradesData, Homework, Meeting, NotesAndAchievementsData
+from .timetable import Timetable
+
+SNAPSHOT_PARTS = (
+    "grades",
+    "notes_and_achievements",
+    "meetings",
+    "exams",
+    "homework",
+    "timetable",
+    "lucky_number",
+)
+
+_log = getLogger(__name__)
+
+
+@dataclass
+class StudentSnapshot:
+    """
+    Everything fetched by `Student.snapshot`.
+
+    Parts that failed are left as `None` (grades of a failed period are missing) and their
+    exception is kept in `errors`. `timings` holds the time each part took, in seconds
+    """
+
+    student: Student
+    taken_at: datetime
+    grades: dict[int, GradesData] = field(default_factory=dict)  # by period index
+    notes_and_achievements: Optional[NotesAndAchievementsData] = None
+    meetings: Optional[list[Meeting]] = None
+    exams: Optional[list[Exam]] = None
+    homework: Optional[list[Homework]] = None
+    timetable: Optional[Timetable] = None
+    lucky_number: Optional[int] = None
+    timings: dict[str, float] = field(default_factory=dict)
+    errors: dict[str, Exception] = field(default_factory=dict)
+    elapsed: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+
+async def take_snapshot(
+    student: Student,
+    *,
+    week_day: Optional[datetime] = None,
+    periods: Optional[Iterable[int]] = None,
+    parts: Iterable[str] = SNAPSHOT_PARTS,
+    concurrency: int = 4,
+) -> StudentSnapshot:
+    parts = list(parts)
+    unknown = [part for part in parts if part not in SNAPSHOT_PARTS]
+    if unknown:
+        raise ValueError(f"Unknown snapshot parts: {', '.join(unknown)}")
+
+    week_day = week_day or datetime.now()
+    if periods is None:
+        periods = range(len(student.register.periods))
+
+    snapshot = StudentSnapshot(student=student, taken_at=datetime.now())
+    sem = asyncio.Semaphore(max(1, concurrency))
+
+    async def run(
+        name: str, fetch: Callable[[], Awaitable[Any]], store: Callable[[Any], None]
+    ):
+        async with sem:
+            start = perf_counter()
+            try:
+                store(await fetch())
+            except Exception as e:
+                _log.debug(f"Snapshot of {student} failed at {name}: {e!r}")
+                snapshot.errors[name] = e
+            finally:
+                snapshot.timings[name] = perf_counter() - start
+
+    def setter(attr: str) -> Callable[[Any], None]:
+        return lambda value: setattr(snapshot, attr, value)
+
+    def grades_setter(period: int) -> Callable[[Any], None]:
+        return lambda value: snapshot.grades.__setitem__(period, value)
+
+    fetchers = {
+        "notes_and_achievements": student.get_notes_and_achievements,
+        "meetings": student.get_meetings,
+        "exams": lambda: student.get_exams(week_day),
+        "homework": lambda: student.get_homework(week_day),
+        "timetable": lambda: student.get_timetable(week_day),
+        "lucky_number": student.get_lucky_number,
+    }
+
+    jobs = []
+    for part in parts:
+        if part == "grades":
+            for period in periods:
+                jobs.append(
+                    run(
+                        f"grades[{period}]",
+                        lambda period=period: student.get_grades(period=period),
+                        grades_setter(period),
+                    )
+                )
+        else:
+            jobs.append(run(part, fetchers[part], setter(part)))
+
+    start = perf_counter()
+    await asyncio.gather(*jobs)
+    snapshot.elapsed = perf_counter() - start
+    snapshot.grades = dict(sorted(snapshot.grades.items()))
+    return snapshot
@@ -4,8 +4,11 @@ from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from .client import VulcanWeb
 
-from datetime import datetime
-from typing import Optional
+import asyncio
+from collections import deque
+from functools import wraps
+from datetime import datetime, timedelta
+from typing import Optional, AsyncIterator, Iterable
 
 from .model import (
     SchoolAnnouncement,
@@ -16,13 +19,41 @@ from .model import (
     NotesAndAchievementsData,
     Meeting,
     Exam,
+    ExamsDay,
     Homework,
+    HomeworkDay,
+    LazyList,
 )
 from .http import HTTP
 from .uonetplus import Uonetplus
-from .timetable import Timetable
-from .utils import sub_before, reverse_teacher_name, get_monday, Instance, get_first
-from .error import NotLoggedInException, ScraperException
+from .timetable import Timetable, TimetableDay
+from .changes import ChangeFeed, Change, KINDS
+from .snapshot import StudentSnapshot, SNAPSHOT_PARTS, take_snapshot
+from .utils import sub_before, reverse_teacher_name, get_monday, Instance
+from .error import NotLoggedInException
+from .tracing import span, traced
+
+
+def relogin_on_expiry(func):
+    """With `VulcanWeb.auto_relogin`, logs in again and retries once when the session has expired"""
+
+    @wraps(func)
+    async def wrapper(self: Student, *args, **kwargs):
+        login_count = self._v._login_count
+        try:
+            return await func(self, *args, **kwargs)
+        except NotLoggedInException:
+            if not self._v.auto_relogin:
+                raise
+
+        await self._v.relogin(login_count)
+        if self.school_id not in self._v._start_data:
+            await self._v._get_uczen_start_data(self.school_id)
+
+        self._headers = self._v._start_data[self.school_id][0]
+        return await func(self, *args, **kwargs)
+
+    return wrapper
 
 
 @reprable("first_name", "last_name", "class_symbol", "year", "school_name")
@@ -67,37 +98,42 @@ class Student:
         self.full_name_with_year = reg.student_full_name_with_year
         self.class_symbol = str(reg.level) + reg.symbol
 
+        self._feed: Optional[ChangeFeed] = None
+
     def __str__(self) -> str:
         return self.full_name_with_year
 
+    @property
+    def tracer(self):
+        return self._v.tracer
+
     @classmethod
     async def from_data(
-        cls, vulcan: VulcanWeb, *, school_id: str, register_id: int
+        cls,
+        vulcan: VulcanWeb,
+        *,
+        school_id: str,
+        register_id: int,
+        student_id: Optional[int] = None,
     ) -> Student:
-        if not vulcan.logged_in:
-            raise NotLoggedInException
-
-        assert vulcan.uonetplus.instances, vulcan._units
-
-        instance = get_first(vulcan.uonetplus.instances, id=school_id)
-        if not instance:
-            raise ScraperException("Student.from_data: Invalid school_id provided")
+        """Creates a student from ids saved earlier. See `VulcanWeb.get_students_by_ids` to create many at once"""
 
-        headers, school_name = await vulcan._get_uczen_start_data(instance.id)
-        registers = await vulcan.http.uczen_get_registers(
-            vulcan.symbol, instance.id, headers
+        ids = (
+            (school_id, register_id)
+            if student_id is None
+            else (school_id, register_id, student_id)
         )
-        register = get_first(registers, register_id=register_id)
-        if not register:
-            raise ScraperException(
-                "Student.from_data: Invalid student_register_id provided"
-            )
+        students = await vulcan.get_students_by_ids([ids])
+        return students[0]
 
-        unit = get_first(vulcan._units, id=register.periods[0].unit_id)
-
-        return cls(vulcan, instance, headers, school_name, register, unit)
+    @traced("Student.get_grades")
+    @relogin_on_expiry
+    async def get_grades(self, *, period: int = 0, lazy: bool = False) -> GradesData:
+        """
+        Get the student's grades for the period with the index `period`.
 
-    async def get_grades(self, *, period: int = 0) -> GradesData:
+        With `lazy`, subjects and grades are only decoded when they are first accessed
+        """
         period_id = self.register.periods[period].id
         return await self._http.uczen_get_grades(
             self._symbol,
@@ -105,16 +141,24 @@ class Student:
             self._headers,
             self._cookies,
             period_id=period_id,
+            lazy=lazy,
         )
 
-    async def get_notes_and_achievements(self) -> NotesAndAchievementsData:
+    @traced("Student.get_notes_and_achievements")
+    @relogin_on_expiry
+    async def get_notes_and_achievements(
+        self, *, lazy: bool = False
+    ) -> NotesAndAchievementsData:
         return await self._http.uczen_get_notes_achievements(
             self._symbol,
             self._instance.id,
             self._headers,
             self._cookies,
+            lazy=lazy,
         )
 
+    @traced("Student.get_meetings")
+    @relogin_on_expiry
     async def get_meetings(self) -> list[Meeting]:
         meetings = await self._http.uczen_get_meetings(
             self._symbol,
@@ -124,6 +168,8 @@ class Student:
         )
         return sorted(meetings, key=lambda m: m.date)
 
+    @traced("Student.get_timetable")
+    @relogin_on_expiry
     async def get_timetable(self, week_day: datetime) -> Timetable:
         """
         Get the student's timetable for the week `week_day` is in.
@@ -138,11 +184,56 @@ class Student:
             get_monday(week_day),
         )
 
-        return Timetable(data)
+        with span(self.tracer, "parse"):
+            return Timetable(data)
+
+    async def get_timetable_range(
+        self, start: datetime, end: datetime, *, concurrency: int = 4
+    ) -> AsyncIterator[TimetableDay]:
+        """
+        Get the student's timetable days from `start` to `end` (inclusive), in date order.
+
+        Up to `concurrency` weeks are fetched at once; days are yielded as soon as their week arrives
+        """
+        mondays = []
+        monday = get_monday(start).date()
+        while monday <= end.date():
+            mondays.append(datetime.combine(monday, datetime.min.time()))
+            monday += timedelta(days=7)
+
+        weeks = iter(mondays)
+        pending: deque[asyncio.Future] = deque()
+
+        def fetch_next():
+            monday = next(weeks, None)
+            if monday:
+                pending.append(asyncio.ensure_future(self.get_timetable(monday)))
+
+        for _ in range(max(1, concurrency)):
+            fetch_next()
 
-    async def get_exams(self, week_day: datetime) -> list[Exam]:
+        try:
+            while pending:
+                timetable = await pending.popleft()
+                fetch_next()
+
+                for day in sorted(timetable.days, key=lambda d: d.date):
+                    if start.date() <= day.date.date() <= end.date():
+                        yield day
+
+        finally:
+            for task in pending:
+                task.cancel()
+
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    @traced("Student.get_exams")
+    @relogin_on_expiry
+    async def get_exams(self, week_day: datetime, *, lazy: bool = False) -> list[Exam]:
         """
         Get the student's exams for the next 4 weeks starting from the week `week_day` is in.
+
+        With `lazy`, exams are only decoded when they are first accessed
         """
         data = await self._http.uczen_get_exams(
             self._symbol,
@@ -151,23 +242,33 @@ class Student:
             self._cookies,
             get_monday(week_day),
             self.year,
+            lazy=lazy,
         )
 
         type_to_name = {1: "Sprawdzian", 2: "Kartkówka", 3: "Praca Klasowa"}
 
-        exams = []
-        for day in data.days:
-            for exam in day.exams:
-                exam.date = day.date
-                exam.teacher = reverse_teacher_name(sub_before(exam.teacher, " ["))
-                exam.type = type_to_name[exam.type]
-                exams.append(exam)
+        def fix(day: ExamsDay, i: int) -> Exam:
+            exam = day.exams[i]
+            exam.date = day.date
+            exam.teacher = reverse_teacher_name(sub_before(exam.teacher, " ["))
+            exam.type = type_to_name[exam.type]
+            return exam
+
+        items = [(day, i) for day in data.days for i in range(len(day.exams))]
+        if lazy:
+            return LazyList(items, lambda x: fix(*x))
 
-        return exams
+        return [fix(day, i) for day, i in items]
 
-    async def get_homework(self, week_day: datetime) -> list[Homework]:
+    @traced("Student.get_homework")
+    @relogin_on_expiry
+    async def get_homework(
+        self, week_day: datetime, *, lazy: bool = False
+    ) -> list[Homework]:
         """
         Get the student's homework for the week `week_day` is in.
+
+        With `lazy`, homework is only decoded when it is first accessed
         """
         data = await self._http.uczen_get_homework(
             self._symbol,
@@ -176,32 +277,79 @@ class Student:
             self._cookies,
             get_monday(week_day),
             self.year,
+            lazy=lazy,
         )
 
-        homework = []
-        for day in data.days:
-            for h in day.homework:
-                h.teacher = reverse_teacher_name(sub_before(h.teacher, " ["))
-                homework.append(h)
+        def fix(day: HomeworkDay, i: int) -> Homework:
+            h = day.homework[i]
+            h.teacher = reverse_teacher_name(sub_before(h.teacher, " ["))
+            return h
+
+        items = [(day, i) for day in data.days for i in range(len(day.homework))]
+        if lazy:
+            return LazyList(items, lambda x: fix(*x))
 
-        return homework
+        return [fix(day, i) for day, i in items]
 
+    @traced("Student.get_lucky_number")
+    @relogin_on_expiry
     async def get_lucky_number(self) -> Optional[int]:
-        numbers = await self._uonetplus.get_lucky_numbers()
-        if not numbers:
-            return
-
-        num = (
-            get_first(numbers, unit_abbr=self.school_abbreviation)
-            or get_first(numbers, instance_name=self._instance.name)
-            or numbers[0]
+        num = await self._uonetplus.get_lucky_number(
+            unit_abbr=self.school_abbreviation, instance_name=self._instance.name
         )
+        return num.value if num else None
 
-        return num.value
-
+    @traced("Student.get_school_announcements")
+    @relogin_on_expiry
     async def get_school_announcements(self) -> list[SchoolAnnouncement]:
         # TODO: only return ones relevant to this student
         return await self._uonetplus.get_school_announcements()
 
+    @traced("Student.changes")
+    @relogin_on_expiry
+    async def changes(
+        self,
+        *,
+        period: int = 0,
+        week_day: Optional[datetime] = None,
+        kinds: Iterable[str] = KINDS,
+    ) -> list[Change]:
+        """
+        Get the student's grades, notes, achievements, homework and meetings
+        that were added, changed or removed since the previous call.
+
+        The first call reports everything as added. See `ChangeFeed.poll`
+        """
+        if self._feed is None:
+            self._feed = ChangeFeed(self)
+
+        return await self._feed.poll(period=period, week_day=week_day, kinds=kinds)
+
+    @traced("Student.snapshot")
+    async def snapshot(
+        self,
+        *,
+        week_day: Optional[datetime] = None,
+        periods: Optional[Iterable[int]] = None,
+        parts: Iterable[str] = SNAPSHOT_PARTS,
+        concurrency: int = 4,
+    ) -> StudentSnapshot:
+        """
+        Get the student's grades (of every period by default), notes and achievements, meetings,
+        exams, homework, timetable and lucky number at once.
+
+        Up to `concurrency` requests run at the same time. A failing part does not stop the others,
+        its exception is stored in `StudentSnapshot.errors`
+        """
+        return await take_snapshot(
+            self,
+            week_day=week_day,
+            periods=periods,
+            parts=parts,
+            concurrency=concurrency,
+        )
+
+    @traced("Student.refresh_session")
+    @relogin_on_expiry
     async def refresh_session(self):
         await self._http.uczen_refresh_session(self._symbol, self._instance.id)
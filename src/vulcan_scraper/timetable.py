@@ -1,19 +1,26 @@
 import re
 from dataclasses import dataclass, field
-from datetime import datetime, time
-from bs4 import BeautifulSoup, element
+from datetime import datetime
+from typing import TYPE_CHECKING, Optional
 
 from .model import TimetableResponse
 from .utils import (
     tag_own_textcontent,
     sub_after,
     sub_before,
-    get_first,
     reverse_teacher_name,
+    parse_date,
+    parse_time,
+    make_soup,
+    SLOTS,
 )
 
+if TYPE_CHECKING:
+    import lxml.html
+    from bs4 import element
 
-@dataclass
+
+@dataclass(**SLOTS)
 class TimetableLesson:
     _html: str = field(repr=False)
 
@@ -34,14 +41,14 @@ class TimetableLesson:
     new_comment: str = ""
 
 
-@dataclass
+@dataclass(**SLOTS)
 class TimetableAdditionalLesson:
     start: datetime
     end: datetime
     subject: str
 
 
-@dataclass
+@dataclass(**SLOTS)
 class TimetableDay:
     date: datetime
     lessons: list[TimetableLesson]
@@ -52,6 +59,44 @@ class TimetableDay:
         return self.date.strftime("%A, %d %B %Y")
 
 
+@dataclass(**SLOTS)
+class _Span:
+    text: str
+    classes: list[str]
+
+
+@dataclass(**SLOTS)
+class _Div:
+    own_text: str
+    text: str
+    spans: list[_Span]
+
+
+_EMPTY_SPAN = _Span(text="", classes=[])
+
+
+def _div_from_bs4(div: "element.Tag") -> _Div:
+    return _Div(
+        own_text=tag_own_textcontent(div),
+        text=div.text,
+        spans=[
+            _Span(text=s.text, classes=s.get("class", [])) for s in div.select("span")
+        ],
+    )
+
+
+def _div_from_lxml(div: "lxml.html.HtmlElement") -> _Div:
+    own = (div.text or "") + "".join(child.tail or "" for child in div)
+    return _Div(
+        own_text=re.sub(r"\s+", " ", own).strip(),
+        text=div.text_content(),
+        spans=[
+            _Span(text=s.text_content(), classes=s.get("class", "").split())
+            for s in div.iterdescendants("span")
+        ],
+    )
+
+
 CLASS_CANCELLED: str = "x-treelabel-inv"
 CLASS_CHANGED: str = "x-treelabel-zas"
 OLDFORMAT_CLASS_COMMENT: str = "x-treelabel-rlz"
@@ -94,9 +139,9 @@ def parse_lesson_comment(lesson: TimetableLesson, comment: str) -> str:
 def parse_lesson_info(
     lesson: TimetableLesson,
     divtext: str,
-    namespan: element.Tag,
-    roomspan: element.Tag,
-    teacherspan: element.Tag,
+    namespan: _Span,
+    roomspan: _Span,
+    teacherspan: _Span,
 ):
     lesson.subject = sub_before(namespan.text, "[").strip()
     lesson.group = sub_after(namespan.text, lesson.subject, "").strip(" []")
@@ -108,23 +153,23 @@ def parse_lesson_info(
     ):  # HACK: if teacher contains a number, assume its actually the room and flip
         lesson.room, lesson.teacher = lesson.teacher, lesson.room
 
-    if CLASS_CANCELLED in namespan["class"]:
+    if CLASS_CANCELLED in namespan.classes:
         lesson.cancelled = True
-    # if CLASS_CHANGED in namespan["class"]:
+    # if CLASS_CHANGED in namespan.classes:
     #     lesson.changed = True
 
     lesson.comment = parse_lesson_comment(lesson, divtext)
 
 
-def parse_div(lesson: TimetableLesson, divtext: str, spans: list[element.Tag]):
+def parse_div(lesson: TimetableLesson, divtext: str, spans: list[_Span]):
     comment = divtext
     for s in spans.copy():
-        if OLDFORMAT_CLASS_COMMENT in s["class"]:
+        if OLDFORMAT_CLASS_COMMENT in s.classes:
             comment += s.text.strip()
             spans.remove(s)
 
     if len(spans) == 2:
-        parse_lesson_info(lesson, comment, spans[0], spans[1], element.Tag(name="span"))
+        parse_lesson_info(lesson, comment, spans[0], spans[1], _EMPTY_SPAN)
     elif len(spans) == 3:
         parse_lesson_info(lesson, comment, spans[0], spans[1], spans[2])
     elif len(spans) == 4:
@@ -140,7 +185,7 @@ def parse_div(lesson: TimetableLesson, divtext: str, spans: list[element.Tag]):
             if len(spans) == 6
             else (spans[4], spans[6], spans[7])
         )
-        if CLASS_CANCELLED in new[0]["class"]:  # invert
+        if CLASS_CANCELLED in new[0].classes:  # invert
             old, new = new, old
 
         parse_lesson_info(lesson, comment, *old)
@@ -164,47 +209,48 @@ def parse_div(lesson: TimetableLesson, divtext: str, spans: list[element.Tag]):
 
 
 def parse_lesson(date: datetime, header: str, text: str) -> TimetableLesson:
-    soup = BeautifulSoup(text, "lxml")
-    divs = soup.select("div:not([class])")
+    soup = make_soup(text)
+    divs = [_div_from_bs4(div) for div in soup.select("div:not([class])")]
+    return _build_lesson(date, header, text, divs)
+
+
+def _build_lesson(
+    date: datetime, header: str, text: str, divs: list[_Div]
+) -> Optional[TimetableLesson]:
     if not divs:
         return
 
     split = header.split("<br />")
     number = int(split[0])
-    start = datetime.combine(date.date(), time.fromisoformat(split[1]))
-    end = datetime.combine(date.date(), time.fromisoformat(split[2]))
+    start = datetime.combine(date.date(), parse_time(split[1]))
+    end = datetime.combine(date.date(), parse_time(split[2]))
 
     lesson = TimetableLesson(_html=text, number=number, start=start, end=end)
 
     if len(divs) == 1:
         div = divs[0]
-        divtext = tag_own_textcontent(div)
-        spans = div.select("span")
-        parse_div(lesson, divtext, spans)
+        parse_div(lesson, div.own_text, div.spans)
 
     elif len(divs) == 2:
         old = divs[0]
         new = divs[1]
-        old_s = old.select("span")
-        new_s = new.select("span")
+        old_s = old.spans
+        new_s = new.spans
         if len(old_s) < 2 or len(new_s) < 2:
             lesson.subject = f"TODO: {len(old_s) = }, {len(new_s) = }"
             return lesson
 
         if (
-            CLASS_CANCELLED in new_s[0]["class"] or "(przeniesiona z lekcji" in old.text
+            CLASS_CANCELLED in new_s[0].classes or "(przeniesiona z lekcji" in old.text
         ):  # invert
             old, new = new, old
             old_s, new_s = new_s, old_s
 
-        divtext = tag_own_textcontent(old)
-
-        parse_div(lesson, divtext, old_s)
+        parse_div(lesson, old.own_text, old_s)
 
         new_lesson = TimetableLesson(_html="", number=0, start=None, end=None)
-        divtext = tag_own_textcontent(new)
 
-        parse_div(new_lesson, divtext, new_s)
+        parse_div(new_lesson, new.own_text, new_s)
 
         if new_lesson.subject and new_lesson.subject != lesson.subject:
             lesson.new_subject = new_lesson.subject
@@ -228,43 +274,130 @@ def parse_lesson(date: datetime, header: str, text: str) -> TimetableLesson:
 def parse_additional_lesson(
     date: datetime, description: str
 ) -> TimetableAdditionalLesson:
-    soup = BeautifulSoup(description, "lxml")
-    text = soup.text.strip()
-    split = text.split(" ")
-    start = datetime.combine(date.date(), time.fromisoformat(split[0]))
-    end = datetime.combine(date.date(), time.fromisoformat(split[2]))
+    soup = make_soup(description)
+    return _build_additional_lesson(date, soup.text)
+
+
+def _build_additional_lesson(date: datetime, text: str) -> TimetableAdditionalLesson:
+    split = text.strip().split(" ")
+    start = datetime.combine(date.date(), parse_time(split[0]))
+    end = datetime.combine(date.date(), parse_time(split[2]))
     subject = " ".join(split[3:])
 
     return TimetableAdditionalLesson(start=start, end=end, subject=subject)
 
 
+class _Document:
+    """
+    All HTML snippets of a timetable response, parsed with a single lxml pass.
+
+    Every snippet is wrapped in a `<div data-cell="N">`, so it can be looked up
+    by its position after parsing
+    """
+
+    def __init__(self, snippets: list[str]):
+        import lxml.html
+
+        self.cells: list[Optional["lxml.html.HtmlElement"]] = [None] * len(snippets)
+
+        html = "".join(
+            f'<div data-cell="{i}">{s}</div>' for i, s in enumerate(snippets) if s
+        )
+        if not html:
+            return
+
+        root = lxml.html.document_fromstring(html)
+        wrappers = root.xpath("//div[@data-cell]")
+        if len(wrappers) != sum(1 for s in snippets if s) or any(
+            w.getparent().tag != "body" for w in wrappers
+        ):
+            # a snippet broke out of its wrapper, parse each one on its own
+            for i, s in enumerate(snippets):
+                if s:
+                    self.cells[i] = lxml.html.document_fromstring(
+                        f"<div>{s}</div>"
+                    ).find("body/div")
+            return
+
+        for w in wrappers:
+            self.cells[int(w.get("data-cell"))] = w
+
+    def divs(self, i: int) -> list[_Div]:
+        cell = self.cells[i]
+        if cell is None:
+            return []
+
+        return [
+            _div_from_lxml(div)
+            for div in cell.iterdescendants("div")
+            if "class" not in div.attrib
+        ]
+
+    def text(self, i: int) -> str:
+        cell = self.cells[i]
+        return cell.text_content() if cell is not None else ""
+
+
 class Timetable:
-    def __init__(self, data: TimetableResponse):
+    """
+    A week of the student's timetable.
+
+    By default all lesson cells and additional lessons of `data` are parsed in
+    a single lxml pass. With `single_pass=False` every cell is parsed separately
+    using `parse_lesson` and `parse_additional_lesson`
+    """
+
+    def __init__(self, data: TimetableResponse, *, single_pass: bool = True):
         self.days: list[TimetableDay] = []
+        self._days_by_date: dict = {}  # date -> TimetableDay
+
+        columns = len(data.headers) - 1
+        if single_pass:
+            cells = [c for r in data.rows for c in r[1 : columns + 1]]
+            additionals = [d for a in data.additionals for d in a.descriptions]
+            doc = _Document(cells + additionals)
 
         for i, h in enumerate(data.headers[1:]):  # first column is lesson times
             split = h.text.split("<br />")
-            date = datetime.strptime(split[1], "%d.%m.%Y")
+            date = parse_date(split[1])
             desc = "; ".join(split[2:])
             day = TimetableDay(date=date, lessons=[], additionals=[], description=desc)
-            for r in data.rows:
-                lesson = parse_lesson(date, r[0], r[i + 1])
+            for j, r in enumerate(data.rows):
+                if single_pass:
+                    divs = doc.divs(j * columns + i)
+                    lesson = _build_lesson(date, r[0], r[i + 1], divs)
+                else:
+                    lesson = parse_lesson(date, r[0], r[i + 1])
+
                 if lesson:
                     day.lessons.append(lesson)
 
             self.days.append(day)
+            self._days_by_date.setdefault(date.date(), day)
 
+        n = len(data.rows) * columns  # index of the first additional in doc
         for a in data.additionals:
             date = a.header.split(", ")[1]
-            date = datetime.strptime(date, "%d.%m.%Y")
-            day = get_first(self.days, date=date)
+            date = parse_date(date)
+            day = self.get_day(date)
             if not day:
                 day = TimetableDay(date=date, lessons=[], additionals=[])
                 self.days.append(day)
+                self._days_by_date[date.date()] = day
 
             for d in a.descriptions:
-                lesson = parse_additional_lesson(date, d)
+                if single_pass:
+                    lesson = _build_additional_lesson(date, doc.text(n))
+                    n += 1
+                else:
+                    lesson = parse_additional_lesson(date, d)
+
                 if lesson:
                     day.additionals.append(lesson)
 
             day.additionals.sort(key=lambda a: a.start)
+
+    def get_day(self, date: datetime) -> Optional[TimetableDay]:
+        """Returns the day `date` falls on, if it is in this timetable"""
+
+        return self._days_by_date.get(date.date())
@@ -0,0 +1,128 @@
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import wraps
+from time import perf_counter
+from typing import Any, ContextManager, Iterator, Optional, Protocol
+
+
+class Tracer(Protocol):
+    """
+    Anything with the `start_as_current_span` method of an OpenTelemetry tracer,
+    e.g. `opentelemetry.trace.get_tracer(__name__)` or a `SpanRecorder`
+    """
+
+    def start_as_current_span(
+        self, name: str, attributes: Optional[dict[str, Any]] = None
+    ) -> ContextManager: ...
+
+
+@dataclass
+class Span:
+    name: str
+    attributes: dict[str, Any] = field(default_factory=dict)
+    start: float = 0.0
+    end: Optional[float] = None
+    children: list["Span"] = field(default_factory=list)
+    error: Optional[Exception] = None
+
+    @property
+    def duration(self) -> float:
+        """In seconds, 0 while the span is open"""
+
+        return self.end - self.start if self.end is not None else 0.0
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def walk(self, depth: int = 0) -> Iterator[tuple[int, "Span"]]:
+        """This span and its descendants, depth first, with their depth"""
+
+        yield depth, self
+        for child in sorted(self.children, key=lambda s: s.start):
+            yield from child.walk(depth + 1)
+
+    def format(self) -> str:
+        lines = []
+        for depth, s in self.walk():
+            attrs = " ".join(f"{k}={v}" for k, v in s.attributes.items())
+            error = f" !{s.error.__class__.__name__}" if s.error else ""
+            lines.append(
+                f"{'  ' * depth}{s.name} {s.duration * 1000:.2f} ms {attrs}{error}".rstrip()
+            )
+
+        return "\n".join(lines)
+
+
+# recorder -> its current span, so the spans of different recorders never nest
+_current_spans: ContextVar[dict["SpanRecorder", Span]] = ContextVar("_current_spans")
+
+
+class SpanRecorder:
+    """
+    A built-in tracer that keeps the last `max_spans` finished root spans in `spans`,
+    for when OpenTelemetry is not available:
+
+        recorder = SpanRecorder()
+        client = VulcanWeb(..., tracer=recorder)
+        await client.login()
+        print(recorder.spans[-1].format())
+
+    Spans started in tasks (e.g. by `asyncio.gather`) are nested under the span
+    that was current when the task was created, unless it has already finished
+    (e.g. a request shared by many callers), then they are kept as root spans
+    """
+
+    def __init__(self, max_spans: int = 1000):
+        self.spans: deque[Span] = deque(maxlen=max_spans)
+
+    @contextmanager
+    def start_as_current_span(
+        self, name: str, attributes: Optional[dict[str, Any]] = None
+    ) -> Iterator[Span]:
+        current = _current_spans.get({})
+        parent = current.get(self)
+        span = Span(name, dict(attributes or {}), perf_counter())
+        # copied, the dict may be shared with the contexts of other tasks
+        token = _current_spans.set({**current, self: span})
+        try:
+            yield span
+        except Exception as e:
+            span.error = e
+            raise
+        finally:
+            span.end = perf_counter()
+            _current_spans.reset(token)
+            if parent is not None and parent.end is None:
+                parent.children.append(span)
+            else:
+                self.spans.append(span)
+
+    def clear(self):
+        self.spans.clear()
+
+
+def span(tracer: Optional[Tracer], name: str, **attributes: Any) -> ContextManager:
+    """A span from `tracer`, or a no-op context manager without one"""
+
+    if tracer is None:
+        return nullcontext()
+
+    return tracer.start_as_current_span(
+        name, attributes={k: v for k, v in attributes.items() if v is not None}
+    )
+
+
+def traced(name: str):
+    """Runs the decorated method in a span called `name`, from the `tracer` attribute of its object"""
+
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            with span(getattr(self, "tracer", None), name):
+                return await func(self, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
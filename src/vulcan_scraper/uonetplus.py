@@ -1,9 +1,11 @@
+from time import monotonic
+from typing import Any, Awaitable, Callable, Optional
+
 from .http import HTTP
 from .model import LuckyNumber, SchoolAnnouncement
 from .error import ScraperException
-from .utils import sub_after, Instance
-from datetime import datetime
-from bs4 import BeautifulSoup
+from .singleflight import SingleFlight
+from .utils import sub_after, parse_date, make_soup, Instance
 
 
 class Uonetplus:
@@ -11,16 +13,75 @@ class Uonetplus:
     symbol: str
     text: str
     permissions: str
-    instances: list[Instance]
 
-    def __init__(self, vulcan):
+    def __init__(self, vulcan, *, tile_ttl: float = 600.0):
         self._v = vulcan
         self._http: HTTP = vulcan.http
 
-    async def get_lucky_numbers(self) -> list[LuckyNumber]:
+        self._instances: list[Instance] = []
+        self._instances_by_id: dict[str, Instance] = {}
+
+        # the tiles are the same for every student of the account, so each one is fetched
+        # once per `tile_ttl` seconds, by one request shared by all concurrent callers
+        self.tile_ttl = tile_ttl
+        self._tiles: dict[str, tuple[float, Any]] = {}  # name -> (fetch time, value)
+        self._tile_flights = SingleFlight()
+
+    @property
+    def instances(self) -> list[Instance]:
+        return self._instances
+
+    @instances.setter
+    def instances(self, instances: list[Instance]):
+        self._instances = instances
+        self._instances_by_id = {}
+        for i in instances:
+            self._instances_by_id.setdefault(i.id, i)
+
+    def get_instance(self, instance_id: str) -> Optional[Instance]:
+        return self._instances_by_id.get(instance_id)
+
+    def clear_tiles(self):
+        """Drops the cached tiles, e.g. after logging in again"""
+
+        self._tiles.clear()
+        self._tile_flights.clear()
+
+    async def _get_tile(self, name: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
         if not self.symbol or not self.permissions:
             raise ScraperException("Uonetplus service module not initialized")
 
+        cached = self._tiles.get(name)
+        if cached and monotonic() - cached[0] < self.tile_ttl:
+            return cached[1]
+
+        def store(items: Any):
+            self._tiles[name] = (monotonic(), items)
+
+        return await self._tile_flights.run(name, fetch, store)
+
+    async def get_lucky_numbers(self) -> list[LuckyNumber]:
+        numbers, _, _ = await self._get_tile("lucky_numbers", self._fetch_lucky_numbers)
+        return list(numbers)
+
+    async def get_lucky_number(
+        self, *, unit_abbr: str, instance_name: str
+    ) -> Optional[LuckyNumber]:
+        """
+        Returns the lucky number of the reporting unit `unit_abbr`, or else of the instance `instance_name`,
+        or else the first one
+        """
+        numbers, by_unit, by_instance = await self._get_tile(
+            "lucky_numbers", self._fetch_lucky_numbers
+        )
+        if not numbers:
+            return None
+
+        return by_unit.get(unit_abbr) or by_instance.get(instance_name) or numbers[0]
+
+    async def _fetch_lucky_numbers(
+        self,
+    ) -> tuple[list[LuckyNumber], dict[str, LuckyNumber], dict[str, LuckyNumber]]:
         data = await self._http.uonetplus_get_lucky_numbers(
             self.symbol, self.permissions
         )
@@ -37,23 +98,31 @@ class Uonetplus:
                         )
                     )
 
-        return ret
+        by_unit: dict[str, LuckyNumber] = {}
+        by_instance: dict[str, LuckyNumber] = {}
+        for number in ret:
+            by_unit.setdefault(number.unit_abbr, number)
+            by_instance.setdefault(number.instance_name, number)
+
+        return ret, by_unit, by_instance
 
     async def get_school_announcements(self) -> list[SchoolAnnouncement]:
-        if not self.symbol or not self.permissions:
-            raise ScraperException("Uonetplus service module not initialized")
+        return list(
+            await self._get_tile(
+                "school_announcements", self._fetch_school_announcements
+            )
+        )
 
+    async def _fetch_school_announcements(self) -> list[SchoolAnnouncement]:
         data = await self._http.uonetplus_get_school_announcements(
             self.symbol, self.permissions
         )
         ret = []
         for wrapper in data:
             for announcement in wrapper.content:
-                date = datetime.strptime(announcement.name[:10], "%d.%m.%Y")
+                date = parse_date(announcement.name[:10])
                 subject = announcement.name[11:]
-                content = BeautifulSoup(
-                    announcement.data.replace("<br />", "\n"), "lxml"
-                ).text
+                content = make_soup(announcement.data.replace("<br />", "\n")).text
                 ret.append(
                     SchoolAnnouncement(date=date, subject=subject, content=content)
                 )
@@ -1,12 +1,16 @@
 import re
+import sys
+import warnings
 from dataclasses import dataclass, field
+from logging import getLogger
 from operator import attrgetter
 from time import perf_counter
-from typing import TypeVar, Iterable, Any, Optional
-from bs4 import BeautifulSoup, element
-from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, TypeVar, Iterable, Any, Optional, Hashable
+from datetime import datetime, time, timedelta
+from functools import lru_cache, wraps
 
 from .enum import LoginType
+from .tracing import span
 from .error import (
     NotLoggedInException,
     ScraperException,
@@ -16,12 +20,36 @@ from .error import (
     InvalidSymbolException,
 )
 
+# dataclass(slots=True) is only available since python 3.10
+SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+try:
+    # optional, parses bytes several times faster than the standard library
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup, element
+
+
+def make_soup(text: str) -> "BeautifulSoup":
+    """
+    Parses `text` with BeautifulSoup and lxml.
+
+    They are imported on first use, which keeps them out of `import vulcan_scraper`
+    """
+    from bs4 import BeautifulSoup
+
+    return BeautifulSoup(text, "lxml")
+
+
 re_valid_symbol = re.compile(r"[a-zA-Z0-9]*")
 
 
 def extract_symbols(wresult: str) -> list[str]:
     try:
-        soup = BeautifulSoup(wresult.replace(":", ""), "lxml")
+        soup = make_soup(wresult.replace(":", ""))
         tags = soup.select(
             'samlAttribute[AttributeName$="Instance"] samlAttributeValue'
         )
@@ -37,7 +65,7 @@ def extract_symbols(wresult: str) -> list[str]:
         return symbols
 
 
-@dataclass
+@dataclass(**SLOTS)
 class Instance:
     id: str
     name: str
@@ -46,7 +74,7 @@ class Instance:
 def extract_instances(text: str) -> list[Instance]:
     ret = []
     try:
-        soup = BeautifulSoup(text, "lxml")
+        soup = make_soup(text)
         tags = soup.select(
             '.panel.linkownia.pracownik.klient a[href*="uonetplus-uczen"]'
         )
@@ -71,11 +99,28 @@ def get_script_param(text: str, param: str, default: str = None) -> str:
 
 
 def measure_performance(func):
+    """
+    Deprecated, register a `tracing.SpanRecorder` as the client's `tracer`
+    or a hook with `HTTP.add_hook` instead.
+
+    Runs each call in a span from the `tracer` of its first argument, if it has one,
+    and logs its duration at the DEBUG level
+    """
+    warnings.warn(
+        "measure_performance is deprecated, use tracing.SpanRecorder or HTTP.add_hook",
+        DeprecationWarning,
+        stacklevel=2,
+    )
+
+    @wraps(func)
     async def wrapper(*args, **kwargs):
+        tracer = getattr(args[0], "tracer", None) if args else None
         start = perf_counter()
-        ret = await func(*args, **kwargs)
+        with span(tracer, func.__qualname__):
+            ret = await func(*args, **kwargs)
+
         t = (perf_counter() - start) * 1000
-        print(f"PERF: {func.__name__} took {t:.3f} ms")
+        getLogger(__name__).debug(f"{func.__qualname__} took {t:.3f} ms")
         return ret
 
     return wrapper
@@ -105,6 +150,43 @@ def get_first(iterable: Iterable[T], **attrs: Any) -> Optional[T]:
     return None
 
 
+def _freeze(value: Any) -> Hashable:
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def request_key(verb: str, url: str, **kwargs: Any) -> Hashable:
+    """A hashable key identifying a request by its verb, URL, cookies and body"""
+
+    return (
+        verb.upper(),
+        url,
+        *(_freeze(kwargs.get(k)) for k in ("params", "cookies", "data", "json")),
+    )
+
+
+def unwrap_api_response(data: Any, request: str) -> Any:
+    """Returns the `data` of a decoded `{success, data, feedback}` API response"""
+
+    if not isinstance(data, dict) or "success" not in data:
+        raise ScraperException(f"{request} returned an unexpected response")
+
+    success = data["success"]
+    if not success:
+        feedback = data.get("feedback")
+        msg = (
+            feedback.get("Message")
+            if feedback is not None
+            else f"{request} res.success = {success!r}"
+        )
+        raise VulcanException(msg)
+
+    return data.get("data")
+
+
 @dataclass
 class LoginInfo:
     type: LoginType
@@ -129,7 +211,7 @@ re_login_prefix = re.compile(r"var userNameValue = '([A-Z]+?)\\\\' \+ userName\.
 
 
 def extract_login_info(text: str) -> LoginInfo:
-    soup = BeautifulSoup(text, "lxml")
+    soup = make_soup(text)
 
     type = LoginType.UNKNOWN
     for k in logintype_selector:
@@ -150,7 +232,7 @@ def extract_login_info(text: str) -> LoginInfo:
     return info
 
 
-def tag_own_textcontent(tag: element.Tag) -> str:
+def tag_own_textcontent(tag: "element.Tag") -> str:
     return re.sub(r"\s+", " ", "".join(tag.findAll(text=True, recursive=False))).strip()
 
 
@@ -170,12 +252,33 @@ def sub_after(a: str, b: str, c: str = None) -> str:
     return a[idx + len(b) :]
 
 
+# every page matched below contains at least one of these (case-insensitive)
+error_markers = (
+    "errorblock",
+    "errormessage",
+    "errortext",
+    "mainpage_errordiv",
+    "nie został zarejestrowany w bazie szkoły",
+)
+
+
 # sdk/ErrorInterceptor.kt <3
-def check_for_vulcan_error(text: str):
+def check_for_vulcan_error(text: str, *, fast: bool = True):
+    """
+    Raises the appropriate exception if `text` is a VULCAN error page.
+
+    With `fast` the page is only parsed when it contains an error marker,
+    which skips building the tree for almost every page
+    """
     if text == "The custom error module does not recognize this error.":
         raise NotLoggedInException
 
-    soup = BeautifulSoup(text, "lxml")
+    if fast:
+        lower = text.lower()
+        if not any(marker in lower for marker in error_markers):
+            return
+
+    soup = make_soup(text)
 
     s = soup.select(".errorBlock .errorTitle, .errorBlock .errorMessage")
     if s:
@@ -208,6 +311,26 @@ def check_for_vulcan_error(text: str):
         raise InvalidSymbolException(own)
 
 
+# Payloads repeat a handful of distinct dates and times across many rows,
+# so parsing is memoized. The results are immutable and safe to share
+DATE_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def parse_date(text: str, fmt: str = "%d.%m.%Y") -> datetime:
+    return datetime.strptime(text, fmt)
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def parse_isodatetime(text: str) -> datetime:
+    return datetime.fromisoformat(text)
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def parse_time(text: str) -> time:
+    return time.fromisoformat(text)
+
+
 def get_monday(date: datetime) -> datetime:
     return date - timedelta(days=date.weekday())
 